@@ -0,0 +1,325 @@
+"""
+등기부등본 PDF 일괄 분석 (Streamlit 없이 터미널에서 실행)
+
+사용 예)
+    python batch_registry.py ./registries -o results.jsonl --workers 4
+    python batch_registry.py registries.zip -o results.parquet --format parquet
+    python batch_registry.py ./registries -o results.jsonl --resume   # 중단된 지점부터 이어서
+
+- 입력: 폴더(하위 폴더까지 *.pdf), .zip, .tar / .tar.gz / .tgz
+- 출력: JSONL(한 줄에 파일 하나) 또는 Parquet(청크 단위 part 파일 폴더)
+- 체크포인트: 출력 옆 <출력>.checkpoint 에 처리 끝난 파일 목록을 기록
+  (--resume 이면 출력에서 체크포인트에 오르지 못한 뒤쪽 행·반쯤 쓴 줄을 먼저 잘라 내서 중복 행이 생기지 않음)
+- 워커에 넘긴 작업은 워커 수 × IN_FLIGHT_PER_WORKER 개까지만 (tar 처럼 내용을 읽어서 넘기는 입력도 메모리가 일정)
+- 진행 상황: 몇 초마다 files/sec, pages/sec 를 stderr 로 출력
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import tarfile
+import time
+import zipfile
+
+from kkangtong.registry import analyze_registry_pdf_bytes
+from kkangtong.pdf_pages import MAX_PAGES, EXTRACT_TIMEOUT
+
+PROGRESS_EVERY = 5.0        # 진행 상황 출력 간격 (초)
+PARQUET_CHUNK_ROWS = 500    # Parquet part 파일 하나에 담을 행 수
+IN_FLIGHT_PER_WORKER = 2    # 워커 하나당 미리 넘겨 둘 작업 수 (넘긴 작업은 메모리에 올라가 있음)
+
+
+# ================================
+# 입력 목록
+# ================================
+def iter_inputs(path):
+    """(파일 ID, 작업) 목록. 작업은 워커로 넘길 ("path", 경로) / ("zip", (압축 파일, 항목)) / ("bytes", 내용)"""
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".pdf"):
+                    full = os.path.join(root, name)
+                    yield os.path.relpath(full, path), ("path", full)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    yield info.filename, ("zip", (path, info.filename))
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as tf:
+            for member in tf:
+                if member.isfile() and member.name.lower().endswith(".pdf"):
+                    # tar 는 임의 접근이 느려서 메인 프로세스에서 순서대로 읽어 넘김
+                    # (main 이 작업 자리가 날 때만 다음 항목을 꺼내므로 한 번에 읽혀 있는 파일 수는 제한됨)
+                    yield member.name, ("bytes", tf.extractfile(member).read())
+    elif path.lower().endswith(".pdf"):
+        yield os.path.basename(path), ("path", path)
+    else:
+        raise SystemExit(f"입력 경로를 읽을 수 없습니다: {path}")
+
+
+def _job_source(job):
+    """워커에서 분석할 대상 (폴더 안 파일은 경로 그대로 넘겨서 mmap 으로 읽음)"""
+    kind, arg = job
+    if kind == "path":
+        return arg
+    if kind == "zip":
+        archive, member = arg
+        with zipfile.ZipFile(archive) as zf:
+            return zf.read(member)
+    return arg
+
+
+# ================================
+# 워커
+# ================================
+def analyze_one(item):
+    """워커 프로세스에서 파일 하나 분석 → 출력 한 행(dict)"""
+    file_id, job, max_pages, timeout = item
+    started = time.perf_counter()
+    row = {"file": file_id, "error": None}
+    try:
+        # 워커 안에서 다시 프로세스 풀을 띄우지 않도록 workers=1 (워커 메인 스레드라 제한 시간은 SIGALRM 으로 쪽 도중에도 끊김)
+        result = analyze_registry_pdf_bytes(_job_source(job), max_pages=max_pages, timeout=timeout, workers=1)
+        registry = result["registry"]
+        row.update(
+            {
+                "pages": result["pages"],
+                "text_length": result["text_length"],
+                "mortgage_count": result["mortgage_count"],
+                "mortgage_total": result["mortgage_total"],
+                "active_mortgage_count": registry.count("근저당권", active_only=True),
+                "owner_lines": result["owner_lines"],
+                "warnings": result["warnings"],
+                "entries": [e.to_row() for e in registry.entries],
+            }
+        )
+    except Exception as e:
+        row.update({"pages": 0, "error": f"{type(e).__name__}: {e}"})
+    row["seconds"] = round(time.perf_counter() - started, 4)
+    return row
+
+
+# ================================
+# 출력 / 체크포인트
+# ================================
+class JsonlSink:
+    """
+    한 줄씩 바로 기록 (매 행마다 flush 해서 바로 체크포인트 가능)
+
+    resume 이면 체크포인트(done)에 오른 앞쪽 행까지만 남기고 이어 씀 — 쓰고 나서 체크포인트 전에 죽은 행,
+    반쯤 쓴 마지막 줄은 잘라 냄 (그 파일은 다시 분석됨). 잘라 낸 행 수는 self.dropped
+    """
+
+    def __init__(self, path, resume, done=frozenset()):
+        self.dropped = _truncate_jsonl(path, done) if resume else 0
+        self.f = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def write(self, row):
+        self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.f.flush()
+        return True  # 이 행까지 디스크에 반영됨
+
+    def close(self):
+        self.f.close()
+
+
+def _truncate_jsonl(path, done):
+    """체크포인트에 오른 행이 이어지는 데까지만 남기고 파일을 자름 → 잘라 낸 줄 수"""
+    keep = 0
+    dropped = 0
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                if not dropped and line.endswith(b"\n"):
+                    try:
+                        checkpointed = json.loads(line)["file"] in done
+                    except (ValueError, KeyError, TypeError):
+                        checkpointed = False
+                    if checkpointed:
+                        keep += len(line)
+                        continue
+                dropped += 1
+    except FileNotFoundError:
+        return 0
+    if dropped:
+        with open(path, "r+b") as f:
+            f.truncate(keep)
+    return dropped
+
+
+class ParquetSink:
+    """
+    PARQUET_CHUNK_ROWS 행마다 part-xxxxx.parquet 파일 하나씩 기록
+
+    Parquet 파일은 중간에 죽으면 통째로 못 읽게 되어서, 완성된 part 파일만
+    체크포인트에 반영되도록 폴더 + part 파일 방식으로 씀
+    resume 이면 마지막 part 파일에 체크포인트(done)에 없는 행이 있을 때 그 part 를 지움
+    (part 를 쓰고 체크포인트에 올리기 전에 죽은 경우 — 그 파일들은 다시 분석됨)
+    """
+
+    def __init__(self, path, resume, done=frozenset(), chunk_rows=PARQUET_CHUNK_ROWS):
+        import pandas as pd  # 필요할 때만 로드
+
+        self.pd = pd
+        self.dir = path
+        self.chunk_rows = chunk_rows
+        self.dropped = 0
+        os.makedirs(path, exist_ok=True)
+        parts = sorted(n for n in os.listdir(path) if n.startswith("part-") and n.endswith(".parquet"))
+        if not resume:
+            for name in parts:
+                os.remove(os.path.join(path, name))
+            parts = []
+        elif parts:
+            last = os.path.join(path, parts[-1])
+            files = pd.read_parquet(last, columns=["file"])["file"]
+            if not files.isin(done).all():
+                os.remove(last)
+                parts.pop()
+                self.dropped = len(files)
+        self.part = len(parts)
+        self.rows = []
+
+    def write(self, row):
+        row = dict(row)
+        # 리스트 컬럼은 JSON 문자열로 (행마다 타입이 섞여 있어서)
+        for key in ("owner_lines", "warnings", "entries"):
+            row[key] = json.dumps(row.get(key) or [], ensure_ascii=False)
+        self.rows.append(row)
+        if len(self.rows) >= self.chunk_rows:
+            self._flush()
+            return True
+        return False
+
+    def _flush(self):
+        if not self.rows:
+            return
+        tmp = os.path.join(self.dir, f".part-{self.part:05d}.tmp")
+        self.pd.DataFrame(self.rows).to_parquet(tmp, index=False)
+        os.replace(tmp, os.path.join(self.dir, f"part-{self.part:05d}.parquet"))
+        self.part += 1
+        self.rows = []
+
+    def close(self):
+        self._flush()
+
+
+def _drop_partial_line(path):
+    """마지막 줄이 줄바꿈 없이 끝났으면(쓰다가 죽음) 그 줄을 잘라 냄 — 이어 쓸 줄이 거기에 붙지 않도록"""
+    with open(path, "r+b") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        # 줄바꿈까지 쓰이지 못한 마지막 줄(쓰다가 죽음)은 빼고
+        return {line[:-1] for line in f if line.endswith("\n") and line.strip()}
+
+
+# ================================
+# 실행
+# ================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="등기부등본 PDF 일괄 분석")
+    parser.add_argument("input", help="PDF 폴더, .zip, .tar(.gz) 또는 PDF 파일 하나")
+    parser.add_argument("-o", "--output", default="registry_results.jsonl", help="출력 경로")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default=None, help="출력 형식 (기본: 확장자로 판단)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="워커 프로세스 수")
+    parser.add_argument("--resume", action="store_true", help="체크포인트에 있는 파일은 건너뛰고 이어서 실행")
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES, help="파일당 최대 페이지 수")
+    parser.add_argument("--timeout", type=float, default=EXTRACT_TIMEOUT, help="파일당 추출 제한 시간(초)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "jsonl")
+    checkpoint_path = args.output.rstrip("/\\") + ".checkpoint"
+    done = load_checkpoint(checkpoint_path) if args.resume else set()
+    if os.path.exists(checkpoint_path):
+        if args.resume:
+            _drop_partial_line(checkpoint_path)
+        else:
+            os.remove(checkpoint_path)
+
+    sink = (ParquetSink if fmt == "parquet" else JsonlSink)(args.output, args.resume, done)
+    if sink.dropped:
+        print(f"체크포인트에 오르지 못한 출력 {sink.dropped}행을 지우고 이어서 실행합니다.", file=sys.stderr)
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+
+    items = (
+        (file_id, job, args.max_pages, args.timeout)
+        for file_id, job in iter_inputs(args.input)
+        if file_id not in done
+    )
+
+    started = time.perf_counter()
+    last_report = started
+    files = pages = errors = 0
+    pending = []  # 출력에는 썼지만 아직 체크포인트에 안 올린 파일
+
+    def report(final=False):
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        print(
+            f"{'완료' if final else '진행'}: {files}개 파일 ({errors}개 오류), {pages}쪽 · "
+            f"{files / elapsed:.1f} files/sec · {pages / elapsed:.1f} pages/sec · {elapsed:.1f}초",
+            file=sys.stderr,
+        )
+
+    def handle(row):
+        nonlocal files, pages, errors, pending, last_report
+        files += 1
+        pages += row.get("pages") or 0
+        errors += row["error"] is not None
+        pending.append(row["file"])
+        if sink.write(row):
+            checkpoint.write("".join(f + "\n" for f in pending))
+            checkpoint.flush()
+            pending = []
+
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_EVERY:
+            report()
+            last_report = now
+
+    # imap_unordered 는 입력을 끝까지 미리 꺼내 가므로(tar 는 파일 내용까지) 직접 apply_async 로 넣고,
+    # 결과가 돌아와서 자리가 날 때만 다음 항목을 꺼냄
+    results = queue.Queue()
+    in_flight = 0
+    max_in_flight = max(1, args.workers) * IN_FLIGHT_PER_WORKER
+    with multiprocessing.Pool(args.workers, maxtasksperchild=200) as pool:
+        for item in items:
+            file_id = item[0]
+            pool.apply_async(
+                analyze_one,
+                (item,),
+                callback=results.put,
+                error_callback=lambda e, file_id=file_id: results.put(
+                    {"file": file_id, "error": f"{type(e).__name__}: {e}", "pages": 0, "seconds": 0.0}
+                ),
+            )
+            in_flight += 1
+            while in_flight >= max_in_flight:
+                handle(results.get())
+                in_flight -= 1
+        while in_flight:
+            handle(results.get())
+            in_flight -= 1
+
+    sink.close()
+    if pending:
+        checkpoint.write("".join(f + "\n" for f in pending))
+    checkpoint.close()
+
+    if done:
+        print(f"체크포인트로 건너뛴 파일: {len(done)}개", file=sys.stderr)
+    report(final=True)
+
+
+if __name__ == "__main__":
+    main()
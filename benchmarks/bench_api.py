@@ -0,0 +1,183 @@
+"""
+score_api.py 부하 측정 — 요청 종류별 지연 p50 / p99 와 초당 요청 수 (한 대에서)
+
+1) score_api.py 를 하위 프로세스로 띄우고 (--url 을 주면 이미 떠 있는 서버 사용)
+2) 시나리오마다 --concurrency 개 클라이언트 스레드가 --duration 초 동안 keep-alive 연결로 계속 요청
+3) 성공(2xx) 요청의 지연 분포, 초당 처리 수, 503(대기열 가득) 개수를 출력
+
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --workers 4 --queue 8 --concurrency 1 8 32 --duration 5
+    python benchmarks/bench_api.py --url http://127.0.0.1:8000 -k registry
+
+- 입력은 benchmarks/synthetic.py 가 seed 고정으로 만든 매물·등기부 (실행마다 같은 요청)
+- 503 은 서버가 backpressure 로 거절한 것이라 지연 통계에는 넣지 않고 따로 셈 (클라이언트는 바로 다음 요청)
+- 클라이언트도 같은 컴퓨터에서 돌므로 절대값보다는 설정끼리 비교용
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _listing_items(rows, seed=7):
+    table = synthetic.listing_table(rows, seed=seed)
+    items = []
+    for d, r, t, m, sale, market in zip(
+        table["보증금"], table["월세"], table["계약형태"], table["메모"], table["매매가"], table["전세시세"]
+    ):
+        item = {"deposit": int(d), "rent": int(r), "contract_type": t, "memo": m}
+        if sale > 0:
+            item["jeonse_rate_sale"] = round(float(d / sale * 100), 2)
+        if market > 0:
+            item["jeonse_rate_market"] = round(float(d / market * 100), 2)
+        items.append(item)
+    return items
+
+
+def scenarios():
+    """(이름, 경로, 본문 bytes, 헤더) 목록"""
+    one = _listing_items(1)[0]
+    return [
+        ("score 1건", "/score", json.dumps(one).encode(), JSON_HEADERS),
+        ("score 배치 50건 (이벤트 루프)", "/score", json.dumps({"listings": _listing_items(50)}).encode(), JSON_HEADERS),
+        ("score 배치 1000건 (프로세스 풀)", "/score", json.dumps({"listings": _listing_items(1000)}).encode(), JSON_HEADERS),
+        ("label 100개", "/label", json.dumps({"scores": list(range(0, 100))}).encode(), JSON_HEADERS),
+        ("grid 3×41×41", "/grid", json.dumps({
+            "deposits": list(range(0, 410_000_000, 10_000_000)),
+            "rents": list(range(0, 2_050_000, 50_000)),
+            "contract_types": ["전세", "반전세", "월세"],
+        }).encode(), JSON_HEADERS),
+        ("registry 텍스트 5쪽", "/registry", json.dumps({"text": synthetic.registry_text(5)}).encode(), JSON_HEADERS),
+        ("registry PDF 5쪽", "/registry", synthetic.registry_pdf(5), {"Content-Type": "application/pdf"}),
+    ]
+
+
+# ================================
+# 부하 생성
+# ================================
+def run_load(host, port, path, body, headers, concurrency, duration):
+    """→ (성공 지연 초 목록, 503 개수, 그 밖의 오류 개수, 실제 걸린 초)"""
+    latencies = []
+    rejected = [0]
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client():
+        conn = http.client.HTTPConnection(host, port, timeout=120)
+        mine = []
+        mine_rejected = mine_errors = 0
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                conn.request("POST", path, body, headers)
+                resp = conn.getresponse()
+                resp.read()
+            except (OSError, http.client.HTTPException):
+                mine_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=120)
+                continue
+            if resp.status == 503:
+                mine_rejected += 1
+            elif resp.status < 300:
+                mine.append(time.perf_counter() - started)
+            else:
+                mine_errors += 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            rejected[0] += mine_rejected
+            errors[0] += mine_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, rejected[0], errors[0], time.perf_counter() - started
+
+
+def wait_ready(host, port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=5)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"서버가 {timeout}초 안에 뜨지 않았습니다: {host}:{port}")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="score_api.py 부하 측정")
+    parser.add_argument("--url", help="이미 떠 있는 서버 (예: http://127.0.0.1:8000) · 없으면 직접 띄움")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="서버 워커 프로세스 수")
+    parser.add_argument("--queue", type=int, default=None, help="서버 대기열 크기 (기본: score_api.DEFAULT_QUEUE)")
+    parser.add_argument("-c", "--concurrency", type=int, nargs="+", default=[1, 8, 32], help="동시 클라이언트 수")
+    parser.add_argument("--duration", type=float, default=3.0, help="시나리오·동시 수 하나당 초")
+    parser.add_argument("-k", dest="pattern", help="이름에 이 글자가 들어간 시나리오만")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        cmd = [sys.executable, os.path.join(ROOT, "score_api.py"), "--host", host, "--port", str(port),
+               "--workers", str(args.workers)]
+        if args.queue is not None:
+            cmd += ["--queue", str(args.queue)]
+        server = subprocess.Popen(cmd, cwd=ROOT)
+    try:
+        wait_ready(host, port)
+        print(f"{host}:{port} · 서버 워커 {args.workers if server else '?'} · 시나리오당 {args.duration}초")
+        print(f"{'시나리오':<30}{'동시':>5}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'503':>8}{'오류':>6}")
+        for name, path, body, headers in scenarios():
+            if args.pattern and args.pattern not in name:
+                continue
+            run_load(host, port, path, body, headers, 1, 0.3)   # 워커·캐시 준비
+            for concurrency in args.concurrency:
+                latencies, rejected, errors, elapsed = run_load(
+                    host, port, path, body, headers, concurrency, args.duration
+                )
+                if latencies:
+                    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+                    worst = max(latencies) * 1000
+                else:
+                    p50 = p99 = worst = float("nan")
+                print(f"{name:<30}{concurrency:>5}{len(latencies) / elapsed:>10.1f}"
+                      f"{p50:>10.2f}{p99:>10.2f}{worst:>10.2f}{rejected:>8}{errors:>6}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+모듈 import 시간 (콜드 스타트) 측정 — 모듈마다 새 파이썬 프로세스에서 import 해서 잼
+
+배치 작업·테스트·PDF 추출 워커(spawn)는 시작할 때마다 kkangtong 을 새로 import 하므로,
+import 만 해도 numpy·pandas·plotly 를 읽어 버리면 그 시간이 매번 붙음 → 무거운 라이브러리는 처음 쓸 때 로드
+
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --before HEAD~1 --repeat 15
+    python benchmarks/bench_imports.py --importtime kkangtong.listings   # -X importtime 상위 항목
+
+- 모듈마다 --repeat 번 새 프로세스에서 import 해서 median / min (ms) 과, import 만 했을 때 같이 읽힌 무거운 라이브러리 표시
+- 인터프리터 시작 시간은 빼고 import 문 하나만 잼 (디스크 캐시 때문에 첫 번째 실행은 버림)
+- --before <git 커밋> 을 주면 그 커밋을 임시 worktree 로 꺼내 같은 측정을 하고 나란히 비교
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = [
+    "kkangtong.rules",
+    "kkangtong.scoring",
+    "kkangtong.listings",
+    "kkangtong.registry",
+    "kkangtong.pdf_pages",
+    "kkangtong.address",
+    "kkangtong.reviews",
+    "kkangtong.regions",
+    "kkangtong.uploads",
+    "kkangtong.ocr",
+    # 배열 색인 모듈 — import 할 때 numpy 를 읽는 것이 정상 (kkangtong/__init__.py 참고)
+    "kkangtong.market",
+    "kkangtong.spatial",
+    "kkangtong.review_search",
+    "mbti_charts",
+]
+HEAVY = ("numpy", "pandas", "plotly", "PyPDF2", "multiprocessing", "streamlit")
+
+_CHILD = """
+import sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def import_once(root, module):
+    code = _CHILD.format(root=root, module=module, heavy=HEAVY)
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, check=True, capture_output=True, text=True)
+    elapsed, _, loaded = out.stdout.strip().partition(" ")
+    return float(elapsed), loaded
+
+
+def measure(root, modules, repeat):
+    """{모듈: (median ms, min ms, 같이 읽힌 무거운 라이브러리)}"""
+    results = {}
+    for module in modules:
+        import_once(root, module)
+        times = []
+        for _ in range(repeat):
+            elapsed, loaded = import_once(root, module)
+            times.append(elapsed)
+        results[module] = (statistics.median(times), min(times), loaded)
+    return results
+
+
+def importtime(root, module, top=15):
+    """-X importtime 결과에서 누적 시간이 큰 순으로 top 개"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=root, check=True, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    rows.sort(reverse=True)
+    for cumulative, name in rows[:top]:
+        print(f"{cumulative / 1000:9.1f}ms {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모듈 콜드 import 시간")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--before", help="비교할 git 커밋 (예: HEAD~1)")
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--importtime", metavar="MODULE", help="이 모듈의 -X importtime 상위 항목만 출력")
+    args = parser.parse_args(argv)
+
+    if args.importtime:
+        importtime(ROOT, args.importtime)
+        return
+
+    after = measure(ROOT, args.modules, args.repeat)
+    before = None
+    if args.before:
+        with tempfile.TemporaryDirectory() as tmp:
+            worktree = os.path.join(tmp, "before")
+            subprocess.run(["git", "-C", ROOT, "worktree", "add", "--detach", worktree, args.before],
+                           check=True, capture_output=True)
+            try:
+                before = measure(worktree, args.modules, args.repeat)
+            finally:
+                subprocess.run(["git", "-C", ROOT, "worktree", "remove", "--force", worktree], check=True)
+
+    print(f"콜드 import 시간 (ms, {args.repeat}회 median)")
+    header = f"{'모듈':<22}"
+    if before is not None:
+        header += f"{args.before:>12} {'같이 로드':<28}"
+    print(header + f"{'지금':>10} {'같이 로드'}")
+    for module, (median, _, loaded) in after.items():
+        line = f"{module:<22}"
+        if before is not None:
+            b_median, _, b_loaded = before[module]
+            line += f"{b_median:>12.1f} {b_loaded or '-':<28}"
+        print(line + f"{median:>10.1f} {loaded or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+위젯 하나 바꿀 때 화면 다시 그리는 시간 (rerun 지연) 측정 — Streamlit AppTest 로 브라우저 없이 실행
+
+1) 주소·보증금을 넣어 둔 세션을 만들고
+2) 상호작용마다 (시뮬레이션 슬라이더, 체크리스트, 메인 보증금, 후기 페이지 넘기기, 탭 바꾸기)
+   값을 바꿔 가며 --repeat 번 다시 실행해서 median / p90 출력
+3) --before <git 커밋> 을 주면 그 커밋을 임시 worktree 로 꺼내 같은 측정을 하고 나란히 비교
+
+    python benchmarks/bench_reruns.py
+    python benchmarks/bench_reruns.py --before HEAD~1 --repeat 30
+
+- 브라우저에서는 st.fragment 안의 위젯을 바꾸면 그 fragment 만 다시 실행되지만,
+  AppTest 는 항상 전체 스크립트를 실행하므로 그 요청(RerunData)을 fragment 범위로 바꿔서 보냄
+  (fragment 가 없는 앱이면 그대로 전체 rerun)
+- AppTest 는 실행할 때마다 스크립트를 새로 컴파일하는데 (check.py 는 100ms 넘게 걸림) 실제 서버는 한 번 컴파일한
+  바이트코드를 계속 쓰므로, 측정할 때도 ScriptCache 하나를 같이 쓰게 함
+- 후기는 임시 SQLite 파일에 넣고 측정 (실제 .cache/reviews.sqlite3 는 건드리지 않음)
+- 앱마다 kkangtong 패키지를 따로 import 해야 하므로 앱 하나는 하위 프로세스 하나에서 측정
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDRESS = "서울 은평구 진관동 1"
+TABS = {
+    "main": "🏠 메인 (주소·위험도·지도)",
+    "check": "✅ 계약 전 체크리스트",
+    "review": "📝 집 후기",
+    "sim": "📊 조건 시뮬레이션",
+}
+SEED_REVIEWS = 200
+
+
+def fragment_ids(at):
+    """지금 등록된 fragment → {사용자 함수 이름: fragment id}"""
+    ids = {}
+    for fragment_id, wrapped in at._fragment_storage._fragments.items():
+        funcs = [c.cell_contents for c in (wrapped.__closure__ or ()) if callable(c.cell_contents)]
+        if funcs:
+            ids[getattr(funcs[-1], "__name__", "")] = fragment_id
+    return ids
+
+
+def share_script_cache():
+    """서버처럼 컴파일한 스크립트를 실행마다 다시 쓰도록 AppTest 의 ScriptCache 를 하나로 고정"""
+    import streamlit.testing.v1.app_test as app_test
+    import streamlit.testing.v1.local_script_runner as runner
+
+    shared = app_test.ScriptCache()
+    app_test.ScriptCache = runner.ScriptCache = lambda: shared
+
+
+@contextlib.contextmanager
+def fragment_scope(fragment_id):
+    """이 블록 안의 AppTest 실행을 fragment 하나만 다시 실행하는 요청으로 바꿈"""
+    if fragment_id is None:
+        yield
+        return
+    import streamlit.testing.v1.local_script_runner as runner
+
+    rerun_data = runner.RerunData
+
+    def scoped(**kwargs):
+        return rerun_data(fragment_id_queue=[fragment_id], is_fragment_scoped_rerun=True, **kwargs)
+
+    with mock.patch.object(runner, "RerunData", scoped):
+        yield
+
+
+def by_label(widgets, label):
+    return [w for w in widgets if w.label == label][0]
+
+
+# (이름, 탭, 그 위젯이 들어 있는 fragment 함수, 값 바꾸기)
+INTERACTIONS = [
+    ("시뮬레이션 보증금 슬라이더", "sim", "render_sim_tab",
+     lambda at, i: by_label(at.slider, "보증금 (원)").set_value(50_000_000 + (i % 20) * 5_000_000)),
+    ("체크리스트 체크", "check", "render_checklist_tab",
+     lambda at, i: at.checkbox(key="chk_owner_match").set_value(i % 2 == 0)),
+    ("메인 보증금 입력", "main", "render_main_tab",
+     lambda at, i: by_label(at.number_input, "보증금 (원)").set_value(150_000_000 + (i % 10) * 10_000_000)),
+    ("후기 페이지 넘기기", "review", "render_review_tab",
+     lambda at, i: [w for w in at.number_input if w.label.startswith("페이지 (1~")][0].set_value(i % 20 + 1)),
+    ("탭 바꾸기 (전체 rerun)", None, None, None),
+]
+
+
+def measure_app(app_path, repeat):
+    """앱 하나 측정 → {상호작용 이름: [초, ...]}"""
+    app_dir = os.path.dirname(os.path.abspath(app_path))
+    sys.path.insert(0, app_dir)
+    from kkangtong import reviews  # noqa: E402  (측정할 앱의 kkangtong)
+    from streamlit.testing.v1 import AppTest
+
+    share_script_cache()
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "reviews.sqlite3")
+    store = reviews.SqliteReviewStore(db_path)
+    for n in range(SEED_REVIEWS):
+        store.add_review(ADDRESS, {"rating": n % 5 + 1, "pros": f"채광 좋아요 {n}", "cons": "층간소음", "noise_issue": n % 3 == 0})
+    store.close()
+    # 앱이 만드는 저장소도 임시 파일을 쓰도록
+    reviews.SqliteReviewStore.__init__.__defaults__ = (db_path,) + reviews.SqliteReviewStore.__init__.__defaults__[1:]
+
+    results = {}
+    for name, tab, fragment_name, change in INTERACTIONS:
+        at = AppTest.from_file(app_path, default_timeout=120)
+        active = [TABS["main"]]
+        run = at._run
+
+        def run_in_tab(*args, _run=run, _active=active, _at=at, **kwargs):
+            _at.session_state["active_tab"] = _active[0]
+            return _run(*args, **kwargs)
+
+        at._run = run_in_tab
+        at.run()
+        by_label(at.text_input, "집 주소").set_value(ADDRESS).run()
+        by_label(at.number_input, "보증금 (원)").set_value(200_000_000).run()
+        if tab is not None:
+            active[0] = TABS[tab]
+            at.run()
+
+        latencies = []
+        for i in range(repeat + 1):
+            if change is None:
+                active[0] = TABS["sim" if i % 2 else "main"]
+                started = time.perf_counter()
+                at.run()
+            else:
+                change(at, i + 1)
+                with fragment_scope(fragment_ids(at).get(fragment_name)):
+                    started = time.perf_counter()
+                    at.run()
+            elapsed = time.perf_counter() - started
+            if at.exception:
+                raise RuntimeError(f"{name}: {at.exception[0].value}")
+            if i:  # 첫 번째는 캐시 채우기
+                latencies.append(elapsed)
+        results[name] = latencies
+    return results
+
+
+def summarize(latencies):
+    median, p90 = np.percentile(latencies, [50, 90]) * 1000
+    return median, p90
+
+
+def run_child(app_path, repeat):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--app", app_path, "--repeat", str(repeat), "--json"],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default=os.path.join(ROOT, "check.py"))
+    parser.add_argument("--before", help="비교할 git 커밋 (예: HEAD~1)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.json:
+        # 하위 프로세스: Streamlit 로그는 stderr 로, 결과만 stdout 으로
+        results = measure_app(args.app, args.repeat)
+        print(json.dumps(results))
+        return
+
+    after = run_child(args.app, args.repeat)
+    before = None
+    if args.before:
+        with tempfile.TemporaryDirectory() as tmp:
+            worktree = os.path.join(tmp, "before")
+            subprocess.run(["git", "-C", ROOT, "worktree", "add", "--detach", worktree, args.before],
+                           check=True, capture_output=True)
+            try:
+                app = os.path.join(worktree, os.path.relpath(os.path.abspath(args.app), ROOT))
+                before = run_child(app, args.repeat)
+            finally:
+                subprocess.run(["git", "-C", ROOT, "worktree", "remove", "--force", worktree], check=True)
+
+    print(f"rerun 지연 (ms, {args.repeat}회)")
+    header = f"{'상호작용':<24}"
+    if before is not None:
+        header += f"{args.before + ' median':>18} {'p90':>8}"
+    print(header + f"{'지금 median':>14} {'p90':>8}")
+    for name in after:
+        line = f"{name:<24}"
+        if before is not None:
+            line += "{:>18.1f} {:>8.1f}".format(*summarize(before[name]))
+        print(line + "{:>14.1f} {:>8.1f}".format(*summarize(after[name])))
+
+
+if __name__ == "__main__":
+    main()
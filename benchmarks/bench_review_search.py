@@ -0,0 +1,137 @@
+"""
+후기 n-gram 역색인 검색 vs 전체 후기 문자열 훑기 비교
+
+1) 무작위 한국어 후기 N개(기본 12만)로 색인을 만들고 만드는 시간·postings 크기 출력
+2) 검색어마다 색인 결과가 전체 훑기(낱말이 모두 들어 있는 후기 + 필터)와 같은지 확인 (다르면 AssertionError)
+3) 검색 지연 p50 / p99 와 전체 훑기 시간 출력
+4) --sqlite 를 주면 임시 SQLite 저장소에 넣고 sync() 로 따라 읽는 시간도 측정
+
+    python benchmarks/bench_review_search.py --reviews 120000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kkangtong.review_search import ReviewSearchIndex, normalize_search_text, query_terms  # noqa: E402
+from kkangtong.reviews import REVIEW_FLAGS, SqliteReviewStore  # noqa: E402
+
+PHRASES = [
+    "층간소음이 심해서 밤에 시끄러웠어요", "층간 소음은 거의 없었어요", "역이 가깝고 채광이 좋아요",
+    "집주인 연락 두절돼서 고생했어요", "집주인이 친절하고 수리도 빨리 해줬어요", "겨울에 곰팡이가 많이 폈어요",
+    "화장실 누수가 있었어요", "바퀴벌레가 가끔 나와요", "편의점이 바로 앞이라 편해요", "버스 정류장이 멀어요",
+    "관리비가 생각보다 비싸요", "보증금 반환이 늦었어요", "창문 단열이 안 돼서 추워요", "주차 공간이 부족해요",
+    "공원이 가까워서 산책하기 좋아요", "윗집 발소리가 들려요", "수압이 약해요", "남향이라 따뜻해요",
+    "엘리베이터가 자주 고장나요", "도배 장판 상태가 좋았어요", "근처 술집 때문에 밤에 시끄러워요",
+]
+QUERIES = [
+    ("층간소음", {}), ("층간 소음", {}), ("집주인 연락 두절", {}), ("곰팡이", {"max_rating": 2}),
+    ("누수", {"flags": ["mold_issue"]}), ("소음", {"min_rating": 4}), ("역", {}), ("채광", {}),
+    ("보증금 반환", {}), ("엘리베이터 고장", {}), ("없는말입니다", {}), ("시끄러 밤", {"flags": ["noise_issue"]}),
+]
+
+
+def random_reviews(n, seed=0):
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, 4, size=(n, 2))
+    reviews = []
+    for i in range(n):
+        review = {
+            "id": i + 1,
+            "address_key": f"서울 은평구 진관동 {rng.integers(1, 2000)}",
+            "rating": int(rng.integers(1, 6)),
+            "pros": " ".join(rng.choice(PHRASES, counts[i, 0])),
+            "cons": " ".join(rng.choice(PHRASES, counts[i, 1])),
+        }
+        for name, _ in REVIEW_FLAGS:
+            review[name] = bool(rng.random() < 0.2)
+        reviews.append(review)
+    return reviews
+
+
+def brute_force(reviews, texts, query, min_rating=None, max_rating=None, flags=()):
+    terms = query_terms(query)
+    if not terms:
+        return set()
+    matched = set()
+    for review, text in zip(reviews, texts):
+        if not all(t in text for t in terms):
+            continue
+        if min_rating is not None and review["rating"] < min_rating:
+            continue
+        if max_rating is not None and review["rating"] > max_rating:
+            continue
+        if not all(review[f] for f in flags):
+            continue
+        matched.add(review["id"])
+    return matched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=120_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--sqlite", action="store_true", help="SQLite 저장소에서 sync() 로 읽는 시간도 측정")
+    args = parser.parse_args(argv)
+
+    reviews = random_reviews(args.reviews)
+    print(f"reviews: {len(reviews):,}")
+
+    index = ReviewSearchIndex()
+    started = time.perf_counter()
+    for review in reviews:
+        index.add(review)
+    build = time.perf_counter() - started
+    postings = sum(len(docs) for docs, _ in index.postings.values())
+    print(f"색인 만들기: {build:.1f}초 · n-gram {len(index.postings):,}개 · postings {postings:,}개")
+
+    texts = [normalize_search_text(f"{r['pros']}\n{r['cons']}") for r in reviews]
+    for query, filters in QUERIES:
+        started = time.perf_counter()
+        expected = brute_force(reviews, texts, query, **filters)
+        scan = time.perf_counter() - started
+
+        result = index.search(query, limit=len(reviews), **filters)
+        got = {review_id for review_id, _ in result["hits"]}
+        if not result["partial"]:
+            assert got == expected, (query, filters, len(got), len(expected))
+            assert result["total"] == len(expected)
+
+        latencies = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            index.search(query, **filters)
+            latencies.append(time.perf_counter() - started)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        label = f"{query!r} {filters or ''}".strip()
+        print(
+            f"{label:<44} 맞은 후기 {result['total']:>7,}{' (일부)' if result['partial'] else '      '}"
+            f" · 색인 p50 {p50:6.2f}ms p99 {p99:6.2f}ms · 전체 훑기 {scan * 1000:7.1f}ms"
+        )
+
+    if args.sqlite:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SqliteReviewStore(os.path.join(tmp, "reviews.sqlite3"))
+            started = time.perf_counter()
+            for review in reviews:
+                store.add_review(review["address_key"], review)
+            insert = time.perf_counter() - started
+            synced = ReviewSearchIndex(store)
+            started = time.perf_counter()
+            synced.sync()
+            sync = time.perf_counter() - started
+            print(f"SQLite 저장 {insert:.1f}초 ({len(reviews) / insert:,.0f}건/초) · sync() 로 색인 {sync:.1f}초")
+            store.add_review("서울 은평구 진관동 1", {"rating": 3, "pros": "새 후기 층간소음"})
+            started = time.perf_counter()
+            added = synced.sync()
+            print(f"새 후기 {added}건 증분 sync: {(time.perf_counter() - started) * 1000:.2f}ms")
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+compute_risk_score(한 건씩) vs compute_risk_scores(배열) 속도 비교 — 각각 초당 몇 건(rows/sec) 계산하는지 출력
+
+    python benchmarks/bench_risk_score.py --rows 200000
+
+두 함수 결과가 같은지는 tests/test_scoring.py (pytest) 에서 확인
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kkangtong.rules import get_rules  # noqa: E402
+from kkangtong.scoring import (  # noqa: E402
+    compute_risk_score,
+    compute_risk_scores,
+    match_memo_keywords,
+    memo_keyword_scores,
+)
+
+
+def random_listings(n, seed=0):
+    """경계값(60, 80, 100, 1억5천 등)이 자주 나오도록 섞은 무작위 매물"""
+    rng = np.random.default_rng(seed)
+    deposit = rng.choice(
+        [0, -1, 49_999_999, 50_000_000, 149_999_999, 150_000_000, *rng.integers(1, 400_000_000, 20)], n
+    )
+    rent = rng.choice([0, 999_999, 1_000_000, 1_999_999, 2_000_000, *rng.integers(0, 3_000_000, 20)], n)
+    contract_type = rng.choice(["전세", "반전세", "월세", "기타"], n)
+    sale = rng.choice([None, 0, -5, 59.99, 60, 79.9, 80, 89.99, 90, 150, *rng.uniform(1, 130, 20)], n)
+    market = rng.choice([None, 0, 100, 100.01, 110, 110.5, 120, 120.01, *rng.uniform(50, 160, 20)], n)
+    words = list(get_rules().memo_keywords) + ["", "깨끗함", "남향", "역세권"]
+    memo = [" ".join(rng.choice(words, rng.integers(0, 4))) for _ in range(n)]
+    return deposit, rent, contract_type, memo, sale, market
+
+
+def bench(n):
+    deposit, rent, contract_type, memo, sale, market = random_listings(n, seed=1)
+
+    started = time.perf_counter()
+    for i in range(n):
+        compute_risk_score(deposit[i], rent[i], contract_type[i], memo[i], sale[i], market[i])
+    scalar = time.perf_counter() - started
+
+    started = time.perf_counter()
+    compute_risk_scores(deposit, rent, contract_type, memo, sale, market)
+    batch = time.perf_counter() - started
+
+    print(f"rows: {n:,}")
+    print(f"compute_risk_score  (한 건씩): {n / scalar:>12,.0f} rows/sec ({scalar:.3f}초)")
+    print(f"compute_risk_scores (배열)   : {n / batch:>12,.0f} rows/sec ({batch:.3f}초) · {scalar / batch:.1f}배")
+
+
+def bench_memo(n, seed=2):
+    """후기·매물 설명처럼 긴 메모(키워드는 가끔)로 메모 점수만 비교"""
+    rng = np.random.default_rng(seed)
+    filler = ["채광이 좋고", "역까지 걸어서 7분", "관리비는 10만원 정도", "집주인이 친절했어요", "주차는 어려워요"]
+    keywords = get_rules().memo_keywords
+    words = list(keywords)
+    memos = []
+    for _ in range(n):
+        parts = list(rng.choice(filler, 6))
+        if rng.random() < 0.3:
+            parts.insert(int(rng.integers(0, 6)), str(rng.choice(words)))
+        memos.append(" ".join(parts))
+
+    started = time.perf_counter()
+    for m in memos:
+        # compute_risk_score 의 메모 부분과 같은 결과(점수 합 + 위험 요소 목록)를 만듦
+        matched = match_memo_keywords(m)
+        sum(keywords[k][0] for k in matched)
+        sorted({keywords[k][1] for k in matched})
+    one_by_one = time.perf_counter() - started
+
+    started = time.perf_counter()
+    memo_keyword_scores(memos)
+    batch = time.perf_counter() - started
+
+    print(f"memo rows: {n:,}")
+    print(f"match_memo_keywords (한 건씩): {n / one_by_one:>12,.0f} rows/sec ({one_by_one:.3f}초)")
+    print(f"memo_keyword_scores (한 번에): {n / batch:>12,.0f} rows/sec ({batch:.3f}초) · {one_by_one / batch:.1f}배")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="위험도 점수 한 건씩 vs 배열 속도 비교")
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    bench(args.rows)
+    bench_memo(args.rows)
+
+
+if __name__ == "__main__":
+    main()
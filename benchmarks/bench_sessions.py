@@ -0,0 +1,341 @@
+"""
+동시 세션 부하 측정 — 세션 수 N 이 늘 때 메모리(RSS)·rerun 지연·처리량이 어떻게 늘어나는지 (AppTest, 브라우저 없이)
+
+1) N 마다 새 하위 프로세스에서, 세션 하나를 끝까지 돌려 import·캐시를 채운 뒤 RSS 를 기준으로 재고
+2) 세션 N 개(AppTest N 개)를 만들어 각 세션이 같은 시나리오를 진행 — 단계마다 N 개 세션이 한 번씩
+   (--threads 개 스레드로 동시에, 1 이면 돌아가며) rerun 하므로 사용자 N 명이 번갈아 조작하는 것과 비슷함
+3) 시나리오가 끝난 뒤 세션을 모두 살려 둔 채 RSS 를 다시 재서 세션당 메모리, 모든 rerun 의 지연 분포, 초당 rerun 수 출력
+
+    python benchmarks/bench_sessions.py                              # check.py, N = 1 5 10 25
+    python benchmarks/bench_sessions.py --sessions 1 10 50 100 --threads 4
+    python benchmarks/bench_sessions.py --app main.py --sessions 1 50 200
+    python benchmarks/bench_sessions.py --steps                      # 단계별 p50 표도 출력
+
+check.py 시나리오 (세션마다)
+- 처음 열기 → 주소·보증금 입력 → 등기부 PDF 업로드 (세션마다 다른 가짜 PDF, --pages 쪽) → 위험도 스캔
+- 조건 시뮬레이션 탭 → 보증금 슬라이더 --sweeps 번 → 후기 탭 → 후기 등록 → 메인 탭으로 돌아오기
+main.py 시나리오: 처음 열기 → 국가 선택 --sweeps 번 (CSV 는 synthetic.mbti_table 로 임시 폴더에 만듦)
+
+- fragment 안 위젯(슬라이더·후기 등록)은 bench_reruns.py 처럼 그 fragment 만 다시 실행하는 요청으로 보냄
+- --threads 로 여러 세션을 동시에 실행할 때는 AppTest 의 전역 상태를 스레드에 안전하게 바꿔 둠 (allow_concurrent_apptests)
+- 후기 DB·등기부 캐시는 임시 폴더를 씀 (실제 .cache 는 건드리지 않음)
+- 세션 메모리 = (시나리오 뒤 RSS − 기준 RSS) / N · session_state 만 pickle 한 크기도 같이 출력
+  (AppTest 는 화면 요소 트리도 들고 있어서 실제 서버 세션보다 조금 큼 · RSS 는 Linux /proc 기준)
+"""
+import argparse
+import concurrent.futures
+import gc
+import json
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from bench_reruns import TABS, by_label, fragment_ids, share_script_cache  # noqa: E402
+
+ADDRESSES = 20          # 세션들이 나눠 쓰는 주소 수 (같은 주소 후기·통계를 같이 봄)
+SEED_REVIEWS = 50       # 주소마다 미리 넣어 둘 후기 수
+
+
+def rss_bytes():
+    """지금 프로세스 RSS (Linux 가 아니면 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def session_state_bytes(at):
+    """session_state 값들을 pickle 한 크기 합 (pickle 안 되는 값은 뺌)"""
+    total = 0
+    for value in at.session_state.values():
+        try:
+            total += len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            pass
+    return total
+
+
+# ================================
+# AppTest 를 여러 스레드에서 같이 돌리기 위한 준비
+# ================================
+_scope = threading.local()
+
+
+def allow_concurrent_apptests():
+    """
+    AppTest 는 한 번에 하나만 실행한다고 가정하고 전역 상태를 바꿈 → 스레드 여러 개에서 동시에 실행할 수 있게 고침
+
+    - 실행이 끝날 때마다 Runtime._instance 를 None 으로 지움 → 다른 세션 실행 도중에 Runtime 이 사라지지 않도록
+      마지막으로 만든 가짜 Runtime 을 계속 돌려줌
+    - global.appTest 설정을 실행마다 켰다 되돌림 → 처음부터 켜 둠
+    - fragment 범위 rerun 요청(bench_reruns.fragment_scope 는 모듈 전역을 바꿈)은 스레드마다 따로 정함
+      (RerunData 는 at.run() 을 부른 스레드에서 만들어짐)
+    """
+    import streamlit.testing.v1.local_script_runner as runner
+    from streamlit import config
+    from streamlit.runtime.runtime import Runtime
+
+    config.set_option("global.appTest", True)
+
+    last = [None]
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[0] = cls._instance
+        if last[0] is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or last[0] is not None)
+
+    rerun_data = runner.RerunData
+
+    def scoped(**kwargs):
+        fragment_id = getattr(_scope, "fragment_id", None)
+        if fragment_id is None:
+            return rerun_data(**kwargs)
+        return rerun_data(fragment_id_queue=[fragment_id], is_fragment_scoped_rerun=True, **kwargs)
+
+    runner.RerunData = scoped
+
+
+# ================================
+# 시나리오
+# ================================
+class Session:
+    """AppTest 하나 = 사용자 하나 (활성 탭을 직접 정함)"""
+
+    def __init__(self, app_path, index):
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self.at = AppTest.from_file(app_path, default_timeout=120)
+        self.tab = TABS["main"]
+        run = self.at._run
+
+        def run_in_tab(*args, **kwargs):
+            self.at.session_state["active_tab"] = self.tab
+            return run(*args, **kwargs)
+
+        self.at._run = run_in_tab
+
+    def rerun(self, fragment_name=None):
+        _scope.fragment_id = fragment_ids(self.at).get(fragment_name) if fragment_name else None
+        try:
+            started = time.perf_counter()
+            self.at.run()
+            elapsed = time.perf_counter() - started
+        finally:
+            _scope.fragment_id = None
+        if self.at.exception:
+            raise RuntimeError(f"세션 {self.index}: {self.at.exception[0].value}")
+        return elapsed
+
+
+def check_steps(pages, sweeps):
+    """(단계 이름, 위젯 바꾸기 → 다시 실행할 fragment 이름 또는 None) 목록"""
+    def address(s):
+        by_label(s.at.text_input, "집 주소").set_value(f"서울 은평구 진관동 {s.index % ADDRESSES + 1}")
+
+    def deposit(s):
+        by_label(s.at.number_input, "보증금 (원)").set_value(150_000_000 + s.index % 10 * 10_000_000)
+
+    def upload(s):
+        pdf = synthetic.registry_pdf(pages, seed=s.index)
+        s.at.file_uploader(key="registry_file").set_value((f"registry_{s.index}.pdf", pdf, "application/pdf"))
+
+    def scan(s):
+        by_label(s.at.button, "위험도 스캔하기").click()
+
+    def tab(name):
+        def switch(s):
+            s.tab = TABS[name]
+        return switch
+
+    def sweep(i):
+        def change(s):
+            by_label(s.at.slider, "보증금 (원)").set_value(50_000_000 + (s.index + i) % 20 * 10_000_000)
+            return "render_sim_tab"
+        return change
+
+    def post_review(s):
+        by_label(s.at.text_area, "좋았던 점").set_value(f"채광 좋아요 (세션 {s.index})")
+        by_label(s.at.button, "후기 등록하기").click()
+        return "render_review_tab"
+
+    return [
+        ("open", lambda s: None),
+        ("address", address),
+        ("deposit", deposit),
+        ("upload", upload),
+        ("scan", scan),
+        ("tab sim", tab("sim")),
+        *[("slider", sweep(i)) for i in range(sweeps)],
+        ("tab review", tab("review")),
+        ("review post", post_review),
+        ("tab main", tab("main")),
+    ]
+
+
+def main_steps(pages, sweeps):
+    def country(i):
+        def change(s):
+            s.at.sidebar.selectbox[0].set_value(f"Country {(s.index * 7 + i) % 160:03d}")
+        return change
+
+    return [("open", lambda s: None), *[("country", country(i)) for i in range(sweeps)]]
+
+
+SCENARIOS = {"check.py": check_steps, "main.py": main_steps}
+
+
+def prepare_environment(app_name):
+    """임시 후기 DB·등기부 캐시 (check.py) 또는 MBTI CSV (main.py)"""
+    tmp = tempfile.mkdtemp()
+    if app_name == "main.py":
+        synthetic.mbti_table().to_csv(os.path.join(tmp, "countriesMBTI_16types.csv"), index=False)
+        os.chdir(tmp)
+        return
+
+    from kkangtong import registry, reviews
+
+    db_path = os.path.join(tmp, "reviews.sqlite3")
+    store = reviews.SqliteReviewStore(db_path)
+    for a in range(ADDRESSES):
+        for n in range(SEED_REVIEWS):
+            store.add_review(f"서울 은평구 진관동 {a + 1}", {"rating": n % 5 + 1, "pros": f"역이 가까워요 {n}", "cons": "층간소음"})
+    store.close()
+    reviews.SqliteReviewStore.__init__.__defaults__ = (db_path,) + reviews.SqliteReviewStore.__init__.__defaults__[1:]
+    registry.REGISTRY_CACHE_DIR = os.path.join(tmp, "registry")
+
+
+def run_sessions(app_path, n, threads, pages, sweeps):
+    """하위 프로세스 안에서: 세션 n 개로 시나리오 실행 → 결과 dict"""
+    app_name = os.path.basename(app_path)
+    prepare_environment(app_name)
+    share_script_cache()
+    allow_concurrent_apptests()
+    steps = SCENARIOS[app_name](pages, sweeps)
+
+    def play(sessions, latencies, pool):
+        for name, change in steps:
+            def one(s):
+                fragment_name = change(s)
+                return s.rerun(fragment_name)
+
+            elapsed = list(pool.map(one, sessions)) if pool else [one(s) for s in sessions]
+            latencies.setdefault(name, []).extend(elapsed)
+
+    # 세션 하나로 import·캐시·컴파일을 다 채우고 나서 기준 RSS (등기부가 겹치지 않게 세션 번호는 n)
+    warm = [Session(app_path, n)]
+    play(warm, {}, None)
+    del warm
+    gc.collect()
+    base_rss = rss_bytes()
+
+    sessions = [Session(app_path, i) for i in range(n)]
+    latencies = {}
+    pool = concurrent.futures.ThreadPoolExecutor(threads) if threads > 1 else None
+    started = time.perf_counter()
+    try:
+        play(sessions, latencies, pool)
+    finally:
+        if pool:
+            pool.shutdown()
+    wall = time.perf_counter() - started
+    gc.collect()
+    rss = rss_bytes()
+    return {
+        "sessions": n,
+        "threads": threads,
+        "wall": wall,
+        "base_rss": base_rss,
+        "rss": rss,
+        "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "state_bytes": [session_state_bytes(s.at) for s in sessions],
+        "latencies": latencies,
+    }
+
+
+# ================================
+# 실행 / 출력
+# ================================
+def run_child(app_path, n, args):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--app", app_path, "--sessions", str(n),
+         "--threads", str(args.threads), "--pages", str(args.pages), "--sweeps", str(args.sweeps), "--json"],
+        capture_output=True, text=True,
+    )
+    if out.returncode:
+        raise SystemExit(f"N={n} 측정 실패\n" + "\n".join(out.stderr.splitlines()[-15:]))
+    return json.loads(out.stdout)
+
+
+def report(results, show_steps):
+    mb = 1024 * 1024
+    print(f"{'세션':>5}{'rerun':>8}{'rerun/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'RSS MB':>9}{'세션당 MB':>10}{'state KB':>10}")
+    for r in results:
+        all_ms = np.concatenate([np.asarray(v) for v in r["latencies"].values()]) * 1000
+        p50, p90, p99 = np.percentile(all_ms, [50, 90, 99])
+        per_session = (r["rss"] - r["base_rss"]) / r["sessions"] / mb
+        print(f"{r['sessions']:>5}{len(all_ms):>8}{len(all_ms) / r['wall']:>9.1f}{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}"
+              f"{all_ms.max():>9.1f}{r['rss'] / mb:>9.1f}{per_session:>10.2f}{np.mean(r['state_bytes']) / 1024:>10.1f}")
+
+    if show_steps:
+        print("\n단계별 p50 ms (p99)")
+        print(f"{'단계':<14}" + "".join(f"{'N=' + str(r['sessions']):>16}" for r in results))
+        for name in results[0]["latencies"]:
+            cells = []
+            for r in results:
+                p50, p99 = np.percentile(np.asarray(r["latencies"][name]) * 1000, [50, 99])
+                cells.append(f"{p50:>8.1f} ({p99:>5.0f})")
+            print(f"{name:<14}" + "".join(f"{c:>16}" for c in cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="동시 세션 부하 측정 (AppTest)")
+    parser.add_argument("--app", default="check.py", help="check.py 또는 main.py")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25], help="세션 수 N")
+    parser.add_argument("--threads", type=int, default=1, help="동시에 rerun 하는 스레드 수 (1 이면 세션을 돌아가며)")
+    parser.add_argument("--pages", type=int, default=5, help="세션마다 올리는 가짜 등기부 쪽수")
+    parser.add_argument("--sweeps", type=int, default=5, help="슬라이더·국가 선택을 바꾸는 횟수")
+    parser.add_argument("--steps", action="store_true", help="단계별 지연 표도 출력")
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    app_path = args.app if os.path.isabs(args.app) else os.path.join(ROOT, args.app)
+    if os.path.basename(app_path) not in SCENARIOS:
+        raise SystemExit(f"시나리오가 없는 앱입니다: {args.app} (가능: {', '.join(SCENARIOS)})")
+
+    if args.json:
+        # 하위 프로세스: Streamlit 로그는 stderr 로, 결과만 stdout 으로
+        print(json.dumps(run_sessions(app_path, args.sessions[0], args.threads, args.pages, args.sweeps)))
+        return
+
+    results = []
+    for n in args.sessions:
+        print(f"N={n} 측정 중…", file=sys.stderr)
+        results.append(run_child(app_path, n, args))
+    app_name = os.path.basename(app_path)
+    pages = f" · 등기부 {args.pages}쪽" if app_name == "check.py" else ""
+    print(f"{app_name} · 스레드 {args.threads}{pages} · sweep {args.sweeps}회")
+    report(results, args.steps)
+
+
+if __name__ == "__main__":
+    main()
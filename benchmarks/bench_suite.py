@@ -0,0 +1,335 @@
+"""
+주요 함수 벤치마크 모음 → 커밋별 결과 JSON 저장 + 이전 결과와 비교
+
+대상
+- 등기부: extract_text_from_registry_file (가짜 PDF 1·5·20쪽), analyze_registry_text (같은 텍스트)
+  extract_text_thread 는 Streamlit 처럼 메인이 아닌 스레드에서 추출 (공유 추출 워커 경로)
+- 점수: compute_risk_score (한 건씩), score_listing_file (가짜 매물 목록 CSV)
+- 주소: normalize_address (캐시 없이), jibun_key, review_address_key
+- 그래프: main.py / 01_MBTI국가.py 의 Plotly Figure 만들기 (mbti_charts.py)
+
+    python benchmarks/bench_suite.py                       # 전부 실행 → .cache/bench/<커밋>.json
+    python benchmarks/bench_suite.py -k registry           # 이름에 registry 가 들어간 것만
+    python benchmarks/bench_suite.py --compare 3239a80     # 그 커밋 결과와 비교 (파일 경로도 가능)
+    python benchmarks/bench_suite.py --list
+
+- 항목마다 rounds 번 재서 호출 한 번당 median / min / p90 (ms) 를 저장
+- 비교할 때는 median 기준으로 --threshold (기본 10%) 이상 느려진 항목에 표시, --fail 이면 종료 코드 1
+- 입력은 benchmarks/synthetic.py 가 seed 고정으로 만들어서 커밋끼리 같은 입력
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, ".cache", "bench")
+TARGET_ROUND_SECONDS = 0.05   # 한 round 가 이 정도 걸리도록 호출 횟수를 정함
+
+
+# ================================
+# 벤치마크 항목
+# ================================
+# 항목 = (이름, 준비 함수) · 준비 함수는 인자 없는 측정 대상 함수를 돌려줌 (준비 시간은 재지 않음)
+CASES = []
+
+
+def case(name):
+    def register(setup):
+        CASES.append((name, setup))
+        return setup
+    return register
+
+
+def _registry_pdf_case(pages):
+    def setup():
+        from kkangtong.registry import extract_text_from_registry_file
+
+        data = synthetic.registry_pdf(pages)
+        return lambda: extract_text_from_registry_file(synthetic.SyntheticUpload(data))
+    return setup
+
+
+def _registry_pdf_thread_case(pages):
+    def setup():
+        import threading
+
+        from kkangtong.pdf_pages import start_extract_pool
+        from kkangtong.registry import extract_text_from_registry_file
+
+        data = synthetic.registry_pdf(pages)
+        start_extract_pool()  # 앱은 서버가 뜰 때 미리 띄워 둠
+
+        def run():
+            errors = []
+
+            def target():
+                try:
+                    extract_text_from_registry_file(synthetic.SyntheticUpload(data))
+                except BaseException as e:  # noqa: BLE001 - 스레드 밖으로 넘겨서 실패로 잡히게
+                    errors.append(e)
+
+            t = threading.Thread(target=target)
+            t.start()
+            t.join()
+            if errors:
+                raise errors[0]
+        return run
+    return setup
+
+
+def _registry_text_case(pages):
+    def setup():
+        from kkangtong.registry import analyze_registry_text
+
+        text = synthetic.registry_text(pages)
+        return lambda: analyze_registry_text(text)
+    return setup
+
+
+for _pages in (1, 5, 20):
+    case(f"registry.extract_text[{_pages}p]")(_registry_pdf_case(_pages))
+    case(f"registry.extract_text_thread[{_pages}p]")(_registry_pdf_thread_case(_pages))
+    case(f"registry.analyze_text[{_pages}p]")(_registry_text_case(_pages))
+
+
+@case("scoring.compute_risk_score")
+def _compute_risk_score():
+    from kkangtong.rules import get_rules
+    from kkangtong.scoring import compute_risk_score
+
+    rules = get_rules()
+    rows = synthetic.listing_table(1000, seed=1)
+    sale = np.where(rows["매매가"] > 0, rows["보증금"] / rows["매매가"].clip(lower=1) * 100, np.nan)
+    market = np.where(rows["전세시세"] > 0, rows["보증금"] / rows["전세시세"].clip(lower=1) * 100, np.nan)
+    inputs = [
+        (int(d), int(r), t, m, None if np.isnan(s) else float(s), None if np.isnan(k) else float(k))
+        for d, r, t, m, s, k in zip(rows["보증금"], rows["월세"], rows["계약형태"], rows["메모"], sale, market)
+    ]
+
+    def run():
+        for d, r, t, m, s, k in inputs:
+            compute_risk_score(d, r, t, m, jeonse_rate_sale=s, jeonse_rate_market=k, rules=rules)
+    run.calls = len(inputs)
+    return run
+
+
+def _listing_case(rows):
+    def setup():
+        import io
+
+        from kkangtong.listings import score_listing_file
+
+        data = synthetic.listing_csv(rows)
+        return lambda: score_listing_file(io.BytesIO(data), "listings.csv")
+    return setup
+
+
+for _rows in (1_000, 50_000):
+    case(f"listings.score_file[{_rows}]")(_listing_case(_rows))
+
+
+_ADDRESSES = [
+    "서울특별시 은평구 진관동 123-4", "서울 마포구 망원동 400", "경기도 수원시 장안구 정자동 12",
+    "부산광역시 해운대구 우동 1408", "서울 중구 신당동 77-1 302호", "세종특별자치시 한누리대로 2130",
+    "서울 관악구 신림로 340", "인천 남동구 구월동 1138", "대구 수성구 범어동 200-3", "서울시 은평구 진관2로 10",
+]
+
+
+@case("address.normalize_address")
+def _normalize_address():
+    from kkangtong.address import get_district_index, normalize_address
+
+    index = get_district_index()   # 트라이 만드는 시간은 빼고, 캐시(lru_cache) 없이 정규화만
+
+    def run():
+        for a in _ADDRESSES:
+            normalize_address(a, index=index)
+    run.calls = len(_ADDRESSES)
+    return run
+
+
+@case("address.jibun_key")
+def _jibun_key():
+    from kkangtong.address import jibun_key
+
+    tokens = ["123-4", "0123-0004번지", "산12-0", "진관2로", "302호", "1408", "77-1", "우동"]
+
+    def run():
+        for t in tokens:
+            jibun_key(t)
+    run.calls = len(tokens)
+    return run
+
+
+@case("address.review_address_key")
+def _review_address_key():
+    from kkangtong.reviews import review_address_key
+
+    def run():
+        for a in _ADDRESSES:
+            review_address_key(a)
+    run.calls = len(_ADDRESSES)
+    return run
+
+
+@case("mbti.main_figure")
+def _mbti_main_figure():
+    from mbti_charts import country_mbti_table, ranked_bar_figure
+
+    df = synthetic.mbti_table()
+    return lambda: ranked_bar_figure(country_mbti_table(df, "Country 042"), "Country 042")
+
+
+@case("mbti.page01_figure")
+def _mbti_page01_figure():
+    from mbti_charts import highlight_bar_figure
+
+    df = synthetic.mbti_table()
+    return lambda: highlight_bar_figure(df, "Country 042")
+
+
+# ================================
+# 측정
+# ================================
+def measure(func, rounds, min_time=TARGET_ROUND_SECONDS):
+    """호출 한 번당 시간 (ms) 목록 · 한 round 안에서는 min_time 이상 걸리도록 여러 번 호출"""
+    calls = getattr(func, "calls", 1)
+    func()  # 처음 한 번은 import·캐시 준비
+    started = time.perf_counter()
+    func()
+    once = time.perf_counter() - started
+    number = max(1, int(min_time / once)) if once > 0 else 1000
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        per_call = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            per_call.append((time.perf_counter() - started) / number / calls * 1000)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return per_call, number * calls
+
+
+def git_commit():
+    def git(*args):
+        return subprocess.run(["git", "-C", ROOT, *args], capture_output=True, text=True).stdout.strip()
+
+    commit = git("rev-parse", "--short", "HEAD") or "unknown"
+    dirty = bool(git("status", "--porcelain", "--untracked-files=no"))
+    return commit, dirty
+
+
+def run_suite(pattern=None, rounds=7, log=print):
+    commit, dirty = git_commit()
+    result = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} · {os.cpu_count()} cpu",
+        "cases": {},
+    }
+    for name, setup in CASES:
+        if pattern and pattern not in name:
+            continue
+        per_call, calls = measure(setup(), rounds)
+        median, p90 = np.percentile(per_call, [50, 90])
+        result["cases"][name] = {
+            "median_ms": round(float(median), 6),
+            "min_ms": round(float(min(per_call)), 6),
+            "p90_ms": round(float(p90), 6),
+            "rounds": rounds,
+            "calls_per_round": calls,
+        }
+        log(f"{name:<36} median {median:10.4f}ms  min {min(per_call):10.4f}ms  p90 {p90:10.4f}ms")
+    return result
+
+
+def load_result(ref):
+    """결과 파일 경로 또는 커밋 (.cache/bench/<커밋>*.json 중 가장 최근)"""
+    if os.path.isfile(ref):
+        path = ref
+    else:
+        names = sorted(
+            (n for n in os.listdir(RESULTS_DIR) if n.startswith(ref[:7]) and n.endswith(".json")),
+            key=lambda n: os.path.getmtime(os.path.join(RESULTS_DIR, n)),
+        ) if os.path.isdir(RESULTS_DIR) else []
+        if not names:
+            raise SystemExit(f"비교할 결과가 없습니다: {ref} (먼저 그 커밋에서 실행해 저장하세요)")
+        path = os.path.join(RESULTS_DIR, names[-1])
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base, current, threshold):
+    """median 비교 표 출력 → 느려진 항목 이름 목록"""
+    print(f"\n{base['commit']}{'+' if base['dirty'] else ''} → {current['commit']}{'+' if current['dirty'] else ''}")
+    regressions = []
+    for name, now in current["cases"].items():
+        before = base["cases"].get(name)
+        if before is None:
+            print(f"{name:<36} {'(새 항목)':>12} {now['median_ms']:12.4f}ms")
+            continue
+        ratio = now["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  ▲ 느려짐"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            mark = "  ▼ 빨라짐"
+        print(f"{name:<36} {before['median_ms']:12.4f}ms {now['median_ms']:12.4f}ms  x{ratio:5.2f}{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="깡통체크 벤치마크 모음")
+    parser.add_argument("-k", dest="pattern", help="이름에 이 글자가 들어간 항목만")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("-o", "--output", help="결과 JSON 경로 (기본: .cache/bench/<커밋>.json)")
+    parser.add_argument("--compare", help="비교할 결과 (커밋 또는 JSON 경로)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="느려짐으로 볼 median 증가 비율")
+    parser.add_argument("--fail", action="store_true", help="느려진 항목이 있으면 종료 코드 1")
+    parser.add_argument("--list", action="store_true", help="항목 이름만 출력")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, _ in CASES:
+            print(name)
+        return
+
+    base = load_result(args.compare) if args.compare else None
+    result = run_suite(args.pattern, args.rounds)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{result['commit']}{'-dirty' if result['dirty'] else ''}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=1)
+    print(f"저장: {output}")
+
+    if base is not None:
+        regressions = compare(base, result, args.threshold)
+        if regressions and args.fail:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
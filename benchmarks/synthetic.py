@@ -0,0 +1,244 @@
+"""
+벤치마크용 가짜 입력 만들기 (등기부 텍스트·PDF, 매물 목록, 국가별 MBTI 표)
+
+- 같은 seed 면 항상 같은 결과 → 커밋끼리 같은 입력으로 비교할 수 있음
+- 등기부 PDF 는 외부 라이브러리 없이 직접 씀 (한글이 그대로 추출되도록 ToUnicode CMap 이 있는 Type0 글꼴)
+- 페이지 수와 항목 종류 비율(mix)을 바꿔서 근저당이 많은 집, 압류·경매가 섞인 집 등을 만들 수 있음
+
+    python benchmarks/synthetic.py registry --pages 5 -o sample.pdf
+    python benchmarks/synthetic.py listings --rows 10000 -o listings.csv
+"""
+import argparse
+import io
+
+import numpy as np
+import pandas as pd
+
+# 갑구(소유권) / 을구(소유권 이외) 항목 종류와 기본 비율
+REGISTRY_ENTRY_MIX = {
+    "소유권이전": 2,
+    "가압류": 1,
+    "가처분": 0.5,
+    "압류": 0.5,
+    "경매": 0.2,
+    "근저당권": 4,
+    "전세권": 1,
+    "말소": 2,
+}
+GAP_KINDS = ("소유권이전", "가압류", "가처분", "압류", "경매")
+REGISTRY_LINES_PER_PAGE = 30
+
+_BANKS = ["국민은행", "신한은행", "우리은행", "하나은행", "농협은행", "○○캐피탈", "△△저축은행"]
+_NAMES = ["홍길동", "김철수", "이영희", "박민수", "최지은", "정우성", "한가람"]
+_DONGS = ["서울 은평구 진관동", "서울 마포구 망원동", "서울 관악구 신림동", "경기 수원시 장안구 정자동", "부산 해운대구 우동"]
+
+
+# ================================
+# 등기부
+# ================================
+def _date(rng, year_from=2005, year_to=2025):
+    return f"{rng.integers(year_from, year_to + 1)}년{rng.integers(1, 13)}월{rng.integers(1, 29)}일"
+
+
+def registry_lines(entries, mix=None, seed=0):
+    """항목 entries 개짜리 등기부 줄 목록 (표제부 → 갑구 → 을구 순서)"""
+    rng = np.random.default_rng(seed)
+    mix = mix or REGISTRY_ENTRY_MIX
+    unknown = set(mix) - set(REGISTRY_ENTRY_MIX)
+    if unknown:
+        raise ValueError(f"모르는 항목 종류: {', '.join(sorted(unknown))} (가능: {', '.join(REGISTRY_ENTRY_MIX)})")
+    kinds = list(mix)
+    weights = np.array([mix[k] for k in kinds], dtype=float)
+    picked = rng.choice(kinds, size=entries, p=weights / weights.sum())
+
+    lines = [
+        "【 표 제 부 】 ( 1동의 건물의 표시 )",
+        f"1 {_date(rng, 1995, 2015)} {rng.choice(_DONGS)} {rng.integers(1, 999)} 철근콘크리트구조 {rng.integers(3, 30)}층 공동주택",
+        "【 갑 구 】 ( 소유권에 관한 사항 )",
+        f"1 소유권보존 {_date(rng, 1995, 2005)} 제{rng.integers(1000, 99999)}호 소유자 {rng.choice(_NAMES)}",
+    ]
+    rank = 1
+    for kind in (k for k in picked if k in GAP_KINDS):
+        rank += 1
+        no = f"제{rng.integers(1000, 99999)}호"
+        if kind == "소유권이전":
+            lines.append(f"{rank} 소유권이전 {_date(rng)} {no} 소유자 {rng.choice(_NAMES)} 매매")
+        elif kind == "가압류":
+            lines.append(f"{rank} 가압류 {_date(rng)} {no} 청구금액 금{rng.integers(1, 50) * 1_000_000:,}원 채권자 {rng.choice(_BANKS)}")
+        elif kind == "가처분":
+            lines.append(f"{rank} 가처분 {_date(rng)} {no} 피보전권리 소유권이전등기청구권")
+        elif kind == "압류":
+            lines.append(f"{rank} 압류 {_date(rng)} {no} 권리자 국민건강보험공단")
+        else:
+            lines.append(f"{rank} 임의경매 개시결정 {_date(rng)} {no} 채권자 {rng.choice(_BANKS)}")
+
+    lines.append("【 을 구 】 ( 소유권 이외의 권리에 관한 사항 )")
+    rank = 0
+    mortgages = []
+    for kind in (k for k in picked if k not in GAP_KINDS):
+        rank += 1
+        no = f"제{rng.integers(1000, 99999)}호"
+        if kind == "말소" and mortgages:
+            target = mortgages.pop(rng.integers(len(mortgages)))
+            lines.append(f"{rank} {target}번근저당권설정등기말소 {_date(rng)} {no} 해지")
+        elif kind == "전세권":
+            lines.append(f"{rank} 전세권설정 {_date(rng)} {no} 전세금 금{rng.integers(5, 60) * 10_000_000:,}원 전세권자 {rng.choice(_NAMES)}")
+        else:
+            # 발급처에 따라 "금" 이 붙기도 안 붙기도 해서 둘 다 섞음
+            won = "금" if rng.random() < 0.5 else ""
+            lines.append(
+                f"{rank} 근저당권설정 {_date(rng)} {no} 채권최고액 {won}{rng.integers(6, 96) * 5_000_000:,}원 "
+                f"근저당권자 {rng.choice(_BANKS)}"
+            )
+            mortgages.append(rank)
+    return lines
+
+
+def registry_pages(pages, mix=None, seed=0, lines_per_page=REGISTRY_LINES_PER_PAGE):
+    """pages 쪽짜리 등기부 → 페이지별 텍스트 목록"""
+    # 머리글 줄(4~5줄)을 빼고 대략 페이지 수에 맞게 항목 수를 정함
+    lines = registry_lines(max(1, pages * lines_per_page - 5), mix, seed)
+    return ["\n".join(lines[i:i + lines_per_page]) for i in range(0, len(lines), lines_per_page)][:pages]
+
+
+def registry_text(pages, mix=None, seed=0):
+    return "\n".join(registry_pages(pages, mix, seed))
+
+
+def registry_pdf(pages, mix=None, seed=0):
+    """pages 쪽짜리 텍스트 기반 등기부 PDF (bytes)"""
+    return text_pdf(registry_pages(pages, mix, seed))
+
+
+def text_pdf(pages):
+    """페이지별 텍스트 → PDF bytes (글자 코드 = 유니코드인 Identity-H 글꼴 + ToUnicode 로 추출 가능)"""
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    chars = sorted(set("".join(pages)) - {"\n"})
+    cmap_body = b""
+    for i in range(0, len(chars), 100):
+        part = chars[i:i + 100]
+        cmap_body += b"%d beginbfchar\n" % len(part)
+        cmap_body += b"".join(b"<%04x> <%04x>\n" % (ord(c), ord(c)) for c in part)
+        cmap_body += b"endbfchar\n"
+    cmap = (
+        b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap /CMapName /U def "
+        b"1 begincodespacerange <0000> <FFFF> endcodespacerange\n" + cmap_body
+        + b"endcmap CMapName currentdict /CMap defineresource pop end end"
+    )
+    cmap_id = add(b"<< /Length %d >>\nstream\n" % len(cmap) + cmap + b"\nendstream")
+    cid_font = add(
+        b"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /Synthetic "
+        b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> >>"
+    )
+    font = add(
+        b"<< /Type /Font /Subtype /Type0 /BaseFont /Synthetic /Encoding /Identity-H "
+        b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (cid_font, cmap_id)
+    )
+
+    pages_id = len(objects) + 1 + 2 * len(pages)
+    kids = []
+    for text in pages:
+        ops = [b"BT /F1 10 Tf 40 800 Td 12 TL"]
+        for line in text.split("\n"):
+            ops.append(b"<" + line.encode("utf-16-be").hex().encode() + b"> Tj T*")
+        ops.append(b"ET")
+        content = b"\n".join(ops)
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font, content_id)
+        ))
+    add(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), len(kids)))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+class SyntheticUpload(io.BytesIO):
+    """Streamlit UploadedFile 처럼 name·type·size 가 있는 메모리 파일"""
+
+    def __init__(self, data, name="registry.pdf", mime="application/pdf"):
+        super().__init__(data)
+        self.name = name
+        self.type = mime
+        self.size = len(data)
+
+
+# ================================
+# 매물 목록
+# ================================
+def listing_table(rows, seed=0):
+    """비교 탭에 올리는 것과 같은 컬럼의 매물 목록 DataFrame"""
+    rng = np.random.default_rng(seed)
+    memo_words = np.array(["", "", "곰팡이", "누수", "소음", "벌레", "채광 좋음", "역세권"])
+    return pd.DataFrame({
+        "주소": [f"{d} {n}" for d, n in zip(rng.choice(_DONGS, rows), rng.integers(1, 2000, rows))],
+        "보증금": rng.integers(1, 40, rows) * 10_000_000,
+        "월세": rng.integers(0, 20, rows) * 100_000,
+        "계약형태": rng.choice(["전세", "반전세", "월세"], rows),
+        "매매가": rng.integers(0, 60, rows) * 10_000_000,
+        "전세시세": rng.integers(0, 40, rows) * 10_000_000,
+        "메모": [" ".join(w for w in pair if w) for pair in rng.choice(memo_words, (rows, 2))],
+    })
+
+
+def listing_csv(rows, seed=0, encoding="cp949"):
+    return listing_table(rows, seed).to_csv(index=False).encode(encoding)
+
+
+# ================================
+# 국가별 MBTI 표 (countriesMBTI_16types.csv 와 같은 모양)
+# ================================
+MBTI_TYPES = [a + b + c + d for a in "EI" for b in "NS" for c in "FT" for d in "JP"]
+
+
+def mbti_table(countries=160, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.dirichlet(np.ones(len(MBTI_TYPES)), countries)
+    df = pd.DataFrame(values, columns=MBTI_TYPES)
+    df.insert(0, "Country", [f"Country {i:03d}" for i in range(countries)])
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 입력 파일 만들기")
+    sub = parser.add_subparsers(dest="kind", required=True)
+    p_reg = sub.add_parser("registry", help="등기부 PDF")
+    p_reg.add_argument("--pages", type=int, default=3)
+    p_reg.add_argument("--mix", default="", help="항목 비율 (예: 근저당권=6,압류=2)")
+    p_list = sub.add_parser("listings", help="매물 목록 CSV")
+    p_list.add_argument("--rows", type=int, default=1000)
+    for p in (p_reg, p_list):
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("-o", "--output", required=True)
+    args = parser.parse_args(argv)
+
+    if args.kind == "registry":
+        mix = dict(REGISTRY_ENTRY_MIX)
+        for part in filter(None, args.mix.split(",")):
+            name, weight = part.split("=")
+            mix[name.strip()] = float(weight)
+        data = registry_pdf(args.pages, mix, args.seed)
+    else:
+        data = listing_csv(args.rows, args.seed)
+    with open(args.output, "wb") as f:
+        f.write(data)
+
+
+if __name__ == "__main__":
+    main()
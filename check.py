@@ -1,330 +1,191 @@
 import streamlit as st
 import urllib.parse
 import streamlit.components.v1 as components
-import io
-import re
+
+from kkangtong.registry import (
+    REGISTRY_CACHE_DIR,
+    RegistryCache,
+    analyze_registry_file_cached,
+    analyze_registry_pages,
+    registry_file_key,
+)
+from kkangtong.pdf_pages import start_extract_pool
+from kkangtong.uploads import MAX_UPLOAD_BYTES, UploadTooLarge, file_sha256
+from kkangtong.listings import INPUT_ERROR_LEVEL, MAX_LISTING_ROWS, ListingFileError, score_listing_file
+from kkangtong.profiling import rerun_finished, rerun_started, span, timed
+from kkangtong.ocr import OCR_CACHE_DIR, OCR_CACHE_FORMAT, OcrJobQueue, ocr_available, pdf_ocr_available
+from kkangtong.market import DEFAULT_AREA_TOLERANCE, DEFAULT_MONTHS, MIN_SAMPLES, MarketIndex, market_index_stamp
+from kkangtong.regions import get_lifestyle_comment, get_poi_summary_text, get_transit_summary_text
+from kkangtong.spatial import POI_CATEGORIES, PoiIndex, poi_index_stamp, walk_minutes
+from kkangtong.review_search import SEARCH_PAGE_SIZE, ReviewSearchIndex
+from kkangtong.reviews import (
+    REVIEW_FLAGS,
+    REVIEW_PAGE_SIZE,
+    ReviewError,
+    SqliteReviewStore,
+    is_specific_address,
+    review_address_key,
+    review_flags,
+)
+from kkangtong.rules import describe_rules, get_rules, reload_error
+from kkangtong.scoring import compute_risk_score, review_signal, risk_label, risk_score_grid
+from profile_panel import render_profile_panel
+
+# 이번 rerun 에서 재는 구간을 한 묶음으로 (측정이 꺼져 있으면 아무것도 안 함)
+rerun_started("check.py")
 
 # ================================
-# 등기부 텍스트 추출 & 분석 함수
+# Streamlit 기본 설정
 # ================================
-def extract_text_from_registry_file(uploaded_file):
-    """텍스트 기반 PDF 등기부에서 텍스트 추출 (스캔 이미지 PDF는 불가)"""
-    if uploaded_file is None:
-        return ""
+@st.cache_resource
+def get_registry_cache():
+    # 세션·rerun 사이에 공유되는 프로세스 단위 캐시
+    return RegistryCache(REGISTRY_CACHE_DIR)
 
-    if uploaded_file.type == "application/pdf":
-        try:
-            from PyPDF2 import PdfReader  # requirements.txt 에 PyPDF2 추가 필요
-
-            pdf_bytes = uploaded_file.read()
-            reader = PdfReader(io.BytesIO(pdf_bytes))
-            texts = []
-            for page in reader.pages:
-                try:
-                    t = page.extract_text() or ""
-                except Exception:
-                    t = ""
-                texts.append(t)
-            return "\n".join(texts)
-        except Exception:
-            return ""
-    else:
-        # 이미지(JPG, PNG)는 현재 OCR 미지원
-        return ""
 
+@st.cache_resource
+def warm_extract_pool():
+    # PDF 추출 워커 프로세스는 서버가 뜰 때 한 번만 띄워 두고 모든 업로드가 같이 씀
+    # (스크립트 스레드는 SIGALRM 을 못 써서 추출을 죽일 수 있는 워커에서 함 → 업로드마다 띄우면 1초씩 걸림)
+    import multiprocessing
 
-def analyze_registry_text(text: str):
-    """등기부 텍스트를 아주 단순하게 키워드 위주로 분석"""
-    text = (text or "").strip()
+    if multiprocessing.current_process().name == "MainProcess":  # spawn 으로 뜬 자식이 이 파일을 다시 읽을 때는 띄우지 않음
+        start_extract_pool()
 
-    result = {
-        "raw_text": text,
-            "preview": text[:1500] if text else "",
-            "mortgage_count": 0,
-            "mortgage_total": 0,
-            "owner_lines": [],
-            "warnings": [],
-    }
 
-    if not text:
-        result["warnings"].append(
-            "텍스트를 추출하지 못했습니다. (스캔 이미지이거나 PDF 구조 문제일 수 있어요.)"
-        )
-        return result
+@st.cache_resource
+def get_ocr_queue():
+    # OCR 작업 큐도 프로세스 단위로 하나만 (백그라운드 스레드 풀)
+    return OcrJobQueue(RegistryCache(OCR_CACHE_DIR, version=OCR_CACHE_FORMAT))
 
-    # 근저당권 개수
-    mortgage_count = text.count("근저당권")
-    result["mortgage_count"] = mortgage_count
 
-    # 채권최고액 합계(대략)
-    amounts = re.findall(r"채권최고액\s*([\d,]+)\s*원", text)
-    total_amount = 0
-    for a in amounts:
-        try:
-            total_amount += int(a.replace(",", ""))
-        except ValueError:
-            pass
-    result["mortgage_total"] = total_amount
-
-    # 소유자 관련 줄 몇 개
-    owner_candidates = []
-    for line in text.splitlines():
-        if ("소유자" in line) or ("소유권" in line):
-            owner_candidates.append(line.strip())
-    result["owner_lines"] = owner_candidates[:5]
-
-    # 위험 신호 요약
-    warnings = []
-    if mortgage_count >= 2:
-        warnings.append(
-            f"근저당권이 {mortgage_count}건 등기되어 있습니다. (선순위 권리관계 꼭 확인 필요)"
-        )
-    elif mortgage_count == 1:
-        warnings.append(
-            "근저당권이 1건 등기되어 있습니다. 채권최고액과 보증금 규모를 꼭 비교해 보세요."
-        )
+@st.cache_resource
+def get_review_store():
+    # 후기는 모든 세션이 같이 보는 SQLite 저장소 하나
+    return SqliteReviewStore()
 
-    if total_amount > 0:
-        warnings.append(
-            f"채권최고액 합계가 약 {total_amount:,}원 정도로 표시됩니다. (실제 매매가·보증금과 비교 필요)"
-        )
 
-    if "가압류" in text:
-        warnings.append("등기부에 '가압류' 기록이 있습니다. 채권자가 재산을 묶어둔 상태일 수 있어요.")
-    if "가처분" in text:
-        warnings.append("등기부에 '가처분' 기록이 있습니다. 소유권 분쟁 가능성을 의심해 볼 수 있어요.")
-    if "압류" in text:
-        warnings.append("등기부에 '압류' 기록이 있습니다. 세금·채무 문제 여부를 꼭 확인해야 합니다.")
-    if "경매개시결정" in text or "경매 개시결정" in text:
-        warnings.append("등기부에 '경매개시결정' 기록이 있습니다. 매우 위험한 매물일 수 있어요.")
-
-    if not warnings:
-        warnings.append(
-            "텍스트에서 뚜렷한 근저당/가압류/경매 관련 키워드가 많이 보이지 않습니다.\n"
-            "그래도 최종 판단은 반드시 전문가와 등기부 원문을 함께 보고 결정해야 합니다."
-        )
+@st.cache_resource
+def get_review_search():
+    # 후기 검색 색인 (처음 검색할 때 저장소 전체를 한 번 읽고, 이후엔 새 후기만 따라 읽음)
+    return ReviewSearchIndex(get_review_store())
 
-    result["warnings"] = warnings
-    return result
 
+@st.cache_resource(max_entries=1)
+def get_market_index(stamp):
+    # 로컬 실거래가 인덱스 (python market_index.py add ... 로 만들어 둔 경우만)
+    # stamp(manifest 수정 시각)가 바뀌면 새 달 파일이 추가된 것이므로 다시 엶
+    if stamp is None:
+        return None
+    return MarketIndex()
 
-# ================================
-# 위험도 계산 (매매가 + 전세 시세 둘 다 반영)
-# ================================
-def compute_risk_score(
-    deposit,
-    rent,
-    contract_type,
-    memo="",
-    jeonse_rate_sale=None,
-    jeonse_rate_market=None,
-):
-    """
-    위험도 계산 (0~100점)
 
-    - 메인 1: 집값 대비 전세가율 jeonse_rate_sale (보증금 회수 가능성)
-    - 메인 2: 전세 시세 대비 jeonse_rate_market (시장 전세보다 과하게 비싼지)
-    - 서브: 전세가율 모를 때 보증금 절대 크기
-    - 추가: 계약 형태, 월세, 메모 키워드 (곰팡이·누수·소음·귀신 등)
+@st.cache_resource(max_entries=1)
+def get_poi_index(stamp):
+    # 오프라인 주변 시설 인덱스 (python poi_index.py build ... 로 만들어 둔 경우만)
+    if stamp is None:
+        return None
+    return PoiIndex()
 
-    단위는 모두 "원".
-    """
-    if deposit <= 0:
-        return 0, []
-
-    score = 0
-
-    # 1) 집값 대비 전세가율 (jeonse_rate_sale)
-    if jeonse_rate_sale is not None and jeonse_rate_sale > 0:
-        if jeonse_rate_sale < 60:
-            score += 8      # 여유 많음
-        elif jeonse_rate_sale < 80:
-            score += 25
-        elif jeonse_rate_sale < 90:
-            score += 45
-        else:
-            score += 65     # 90% 이상이면 깡통 위험 구간
-    else:
-        # 집값 모를 때: 보증금 절대 크기 기준
-        if deposit < 50_000_000:         # 5천만 미만
-            score += 15
-        elif deposit < 150_000_000:      # 5천만~1억5천
-            score += 30
-        else:                            # 1억5천 이상
-            score += 45
-
-    # 2) 전세 시세 대비 (jeonse_rate_market)
-    if jeonse_rate_market is not None and jeonse_rate_market > 0:
-        # 100% = 전세 시세와 동일
-        if jeonse_rate_market <= 100:
-            score += 0       # 시세 수준
-        elif jeonse_rate_market <= 110:
-            score += 8       # 시세보다 조금 비쌈
-        elif jeonse_rate_market <= 120:
-            score += 18      # 꽤 비쌈 → 의심
-        else:
-            score += 28      # 120% 초과 → 매우 비쌈 (위험·호갱 가능성)
-
-    # 3) 계약 형태 / 월세
-    if contract_type == "전세":
-        score += 5
-        rent_for_calc = 0
-    elif contract_type == "반전세":
-        score += 10
-        rent_for_calc = rent
-    else:
-        score += 15
-        rent_for_calc = rent
-
-    if contract_type != "전세":
-        if rent_for_calc >= 1_000_000:   # 월 100만 이상
-            score += 5
-        if rent_for_calc >= 2_000_000:   # 월 200만 이상
-            score += 5
-
-    # 4) 메모 키워드 → 내부 거주 환경 리스크
-    issues = []
-    memo = memo or ""
-    keywords = {
-        "곰팡": (8, "곰팡이"),
-        "누수": (8, "누수"),
-        "하자": (5, "하자"),
-        "악취": (5, "악취"),
-        "냄새": (4, "냄새"),
-        "소음": (6, "소음"),
-        "벌레": (6, "벌레"),
-        "층간소음": (6, "층간소음"),
-        "바퀴벌레": (8, "벌레"),
-        "누전": (10, "전기·누전"),
-        "균열": (4, "균열"),
-        "벽균열": (6, "벽 균열"),
-        "귀신": (3, "이상한 소문"),
-    }
-    for key, (w, name) in keywords.items():
-        if key in memo:
-            score += w
-            issues.append(name)
-
-    score = max(0, min(100, score))
-    issues = sorted(set(issues))
-    return score, issues
-
-
-def risk_label(score: int):
-    if score < 45:
-        level = "안전"
-        msg = "😊 이 집은 비교적 안전해 보여요. 그래도 체크리스트는 꼭 한 번 확인해요!"
-    elif score < 70:
-        level = "보통 (주의)"
-        msg = "😐 조건이 살짝 애매해요. 다른 집과 비교하면서 한 번 더 고민해 보세요."
-    else:
-        level = "경고 (고위험)"
-        msg = "🚨 헉, 다른 집들도 같이 알아보는 게 좋아요. 전문가 상담 없이 계약하면 위험해요!"
-    return level, msg
 
+# 조건 시뮬레이션 탭 격자 (슬라이더 범위·간격과 같게)
+SIM_DEPOSITS = list(range(5_000_000, 300_000_001, 5_000_000))
+SIM_RENTS = list(range(0, 3_000_001, 50_000))
+SIM_TYPES = ["전세", "반전세", "월세"]
 
-# ================================
-# 주변 교통/인프라 설명용 함수
-# ================================
-def get_transit_summary_text(address: str) -> str:
-    addr = (address or "").strip()
-    if not addr:
-        return ""
-    lines = []
-    if "은평" in addr:
-        lines.append("**예시) 서울 은평구 기준 주변 교통**")
-        lines.append("- 지하철: 3호선 구파발역이 비교적 가까운 편입니다.")
-        lines.append("- 버스: 통일로 주변으로 다양한 버스 노선이 있습니다.")
-        lines.append("- 도로: 내부순환로·통일로 진입이 비교적 쉬운 편입니다.")
-    elif ("강남" in addr) or ("서초" in addr):
-        lines.append("**예시) 강남권 기준 주변 교통**")
-        lines.append("- 지하철: 2호선/신분당선 환승역이 인근에 있을 가능성이 높습니다.")
-        lines.append("- 버스: 간선·광역·심야버스가 많이 지나는 지역일 수 있어요.")
-        lines.append("- 도로: 경부고속도로, 올림픽대로 등 주요 도로와의 접근성이 좋은 편일 수 있습니다.")
+
+@st.cache_data
+def get_sim_grid(rules_key):
+    # 보증금 60 × 월세 61 × 계약 형태 3 전체를 한 번에 계산해서 모든 세션이 같이 씀
+    # rules_key 가 바뀌면(규칙 파일 수정) 새로 계산
+    return risk_score_grid(SIM_DEPOSITS, SIM_RENTS, SIM_TYPES, rules=get_rules())
+
+
+@st.cache_data
+def get_sim_heatmap(contract_type, rules_key):
+    # 계약 형태별 히트맵 (사용자 위치 표시는 매번 복사본에 덧그림)
+    import plotly.graph_objects as go
+
+    cutoffs = get_rules().label_cutoffs()
+    z = get_sim_grid(rules_key)[SIM_TYPES.index(contract_type)]
+    fig = go.Figure(
+        go.Heatmap(
+            x=[d / 10_000 for d in SIM_DEPOSITS],
+            y=[r / 10_000 for r in SIM_RENTS],
+            z=z,
+            zmin=0,
+            zmax=100,
+            colorscale=[[0, "#4ade80"], [cutoffs[0] / 100, "#facc15"], [cutoffs[-1] / 100, "#f97316"], [1, "#dc2626"]],
+            colorbar=dict(title="점수"),
+            hovertemplate="보증금 %{x:,}만원<br>월세 %{y:,}만원<br>점수 %{z}<extra></extra>",
+        )
+    )
+    for cutoff in cutoffs:
+        fig.add_trace(
+            go.Contour(
+                x=[d / 10_000 for d in SIM_DEPOSITS],
+                y=[r / 10_000 for r in SIM_RENTS],
+                z=z,
+                contours=dict(start=cutoff, end=cutoff, size=1, coloring="none", showlabels=True),
+                line=dict(color="black", width=1, dash="dot"),
+                showscale=False,
+                hoverinfo="skip",
+            )
+        )
+    fig.update_layout(
+        xaxis_title="보증금 (만원)",
+        yaxis_title="월세 (만원)",
+        template="simple_white",
+        margin=dict(l=40, r=40, t=30, b=40),
+        height=420,
+        showlegend=False,
+    )
+    return fig
+
+
+@st.fragment(run_every=2)
+def show_ocr_progress(key):
+    # 2초마다 이 부분만 다시 실행해서 OCR 완료 여부 확인, 끝나면 전체 화면 새로 그림
+    status, _ = get_ocr_queue().status(key)
+    if status == "pending":
+        st.info("🔎 이미지 등기부를 OCR로 읽는 중입니다… 끝나면 자동으로 분석 결과가 표시돼요.")
     else:
-        lines.append("**입력한 주소 기준 주변 교통 안내 (개략)**")
-        lines.append("- 실제 서비스에서는 지도 API로 가장 가까운 지하철역·버스정류장·고속도로 IC를 계산합니다.")
-        lines.append("- 역까지 도보 시간, 버스 정류장까지 거리, 주요 도로 접근성 등을 숫자로 보여주는 것을 목표로 합니다.")
-    return "\n".join(lines)
-
-
-def get_lifestyle_comment(address: str, noise_sensitive: bool, hate_walking: bool, night_active: bool) -> str:
-    addr = (address or "").strip()
-    if not addr:
-        return ""
-    lines = []
-
-    if noise_sensitive:
-        if ("강남" in addr) or ("서초" in addr):
-            lines.append("- 소음에 예민하다면, 강남권은 차량·버스·유동 인구가 많아서 밤에도 시끄러울 수 있어요.")
-        elif "은평" in addr:
-            lines.append("- 소음에 예민하다면, 통일로·내부순환로 차량 소음이 신경 쓰일 수 있어요.")
-        else:
-            lines.append("- 소음에 예민하다면, 큰 도로·역 바로 앞 매물은 한 번 더 야간 방문해보는 게 좋아요.")
+        st.rerun()
 
-    if hate_walking:
-        if "은평" in addr:
-            lines.append("- 걷는 걸 싫어한다면, 구파발역 도보 7분 정도도 조금 멀게 느껴질 수 있어요.")
-        elif ("강남" in addr) or ("서초" in addr):
-            lines.append("- 걷는 걸 싫어한다면, 환승통로가 긴 대형역 근처는 동선이 길게 느껴질 수 있어요.")
-        else:
-            lines.append("- 걷는 걸 싫어한다면, 지도에서 역·버스 정류장까지 도보 시간을 꼭 확인해 보세요.")
 
-    if night_active:
-        if ("강남" in addr) or ("서초" in addr):
-            lines.append("- 야행성이라면, 강남권은 늦은 시간까지 편의시설은 많지만 그만큼 소음도 강할 수 있어요.")
-        else:
-            lines.append("- 야행성이라면, 늦게까지 여는 편의점·버스 노선 유무도 함께 확인해 보세요.")
-
-    if not lines:
-        return ""
-
-    lines.insert(0, "**생활 패턴 기준 코멘트 (예시)**")
-    return "\n".join(lines)
-
-
-def get_poi_summary_text(address: str) -> str:
-    addr = (address or "").strip()
-    if not addr:
-        return ""
-    lines = []
-    if ("마곡" in addr) or ("서울식물원" in addr) or ("강서구" in addr):
-        lines.append("**주변 편의·교통·공원 정보 (예시)**")
-        lines.append("- 지하철: 마곡나루역·마곡역·양천향교역 중 한 곳이 도보/버스로 접근 가능한 생활권일 수 있어요.")
-        lines.append("- 편의점: 마곡지구 내 GS25·CU·이마트24 등 편의점이 도보 3~5분 거리에 여러 곳 있을 가능성이 높아요.")
-        lines.append("- 공원·녹지: 서울식물원, 한강 방화대교 주변 수변공원 등이 가깝다는 장점이 있어요.")
-        lines.append("- 큰 도로·고속도로: 올림픽대로, 방화대교·가양대교 진입이 가까워 차량 이동은 편하지만, 교통량에 따른 소음은 체크가 필요해요.")
-    elif ("은평" in addr) or ("구파발" in addr) or ("연신내" in addr):
-        lines.append("**주변 편의·교통·공원 정보 (예시)**")
-        lines.append("- 지하철: 3호선 구파발역·연신내역 등으로 출퇴근하는 생활권일 가능성이 높아요.")
-        lines.append("- 편의점: 역세권과 주거지 사이에 편의점·카페·프랜차이즈 음식점이 밀집된 구간이 많아요.")
-        lines.append("- 공원·녹지: 북한산, 불광천 산책로 등 자연 접근성이 좋지만 산·하천 인접 여부에 따라 벌레·습도도 체크해야 해요.")
-        lines.append("- 큰 도로·고속도로: 통일로, 내부순환로 진입이 가까워 차량 소음과 매연도 함께 확인해보는 게 좋아요.")
-    elif ("강남" in addr) or ("서초" in addr):
-        lines.append("**주변 편의·교통·공원 정보 (예시)**")
-        lines.append("- 지하철: 2호선·3호선·9호선·신분당선 등 여러 노선을 환승할 수 있는 역세권일 가능성이 높아요.")
-        lines.append("- 편의점: 블록마다 편의점·카페·프랜차이즈 음식점이 있을 정도로 생활 편의시설이 매우 풍부해요.")
-        lines.append("- 공원·녹지: 양재천, 탄천, 역삼·서초 일대 소규모 공원 등 산책 코스를 찾기 괜찮은 편이에요.")
-        lines.append("- 큰 도로·고속도로: 경부고속도로, 테헤란로, 남부순환로 등 대형 도로와 가깝다면 소음·매연이 강할 수 있어요.")
+def run_registry_ocr(reg_file, analysis):
+    """
+    텍스트가 안 나온 이미지·스캔 PDF 등기부는 백그라운드 OCR을 걸어두고,
+    OCR이 끝났으면 OCR 텍스트로 다시 분석한 결과를 돌려줌 (rerun을 막지 않음)
+    """
+    is_pdf = reg_file.type == "application/pdf"
+    if not (pdf_ocr_available() if is_pdf else ocr_available()):
+        return analysis
+
+    queue = get_ocr_queue()
+    key = registry_file_key(reg_file)
+    status, payload = queue.status(key)
+    if status is None:
+        queue.submit(key, reg_file.getvalue(), reg_file.type)
+        status = "pending"
+
+    if status == "done":
+        for analysis in analyze_registry_pages(payload):
+            pass
+        get_registry_cache().put(key, analysis)  # 다음부터는 분석 캐시에서 바로 적중
+    elif status == "pending":
+        show_ocr_progress(key)
     else:
-        lines.append("**주변 편의·교통·공원 정보 (개략 예시)**")
-        lines.append("- 지하철/전철: 입력한 주소 주변의 가장 가까운 역까지 도보 시간·거리 정보를 지도 API로 계산해 보여줄 수 있어요.")
-        lines.append("- 편의점: GS25·CU·세븐일레븐·이마트24 등까지 도보 2~5분 거리인지 확인해, 생활 편의성을 점수화할 수 있어요.")
-        lines.append("- 공원·녹지: 동네 근린공원·하천 산책로·대형 공원(예: 서울숲, 서울식물원 등) 접근성을 함께 볼 수 있어요.")
-        lines.append("- 큰 도로·고속도로: 왕복 4차로 이상 도로·고속도로 IC까지 거리를 기준으로, 소음·매연 리스크를 평가할 수 있어요.")
-    lines.append("")
-    lines.append("※ 실제 서비스에서는 지도·장소 API를 활용해 역/편의점/공원/고속도로까지의 실제 거리를 계산해 줄 수 있습니다.")
-    return "\n".join(lines)
+        st.error("OCR로 등기부를 읽지 못했습니다: " + payload)
+    return analysis
 
 
-# ================================
-# Streamlit 기본 설정
-# ================================
 st.set_page_config(
     page_title="깡통체크 | 전·월세 보증금 위험도 스캔",
     page_icon="🏠",
     layout="wide",
 )
+warm_extract_pool()
 
 st.title("🛡️ 깡통체크")
 st.caption("전·월세 보증금 위험도 스캔 & 초보 세입자 가이드 (교육용 데모)")
@@ -345,26 +206,50 @@ defaults = {
     "hate_walking": False,
     "night_active": False,
     "score": None,
+    "score_rules_version": None,  # 점수를 계산한 규칙 버전 (화면 표시용)
+    "score_rules_key": None,      # 점수를 계산한 규칙 (version, mtime) — 조건 시뮬레이션 격자와 같은 기준
     "memo_issues": [],
+    "review_issues": [],          # 같은 주소 후기 요약에서 점수에 반영된 요소
+    "score_review_count": 0,      # 점수를 계산할 때의 후기 개수 (새 후기가 달리면 다시 계산)
     "registry_analysis": None,
     "area_pyeong": 0.0,
     "avg_price": 0,             # 매매가
     "avg_jeonse_price": 0,      # 전세 시세
     "jeonse_rate_sale": None,   # 집값 대비 전세가율
     "jeonse_rate_market": None, # 전세 시세 대비 비율
+    "market_result": None,      # 실거래가 인덱스 조회 결과 (못 찾으면 False)
+    "compare_key": None,        # 비교 탭에 올린 파일 (해시, 규칙 (version, mtime))
+    "compare_result": None,     # 비교 탭 점수 결과 DataFrame
+    "compare_csv": None,        # 비교 탭 다운로드용 CSV (bytes)
+    "review_window": None,      # 후기 목록 머리글 (주소·개수가 같은 동안 페이지별로 미리 읽어 둠)
+    "review_bodies": {},        # 펼친 후기 본문 (후기 id → 후기)
+    "review_search_ratings": (1, 5),  # 후기 검색 별점 범위 (위젯 key)
+    "review_rating": 4,  # 후기 작성 폼 별점 (위젯 key)
+    "sim_deposit": 50_000_000,  # 시뮬레이션 탭 슬라이더 (위젯 key)
+    "sim_rent": 500_000,
+    "sim_type": "전세",
 }
 for k, v in defaults.items():
     if k not in st.session_state:
         st.session_state[k] = v
 
-if "reviews" not in st.session_state:
-    st.session_state["reviews"] = {}
+# 탭이 숨겨져 위젯이 그려지지 않으면 Streamlit 이 위젯 상태를 지우므로, 남겨 둘 값은 매번 다시 넣어 둠
+# (버튼·파일 업로더는 값을 넣을 수 없어서 제외)
+PERSISTED_WIDGET_KEYS = (
+    "chk_", "sim_", "market_complex", "compare_sort", "compare_order", "compare_page",
+    "review_search_", "review_nickname", "review_period", "review_rating", "review_pros", "review_cons",
+    "review_noise_issue", "review_bug_issue", "review_mold_issue", "review_landlord_",
+)
+for k in list(st.session_state):
+    if k.startswith(PERSISTED_WIDGET_KEYS):
+        st.session_state[k] = st.session_state[k]
+
 
 
 # ================================
 # 탭 구성
 # ================================
-main_tab, tab_check, tab_review, tab_after, tab_share, tab_sim = st.tabs(
+main_tab, tab_check, tab_review, tab_after, tab_share, tab_sim, tab_compare = st.tabs(
     [
         "🏠 메인 (주소·위험도·지도)",
         "✅ 계약 전 체크리스트",
@@ -372,13 +257,72 @@ main_tab, tab_check, tab_review, tab_after, tab_share, tab_sim = st.tabs(
         "⚖️ 분쟁 발생 시 대응",
         "📤 부모님과 결과 공유",
         "📊 조건 시뮬레이션",
-    ]
+        "🏘️ 여러 매물 비교",
+    ],
+    # 선택한 탭을 서버가 알도록
+    key="active_tab",
+    on_change="rerun",
 )
 
+# 화면 구성
+# - 탭마다 render_*_tab() 하나, 지금 보고 있는 탭만 그림 (탭을 바꾸면 전체 rerun → 새 탭만 실행)
+# - 위젯이 있는 탭은 st.fragment → 그 탭 안 위젯을 바꾸면 그 탭 함수만 다시 실행
+#   (시뮬레이션 슬라이더를 움직여도 등기부 분석·점수·지도·후기 목록은 다시 돌지 않음)
+# - 탭끼리 주고받는 값은 전부 st.session_state 에 두고, 다른 탭은 보여질 때 그 값을 다시 읽음
+
 # ================================
 # 1) 메인 탭
 # ================================
-with main_tab:
+def clear_registry_analysis_if_removed():
+    # 다른 탭에 다녀오면 업로더는 비지만 분석 결과는 남겨 둠 → 사용자가 파일을 지웠을 때만 지움
+    if st.session_state.get("registry_file") is None:
+        st.session_state["registry_analysis"] = None
+
+
+def refresh_score(rules, force=False):
+    # 메인 탭과 공유 탭이 같이 씀 → 어느 탭에서 보든 지금 규칙·후기 기준 점수
+    s = st.session_state
+    address = s["address"]
+    deposit = s["deposit"]
+    # 같은 주소 후기 요약은 후기 수와 상관없이 한 번에 읽음 (후기가 달릴 때만 갱신)
+    # 주소가 집 하나를 가리킬 때만 점수에 반영 (구·동 단위로만 읽힌 주소의 후기는 다른 집 이야기일 수 있음)
+    review_key = review_address_key(address)
+    review_applicable = bool(review_key) and is_specific_address(address)
+    with span("main.review_stats"):
+        review_stats = get_review_store().get_stats(review_key) if review_applicable else None
+    review_count = review_stats.count if review_stats else 0
+
+    # 버튼을 눌렀거나, 규칙 파일이 바뀌었거나, 새 후기가 달렸으면 다시 계산
+    if deposit > 0 and (
+        force
+        or s["score"] is None
+        or s["score_rules_key"] != rules.key
+        or s["score_review_count"] != review_count
+    ):
+        with span("main.score"):
+            score, issues, rules_version = compute_risk_score(
+                deposit,
+                s["rent"],
+                s["contract_type"],
+                s["memo"],
+                jeonse_rate_sale=s.get("jeonse_rate_sale"),
+                jeonse_rate_market=s.get("jeonse_rate_market"),
+                rules=rules,
+                review_stats=review_stats,
+            )
+            review_issues = review_signal(review_stats, rules)[1]
+        s["score"] = score
+        s["memo_issues"] = [i for i in issues if i not in review_issues]
+        s["review_issues"] = review_issues
+        s["score_rules_version"] = rules_version
+        s["score_rules_key"] = rules.key
+        s["score_review_count"] = review_count
+    return review_applicable
+
+
+@st.fragment
+@timed("tab.main")
+def render_main_tab():
     left_col, right_col = st.columns([1.1, 1])
 
     # ----- 왼쪽: 입력 -----
@@ -460,7 +404,13 @@ with main_tab:
         reg_file = st.file_uploader(
             "등기부등본 PDF 또는 이미지 (선택)",
             type=["png", "jpg", "jpeg", "pdf"],
-            help="텍스트 기반 PDF는 간단 분석 가능, 스캔 이미지 등기부는 현재 OCR 미지원입니다.",
+            key="registry_file",
+            on_change=clear_registry_analysis_if_removed,
+            help=(
+                "텍스트 기반 PDF는 바로 분석, 이미지·스캔 PDF 등기부는 OCR로 읽어서 분석합니다. (시간이 조금 걸려요)"
+                if ocr_available()
+                else "텍스트 기반 PDF는 간단 분석 가능, 스캔 이미지 등기부는 현재 OCR 미지원입니다."
+            ),
         )
 
         scan_clicked = st.button("위험도 스캔하기")
@@ -468,11 +418,22 @@ with main_tab:
         # 등기부 분석 (업로드 시)
         if reg_file is not None:
             st.caption("▶ 업로드한 등기부를 기반으로 **간단 자동 분석**을 시도합니다. (텍스트 PDF 위주)")
-            text = extract_text_from_registry_file(reg_file)
-            analysis = analyze_registry_text(text)
+            progress_box = st.empty()
+
+            def show_partial(partial):
+                lines = [f"등기부 분석 중… {partial['pages_done']}쪽 완료"]
+                lines += ["- " + w for w in partial["warnings"]]
+                progress_box.info("\n".join(lines))
+
+            try:
+                analysis = analyze_registry_file_cached(reg_file, get_registry_cache(), on_progress=show_partial)
+            except UploadTooLarge as e:
+                analysis = None
+                st.error(f"{e} 등기부 파일은 {MAX_UPLOAD_BYTES // 1024 // 1024}MB 이하로 올려 주세요.")
+            progress_box.empty()
+            if analysis is not None and not analysis["text_length"]:
+                analysis = run_registry_ocr(reg_file, analysis)
             st.session_state["registry_analysis"] = analysis
-        else:
-            st.session_state["registry_analysis"] = None
 
     # ----- 오른쪽 상단: 위험도/시세 -----
     with right_col:
@@ -523,6 +484,49 @@ with main_tab:
             format="%d",
         )
 
+        # ---- 로컬 실거래가 인덱스로 자동 채우기 ----
+        market = get_market_index(market_index_stamp())
+        if market is not None:
+            with st.expander("📈 실거래가로 매매가·전세 시세 채우기"):
+                complex_name = st.text_input("단지명 (선택 · 지번 주소를 모를 때)", key="market_complex")
+                mc1, mc2 = st.columns(2)
+                with mc1:
+                    tolerance = st.number_input(
+                        "전용 면적 범위 (±평)", min_value=0.5, max_value=20.0, value=DEFAULT_AREA_TOLERANCE, step=0.5
+                    )
+                with mc2:
+                    months = st.number_input("최근 몇 개월", min_value=1, max_value=120, value=DEFAULT_MONTHS, step=1)
+
+                if st.button("실거래가 불러오기", key="market_fill"):
+                    found = market.lookup(address, complex_name, s["area_pyeong"] or None, tolerance, months)
+                    s["market_result"] = found if found is not None else False
+                    if found is not None:
+                        # 중앙값으로 입력칸을 채우고 다시 그려서 위 입력칸에 바로 반영
+                        if found["sale"]:
+                            s["avg_price"] = found["sale"]["median"]
+                        if found["jeonse"]:
+                            s["avg_jeonse_price"] = found["jeonse"]["median"]
+                        st.rerun()
+
+                found = s["market_result"]
+                if found is None:
+                    st.caption("주소(지번까지) 또는 단지명을 넣고 불러오면 같은 단지 최근 거래 중앙값으로 채워 줘요.")
+                elif found is False:
+                    st.warning("실거래가 인덱스에서 이 주소·단지를 찾지 못했어요. 지번 주소나 단지명을 확인해 주세요.")
+                else:
+                    st.markdown(f"**{found['group']['address']} {found['group']['complex']}**")
+                    for kind, name in (("sale", "매매"), ("jeonse", "전세")):
+                        stats = found[kind]
+                        if stats is None:
+                            st.write(f"- {name}: 조건에 맞는 거래가 없어요.")
+                            continue
+                        st.write(
+                            f"- {name}: 중앙값 {stats['median']:,}원 · 25~75% {stats['p25']:,}~{stats['p75']:,}원 "
+                            f"· {stats['count']}건 (최근 {stats['latest']})"
+                        )
+                        if stats["count"] < MIN_SAMPLES:
+                            st.caption(f"  {name} 거래가 {stats['count']}건뿐이라 참고용으로만 봐 주세요.")
+
         jeonse_rate_sale = None
         jeonse_rate_market = None
 
@@ -536,53 +540,19 @@ with main_tab:
             s["jeonse_rate_market"] = jeonse_rate_market
             st.markdown(f"- 전세 시세 대비 **보증금 비율(보증금 ÷ 전세 시세)**: {jeonse_rate_market:.1f}%")
 
+        # 설명 문구는 점수 계산과 같은 규칙 파일 구간에서 꺼냄
+        rules = get_rules()
         if jeonse_rate_sale is not None:
-            if jeonse_rate_sale < 60:
-                st.write("→ 집값 대비 보증금이 꽤 여유 있는 편이에요.")
-            elif jeonse_rate_sale < 80:
-                st.write("→ 집값 대비 보증금이 보통 수준이에요.")
-            elif jeonse_rate_sale < 90:
-                st.write("→ 집값 대비 보증금이 꽤 높습니다. 깡통 위험을 의심해 봐야 해요.")
-            else:
-                st.write("🚨 집값 대비 보증금이 **매우 높습니다(90% 이상)**. 깡통전세 위험 구간일 수 있어요.")
+            st.write(rules.sale.text_for(jeonse_rate_sale))
 
         if jeonse_rate_market is not None:
-            if jeonse_rate_market <= 100:
-                st.write("→ 이 동네 전세 시세와 비슷하거나 조금 낮은 편이에요.")
-            elif jeonse_rate_market <= 110:
-                st.write("→ 전세 시세보다 조금 비싼 편이에요. 다른 매물과 비교해 보는 게 좋아요.")
-            elif jeonse_rate_market <= 120:
-                st.write("→ 전세 시세보다 꽤 많이 비쌉니다. 조건을 한 번 더 꼼꼼히 따져 보세요.")
-            else:
-                st.write("🚨 전세 시세 대비 **너무 비싼 보증금**입니다. 호갱/전세사기 가능성을 의심해 봐야 해요.")
+            st.write(rules.market.text_for(jeonse_rate_market))
 
         if s["avg_price"] == 0 and s["avg_jeonse_price"] == 0:
             st.caption("보증금과 매매가/전세 시세를 입력하면 전세가율을 계산해 줄게요.")
 
         # ---- 위험도 계산 버튼 (시세 입력 이후/이전 모두 가능) ----
-        if scan_clicked and deposit > 0:
-            score, memo_issues = compute_risk_score(
-                deposit,
-                rent,
-                contract_type,
-                memo,
-                jeonse_rate_sale=s.get("jeonse_rate_sale"),
-                jeonse_rate_market=s.get("jeonse_rate_market"),
-            )
-            s["score"] = score
-            s["memo_issues"] = memo_issues
-
-        if s["score"] is None and deposit > 0:
-            score, memo_issues = compute_risk_score(
-                deposit,
-                rent,
-                contract_type,
-                memo,
-                jeonse_rate_sale=s.get("jeonse_rate_sale"),
-                jeonse_rate_market=s.get("jeonse_rate_market"),
-            )
-            s["score"] = score
-            s["memo_issues"] = memo_issues
+        review_applicable = refresh_score(rules, force=scan_clicked)
 
         score = s["score"]
         memo_issues = s["memo_issues"]
@@ -595,11 +565,22 @@ with main_tab:
             st.write("· 위험도 점수: -- / 100점")
             st.write("· 전·월세 위험 수준: -")
         else:
-            level, msg = risk_label(score)
+            level, msg = risk_label(score, rules)
             st.markdown(f"**위험도 점수: {score} / 100점**")
             st.markdown(f"**전·월세 위험 수준: {level}**")
             st.write(msg)
             st.progress(score / 100.0)
+            st.caption(f"점수 규칙 버전: {s['score_rules_version']}")
+
+            if s["review_issues"]:
+                st.write(
+                    f"같은 주소 후기 {s['score_review_count']}개에서 반영된 요소:", ", ".join(s["review_issues"])
+                )
+            elif address.strip() and not review_applicable:
+                st.caption(
+                    "※ 주소에 동/도로명과 번지(건물 번호)가 없어서 집 후기는 점수에 반영하지 않았어요. "
+                    "예) 서울 은평구 진관동 123-4"
+                )
 
             if memo_issues:
                 st.write("메모에서 감지된 내부 위험 요소:", ", ".join(memo_issues))
@@ -613,27 +594,58 @@ with main_tab:
             else:
                 st.write("메모에서 특별한 위험 키워드는 감지되지 않았어요.")
 
+        with st.expander("점수 기준 보기"):
+            st.markdown("\n".join(describe_rules(rules)))
+            if reload_error():
+                st.warning(f"규칙 파일을 다시 읽지 못해서 이전 규칙({rules.version})을 쓰고 있어요. ({reload_error()})")
+
         # ---- 주변 교통 + 지도 + 편의시설 ----
         st.subheader("5. 주변 교통·지도·편의시설")
 
         if address:
-            st.markdown(get_transit_summary_text(address))
+            with span("main.helper_text"):
+                st.markdown(get_transit_summary_text(address))
 
             encoded_addr = urllib.parse.quote(address)
             map_url = f"https://www.google.com/maps?q={encoded_addr}&output=embed"
 
-            st.markdown("**아래 지도는 입력한 주소를 기준으로 한 실제 지도 화면입니다.**")
-            components.iframe(map_url, height=400)
+            with span("main.map"):
+                st.markdown("**아래 지도는 입력한 주소를 기준으로 한 실제 지도 화면입니다.**")
+                components.iframe(map_url, height=400)
 
-            lifestyle_comment = get_lifestyle_comment(
-                address, noise_sensitive, hate_walking, night_active
-            )
+            with span("main.helper_text"):
+                lifestyle_comment = get_lifestyle_comment(
+                    address, noise_sensitive, hate_walking, night_active
+                )
             if lifestyle_comment:
                 st.markdown(lifestyle_comment)
 
-            poi_summary = get_poi_summary_text(address)
-            if poi_summary:
-                st.markdown(poi_summary)
+            with span("main.poi"):
+                poi_index = get_poi_index(poi_index_stamp())
+                nearby = poi_index.summary(address) if poi_index is not None else None
+            if nearby:
+                lat, lon, precision = nearby.pop("location")
+                st.markdown("**주변 시설까지 직선거리 (오프라인 데이터 기준)**")
+                st.dataframe(
+                    [
+                        {
+                            "구분": POI_CATEGORIES[category],
+                            "이름": name,
+                            "거리": f"{meters:,.0f}m",
+                            "도보(추정)": f"약 {walk_minutes(meters)}분",
+                        }
+                        for category, hits in nearby.items()
+                        for name, meters in hits
+                    ],
+                    hide_index=True,
+                    use_container_width=True,
+                )
+                if precision != "주소":
+                    st.caption("번지 좌표가 없어 동네 중심 좌표로 계산했어요. 실제 거리와 차이가 있을 수 있어요.")
+            else:
+                poi_summary = get_poi_summary_text(address)
+                if poi_summary:
+                    st.markdown(poi_summary)
         else:
             st.caption(
                 "주소를 입력하면, 해당 주소 기준 실제 지도와 주변 지하철·편의점·공원·큰 도로 정보를 요약해서 보여줍니다."
@@ -646,7 +658,7 @@ with main_tab:
         if analysis is None:
             st.caption("등기부를 업로드하면 여기에서 근저당·가압류 등 간단한 위험 신호를 분석해 줍니다.")
         else:
-            if not analysis["raw_text"]:
+            if not analysis["text_length"]:
                 st.error(
                     "등기부 텍스트를 추출하지 못했습니다. 스캔 이미지이거나, PDF 구조가 특이할 수 있어요.\n"
                     "텍스트 기반 PDF인지 확인해 주세요."
@@ -668,12 +680,38 @@ with main_tab:
                 else:
                     st.write("- '소유자/소유권'이 들어간 줄을 찾지 못했습니다. (서식에 따라 다를 수 있음)")
 
+                registry = analysis["registry"]
+                if registry.entries:
+                    active = registry.count("근저당권", active_only=True)
+                    cancelled = registry.count("근저당권") - active
+                    st.write(
+                        f"- 을구 항목 기준 근저당권: 유효 {active}건"
+                        + (f" (말소된 {cancelled}건 제외)" if cancelled else "")
+                    )
+
                 st.markdown("**② 위험 신호 요약 (참고용)**")
                 for w in analysis["warnings"]:
                     st.write("- " + w)
 
-                with st.expander("등기부 텍스트 일부 보기 (디버그용)"):
-                    st.text(analysis["preview"])
+                with st.expander("등기부 항목 구조 보기 (디버그용)"):
+                    if registry.entries:
+                        st.dataframe(
+                            [
+                                {
+                                    "구역": e.section,
+                                    "순위번호": e.rank,
+                                    "종류": e.kind,
+                                    "접수일": e.date or "",
+                                    "금액(원)": e.amount,
+                                    "말소": "말소됨" if e.cancelled else "",
+                                }
+                                for e in registry.entries
+                            ],
+                            use_container_width=True,
+                        )
+                    else:
+                        st.caption("표제부/갑구/을구 구역을 찾지 못했습니다. (서식에 따라 다를 수 있음)")
+                    st.caption("분석 캐시: " + get_registry_cache().stats_text())
 
         st.caption(
             "※ 깡통체크의 등기부 분석은 단순한 패턴 매칭에 기반한 교육용 기능입니다.\n"
@@ -681,10 +719,17 @@ with main_tab:
         )
 
 
+with main_tab:
+    if main_tab.open is not False:
+        render_main_tab()
+
+
 # ================================
 # 2) 계약 전 체크리스트 탭
 # ================================
-with tab_check:
+@st.fragment
+@timed("tab.checklist")
+def render_checklist_tab():
     st.subheader("계약 전 체크리스트")
     st.caption(
         "집 보러 갈 때 휴대폰으로 열어두고 항목을 하나씩 체크해 보세요. "
@@ -738,41 +783,116 @@ with tab_check:
         "앱을 새로 고쳐도 같은 브라우저 세션에서 다시 열면 상태가 유지돼요."
     )
 
+with tab_check:
+    if tab_check.open is not False:
+        render_checklist_tab()
+
 
 # ================================
 # 3) 집 후기 탭
 # ================================
-with tab_review:
+REVIEW_BODY_CACHE_ITEMS = 200
+
+
+def review_page_summaries(store, addr_key, total, page):
+    """현재 페이지 후기 머리글 (본문 없이, 못 읽은 페이지면 다음 페이지까지 한 번에 읽어서 세션에 둠)"""
+    window = st.session_state["review_window"]
+    if window is None or window["key"] != (addr_key, total):
+        # 주소가 바뀌었거나 새 후기가 달리면 페이지 경계가 밀리므로 새로
+        window = st.session_state["review_window"] = {"key": (addr_key, total), "pages": {}}
+    pages = window["pages"]
+    if page not in pages:
+        rows = store.list_review_summaries(addr_key, REVIEW_PAGE_SIZE * 2, (page - 1) * REVIEW_PAGE_SIZE)
+        pages[page] = rows[:REVIEW_PAGE_SIZE]
+        pages[page + 1] = rows[REVIEW_PAGE_SIZE:]
+    return pages[page]
+
+
+def review_expander(label, summary, where):
+    """후기 하나: 머리글만 그리고, 본문은 펼쳤을 때만 읽어서 그림 (where: 같은 후기가 목록·검색 결과에 같이 나올 때 구분)"""
+    expander = st.expander(label, key=f"review_open_{where}_{summary['id']}", on_change="rerun")
+    if expander.open is False:
+        return
+    bodies = st.session_state["review_bodies"]
+    review = bodies.get(summary["id"])
+    if review is None:
+        found = get_review_store().get_reviews([summary["id"]])
+        if not found:
+            return
+        if len(bodies) >= REVIEW_BODY_CACHE_ITEMS:
+            bodies.clear()
+        review = bodies[summary["id"]] = found[0]
+    with expander:
+        st.write("· 거주 기간:", review["period"])
+        st.write("· 좋았던 점:", review["pros"])
+        st.write("· 아쉬웠던 점 / 주의할 점:", review["cons"])
+        flags = review_flags(review)
+        if flags:
+            st.write("· 한 줄 요약 태그:", ", ".join(flags))
+
+
+def save_review(address):
+    s = st.session_state
+    new_r = {
+        "nickname": s["review_nickname"] or "익명",
+        "period": s["review_period"],
+        "rating": s["review_rating"],
+        "pros": s["review_pros"],
+        "cons": s["review_cons"],
+    }
+    for name, _ in REVIEW_FLAGS:
+        new_r[name] = s[f"review_{name}"]
+    try:
+        get_review_store().add_review(address, new_r)
+    except ReviewError as e:
+        s["review_saved"] = str(e)
+    else:
+        s["review_saved"] = True
+
+
+@st.fragment
+@timed("tab.review")
+def render_review_tab():
     st.subheader("집 후기 (세입자 경험 공유)")
 
-    addr_key = (st.session_state["address"] or "").strip()
+    address_input = (st.session_state["address"] or "").strip()
+    addr_key = review_address_key(address_input)
 
     if not addr_key:
         st.info("먼저 **메인 탭에서 주소를 입력**하면, 해당 주소 기준으로 후기를 남기고 볼 수 있어요.")
     else:
-        reviews = st.session_state["reviews"].get(addr_key, [])
-        st.markdown(f"**현재 이 주소에 등록된 후기: {len(reviews)}개**")
-
-        if reviews:
-            for i, r in enumerate(reviews):
-                header = f"후기 #{i+1} · {r.get('nickname', '익명')} · 별점 {r.get('rating', 0)}/5"
-                with st.expander(header):
-                    st.write("· 거주 기간:", r.get("period", ""))
-                    st.write("· 좋았던 점:", r.get("pros", ""))
-                    st.write("· 아쉬웠던 점 / 주의할 점:", r.get("cons", ""))
-                    flags = []
-                    if r.get("noise_issue"):
-                        flags.append("소음 심함")
-                    if r.get("bug_issue"):
-                        flags.append("벌레 자주 나옴")
-                    if r.get("mold_issue"):
-                        flags.append("곰팡이/누수 문제")
-                    if r.get("landlord_good"):
-                        flags.append("집주인 친절함")
-                    if r.get("landlord_bad"):
-                        flags.append("집주인/관리 응대 불친절")
-                    if flags:
-                        st.write("· 한 줄 요약 태그:", ", ".join(flags))
+        review_store = get_review_store()
+        # 개수·요약은 후기를 넣을 때마다 갱신된 집계 한 줄만 읽음 (후기를 세지 않음)
+        stats = review_store.get_stats(addr_key)
+        review_total = stats.count
+        st.markdown(f"**현재 이 주소에 등록된 후기: {review_total}개**")
+        if addr_key != address_input:
+            st.caption(f"같은 집으로 묶는 주소: {addr_key}")
+
+        if stats.count:
+            c1, c2, c3 = st.columns(3)
+            c1.metric("평균 별점", f"{stats.average_rating:.1f} / 5")
+            c2.metric("집주인 친절 / 불친절", f"{stats.flags['landlord_good']} / {stats.flags['landlord_bad']}")
+            c3.metric("별점 분포 (1→5점)", " · ".join(map(str, stats.rating_hist)))
+            st.caption(
+                " · ".join(
+                    f"{label} {stats.flag_share(name):.0%}"
+                    for name, label in REVIEW_FLAGS
+                    if not name.startswith("landlord")
+                )
+            )
+
+        if review_total:
+            page_count = (review_total + REVIEW_PAGE_SIZE - 1) // REVIEW_PAGE_SIZE
+            page = 1
+            if page_count > 1:
+                page = st.number_input(
+                    f"페이지 (1~{page_count}, 최신 후기부터)", min_value=1, max_value=page_count, value=1, step=1
+                )
+            offset = (page - 1) * REVIEW_PAGE_SIZE
+            with span("review.list"):
+                for i, r in enumerate(review_page_summaries(review_store, addr_key, review_total, page)):
+                    review_expander(f"후기 #{review_total - offset - i} · {r['nickname']} · 별점 {r['rating']}/5", r, "list")
         else:
             st.write("아직 등록된 후기가 없습니다. 이 집에 살아본 적이 있다면 첫 후기를 남겨 주세요!")
 
@@ -780,49 +900,104 @@ with tab_review:
         st.markdown("### 새 후기 남기기")
 
         with st.form("review_form"):
-            nickname = st.text_input("닉네임 (선택)", placeholder="예) 전세살이 2년차")
-            period = st.selectbox(
-                "실제 거주 기간 (대략)", ["6개월 미만", "6개월~1년", "1~2년", "2년 이상"]
+            st.text_input("닉네임 (선택)", placeholder="예) 전세살이 2년차", key="review_nickname")
+            st.selectbox(
+                "실제 거주 기간 (대략)", ["6개월 미만", "6개월~1년", "1~2년", "2년 이상"], key="review_period"
             )
-            rating = st.slider("별점 (1~5)", min_value=1, max_value=5, value=4)
-            pros = st.text_area(
-                "좋았던 점", height=80, placeholder="예) 역이 가깝고 채광이 좋아요."
+            st.slider("별점 (1~5)", min_value=1, max_value=5, key="review_rating")
+            st.text_area(
+                "좋았던 점", height=80, placeholder="예) 역이 가깝고 채광이 좋아요.", key="review_pros"
             )
-            cons = st.text_area(
+            st.text_area(
                 "아쉬웠던 점 / 주의할 점",
                 height=80,
                 placeholder="예) 층간소음이 심해서 밤에 시끄러웠어요.",
+                key="review_cons",
             )
-            noise_issue = st.checkbox("소음이 신경 쓰였어요")
-            bug_issue = st.checkbox("벌레가 자주 나왔어요")
-            mold_issue = st.checkbox("곰팡이/누수 문제 있었어요")
-            landlord_good = st.checkbox("집주인이 비교적 친절했어요")
-            landlord_bad = st.checkbox("집주인/관리인 응대가 별로였어요")
-            submitted = st.form_submit_button("후기 등록하기")
-
-        if submitted:
-            new_r = {
-                "nickname": nickname or "익명",
-                "period": period,
-                "rating": rating,
-                "pros": pros,
-                "cons": cons,
-                "noise_issue": noise_issue,
-                "bug_issue": bug_issue,
-                "mold_issue": mold_issue,
-                "landlord_good": landlord_good,
-                "landlord_bad": landlord_bad,
-            }
-            all_reviews = st.session_state["reviews"].get(addr_key, [])
-            all_reviews.append(new_r)
-            st.session_state["reviews"][addr_key] = all_reviews
-            st.success("후기가 저장되었습니다. 위 목록에서 방금 남긴 후기를 확인할 수 있어요.")
+            st.checkbox("소음이 신경 쓰였어요", key="review_noise_issue")
+            st.checkbox("벌레가 자주 나왔어요", key="review_bug_issue")
+            st.checkbox("곰팡이/누수 문제 있었어요", key="review_mold_issue")
+            st.checkbox("집주인이 비교적 친절했어요", key="review_landlord_good")
+            st.checkbox("집주인/관리인 응대가 별로였어요", key="review_landlord_bad")
+            # 저장은 콜백에서 → 스크립트보다 먼저 실행되므로 위 목록에 방금 남긴 후기가 바로 보임
+            st.form_submit_button("후기 등록하기", on_click=save_review, args=(address_input,))
+
+        saved = st.session_state.pop("review_saved", None)
+        if saved is True:
+            st.success("후기가 저장되었습니다. 위 목록 맨 위에서 방금 남긴 후기를 확인할 수 있어요.")
+        elif saved is not None:
+            st.error(f"후기를 저장하지 못했습니다: {saved}")
+
+    # ---- 모든 주소 후기 검색 ----
+    st.markdown("---")
+    st.markdown("### 후기 검색 (모든 주소)")
+    def reset_review_search_page():
+        # 검색 조건이 바뀌면 첫 페이지부터
+        st.session_state["review_search_page"] = 1
+
+    search_query = st.text_input(
+        "검색어",
+        placeholder="예) 층간소음, 집주인 연락 두절",
+        key="review_search_query",
+        on_change=reset_review_search_page,
+    )
+    sc1, sc2 = st.columns(2)
+    with sc1:
+        search_ratings = st.slider(
+            "별점 범위", min_value=1, max_value=5, key="review_search_ratings",
+            on_change=reset_review_search_page,
+        )
+    with sc2:
+        search_flag_labels = st.multiselect(
+            "태그 (모두 포함)", [label for _, label in REVIEW_FLAGS], key="review_search_flags",
+            on_change=reset_review_search_page,
+        )
+    if search_query.strip():
+        flag_names = {label: name for name, label in REVIEW_FLAGS}
+        search_page = st.session_state.get("review_search_page", 1)
+        search_args = dict(
+            limit=SEARCH_PAGE_SIZE,
+            min_rating=search_ratings[0],
+            max_rating=search_ratings[1],
+            flags=[flag_names[label] for label in search_flag_labels],
+        )
+        result = get_review_search().search(search_query, offset=(search_page - 1) * SEARCH_PAGE_SIZE, **search_args)
+        if search_page > 1 and not result["hits"]:
+            st.session_state["review_search_page"] = 1
+            result = get_review_search().search(search_query, **search_args)
+        if not result["terms"]:
+            st.caption("두 글자 이상인 낱말로 검색해 주세요.")
+        elif not result["total"]:
+            st.write("검색 결과가 없습니다.")
+        else:
+            if result["partial"]:
+                st.caption("모든 낱말이 들어간 후기가 없어서, 일부 낱말만 맞는 후기를 보여드려요.")
+            page_count = (result["total"] + SEARCH_PAGE_SIZE - 1) // SEARCH_PAGE_SIZE
+            st.markdown(f"**검색 결과 {result['total']:,}개**")
+            if page_count > 1:
+                st.number_input(
+                    f"검색 결과 페이지 (1~{page_count})",
+                    min_value=1,
+                    max_value=page_count,
+                    step=1,
+                    key="review_search_page",
+                )
+            # 검색 결과도 머리글만 읽고, 본문은 펼친 후기만 review_expander 가 따로 읽음
+            found = get_review_store().get_review_summaries([review_id for review_id, _ in result["hits"]])
+            for r in found:
+                review_expander(f"{r['address_key']} · {r['nickname']} · 별점 {r['rating']}/5", r, "search")
+
+
+with tab_review:
+    if tab_review.open is not False:
+        render_review_tab()
 
 
 # ================================
 # 4) 사후 대응 탭
 # ================================
-with tab_after:
+@timed("tab.after")
+def render_after_tab():
     st.subheader("분쟁(보증금 미반환·전세사기 의심) 발생 시 대응 플로우")
 
     after_text = (
@@ -851,14 +1026,22 @@ with tab_after:
     )
     st.markdown(after_text)
 
+with tab_after:
+    if tab_after.open is not False:
+        render_after_tab()
+
 
 # ================================
 # 5) 부모님과 결과 공유 탭
 # ================================
-with tab_share:
+@timed("tab.share")
+def render_share_tab():
     st.subheader("부모님과 결과 공유")
 
     s = st.session_state
+    # 메인 탭을 다시 안 거쳐도 규칙 파일이 바뀌었거나 후기가 달렸으면 여기서 다시 계산
+    rules = get_rules()
+    refresh_score(rules)
     score = s["score"]
     deposit = s["deposit"]
     rent = s["rent"]
@@ -873,7 +1056,7 @@ with tab_share:
     if score is None or deposit <= 0:
         st.write("먼저 **메인 탭에서 주소·보증금 등을 입력하고 '위험도 스캔하기'** 버튼을 눌러 주세요.")
     else:
-        level, msg = risk_label(score)
+        level, msg = risk_label(score, rules)
         issues_text = ", ".join(memo_issues) if memo_issues else "특이사항 없음"
 
         lifestyle_bits = []
@@ -899,6 +1082,7 @@ with tab_share:
         lines.append("• 생활 패턴: " + lifestyle_text)
         lines.append("")
         lines.append("• 위험도 점수: " + str(score) + " / 100점 (" + level + ")")
+        lines.append("• 점수 규칙 버전: " + str(s["score_rules_version"]))
         lines.append("• 내부 하자·위험 요소(메모 기준): " + issues_text)
         lines.append("")
         lines.append("• 요약 코멘트: " + msg)
@@ -917,33 +1101,203 @@ with tab_share:
             "  - 혹시 더 안전한 매물이 있는지, 중개사에게 무엇을 더 물어봐야 할지"
         )
 
+with tab_share:
+    if tab_share.open is not False:
+        render_share_tab()
+
 
 # ================================
 # 6) 조건 시뮬레이션 탭
 # ================================
-with tab_sim:
+@st.fragment
+@timed("tab.sim")
+def render_sim_tab():
     st.subheader("조건 시뮬레이션")
 
     s_deposit = st.slider(
-        "보증금 (원)", min_value=5_000_000, max_value=300_000_000, value=50_000_000, step=5_000_000
+        "보증금 (원)", min_value=5_000_000, max_value=300_000_000, step=5_000_000, key="sim_deposit"
     )
     s_rent = st.slider(
-        "월세 (원)", min_value=0, max_value=3_000_000, value=500_000, step=50_000
+        "월세 (원)", min_value=0, max_value=3_000_000, step=50_000, key="sim_rent"
     )
-    s_type = st.selectbox("계약 형태(가정)", ["전세", "반전세", "월세"])
-
-    sim_score, _ = compute_risk_score(
-        s_deposit,
-        s_rent,
-        s_type,
-        "",
-        jeonse_rate_sale=None,
-        jeonse_rate_market=None,
+    s_type = st.selectbox("계약 형태(가정)", SIM_TYPES, key="sim_type")
+
+    # 전체 격자는 캐시에서 꺼내고, 현재 슬라이더 위치 점수는 격자에서 바로 찾음
+    rules = get_rules()
+    rules_key = rules.key
+    grid = get_sim_grid(rules_key)
+    sim_score = int(
+        grid[
+            SIM_TYPES.index(s_type),
+            SIM_RENTS.index(s_rent),
+            SIM_DEPOSITS.index(s_deposit),
+        ]
     )
-    level, msg = risk_label(sim_score)
+    level, msg = risk_label(sim_score, rules)
 
     st.markdown(f"**시뮬레이션 점수: {sim_score} / 100점 · {level}**")
     st.progress(sim_score / 100.0)
+
+    with span("sim.figure"):
+        fig = get_sim_heatmap(s_type, rules_key)
+        fig.add_scatter(
+            x=[s_deposit / 10_000],
+            y=[s_rent / 10_000],
+            mode="markers",
+            marker=dict(size=14, color="white", line=dict(color="black", width=2), symbol="x"),
+            hovertemplate="현재 조건<br>보증금 %{x:,}만원<br>월세 %{y:,}만원<extra></extra>",
+        )
+    with span("sim.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+    boundary_text = "·".join(
+        f"'{band['level'].split(' (')[0]}({cutoff}점)'" for band, cutoff in zip(rules.labels.bands[1:], rules.label_cutoffs())
+    )
+    st.caption(
+        f"색이 진할수록 위험도가 높아요. 점선은 {boundary_text} 경계선이고, ✕ 표시가 현재 슬라이더 위치입니다."
+    )
     st.caption("보증금·월세·계약 형태에 따라 위험도가 어떻게 바뀌는지 감각을 익히기 위한 기능입니다.")
 
+with tab_sim:
+    if tab_sim.open is not False:
+        render_sim_tab()
+
+
+# ================================
+# 7) 여러 매물 비교 탭
+# ================================
+COMPARE_SORT_COLUMNS = {
+    "위험도 점수": "score",
+    "보증금": "deposit",
+    "월세": "rent",
+    "집값 대비 전세가율": "jeonse_rate_sale",
+    "전세 시세 대비 비율": "jeonse_rate_market",
+    "주소": "address",
+    "원본 순서": "row",
+}
+COMPARE_VIEW_COLUMNS = {
+    "rank": "순위",
+    "address": "주소",
+    "contract_type": "계약 형태",
+    "deposit": "보증금",
+    "rent": "월세",
+    "jeonse_rate_sale": "집값 대비(%)",
+    "jeonse_rate_market": "시세 대비(%)",
+    "score": "점수",
+    "level": "위험 수준",
+    "issues": "메모 위험 요소",
+    "error": "입력 오류",
+}
+
+def clear_compare_if_removed():
+    # 업로더를 사용자가 비웠을 때만 결과를 지움 (탭을 옮겨서 업로더가 비는 경우는 유지)
+    if st.session_state.get("listing_file") is None:
+        st.session_state["compare_key"] = st.session_state["compare_result"] = st.session_state["compare_csv"] = None
+
+
+@st.fragment
+@timed("tab.compare")
+def render_compare_tab():
+    st.subheader("여러 매물 한 번에 비교")
+    st.caption(
+        "후보 매물 목록을 CSV/Excel 로 올리면 한 번에 위험도를 계산해서 순위를 매겨 줘요. "
+        "첫 줄 컬럼: 주소, 보증금, 월세, 계약형태, 매매가, 전세시세, 메모 (보증금만 필수)"
+    )
+
+    s = st.session_state
+    rules = get_rules()
+    listing_file = st.file_uploader(
+        "후보 매물 목록 (CSV 또는 .xlsx)",
+        type=["csv", "xlsx"],
+        key="listing_file",
+        on_change=clear_compare_if_removed,
+    )
+
+    if listing_file is not None:
+        try:
+            compare_key = (file_sha256(listing_file), rules.key)
+            # 같은 파일·같은 규칙이면 정렬/페이지를 바꿔도 다시 읽지 않음
+            if s["compare_key"] != compare_key:
+                bar = st.progress(0.0, text="매물 목록 읽는 중...")
+
+                def on_listing_progress(rows):
+                    done = min(listing_file.tell() / max(listing_file.size, 1), 1.0)
+                    bar.progress(done, text=f"{rows:,}개 매물 점수 계산 중...")
+
+                s["compare_result"] = score_listing_file(
+                    listing_file, listing_file.name, on_progress=on_listing_progress, rules=rules
+                )
+                # 다운로드용 CSV 도 파일이 바뀔 때 한 번만 만듦
+                result = s["compare_result"]
+                s["compare_csv"] = result.assign(issues=result["issues"].map(", ".join)).to_csv(index=False).encode("utf-8-sig")
+                s["compare_key"] = compare_key
+                bar.empty()
+        except (UploadTooLarge, ListingFileError) as e:
+            st.error(str(e))
+            s["compare_key"] = s["compare_result"] = None
+
+    result = s["compare_result"]
+    if result is not None:
+        counts = result["level"].value_counts()
+        cols = st.columns(1 + len(rules.labels.bands))
+        cols[0].metric("매물 수", f"{len(result):,}")
+        for col, band in zip(cols[1:], rules.labels.bands):
+            col.metric(band["level"], f"{int(counts.get(band['level'], 0)):,}")
+        invalid = int(counts.get(INPUT_ERROR_LEVEL, 0))
+        if invalid:
+            st.warning(
+                f"보증금이 비었거나 금액을 읽을 수 없는 매물 {invalid:,}개는 점수·순위 없이 맨 뒤에 뒀어요. "
+                "금액은 숫자(150000000) 또는 '1억5천만' 처럼 적어 주세요."
+            )
+        if result.attrs.get("truncated"):
+            st.warning(f"매물이 너무 많아서 앞쪽 {MAX_LISTING_ROWS:,}개만 계산했어요.")
+
+        c1, c2, c3 = st.columns([2, 1, 1])
+        with c1:
+            sort_label = st.selectbox("정렬 기준", list(COMPARE_SORT_COLUMNS), key="compare_sort")
+        with c2:
+            ascending = st.radio("순서", ["오름차순", "내림차순"], horizontal=True, key="compare_order") == "오름차순"
+        with c3:
+            page_size = st.selectbox("페이지당", [20, 50, 100], key="compare_page_size")
+
+        sort_col = COMPARE_SORT_COLUMNS[sort_label]
+        ordered = result.sort_values([sort_col, "rank"], ascending=[ascending, True], kind="stable", na_position="last")
+        pages = max(1, -(-len(ordered) // page_size))
+        page = st.number_input(f"페이지 (총 {pages:,}쪽)", min_value=1, max_value=pages, step=1, key="compare_page")
+
+        # 현재 페이지 행만 화면에 그림
+        view = ordered.iloc[(page - 1) * page_size : page * page_size][list(COMPARE_VIEW_COLUMNS)].copy()
+        view["issues"] = view["issues"].map(", ".join)
+        st.dataframe(
+            view.rename(columns=COMPARE_VIEW_COLUMNS),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "보증금": st.column_config.NumberColumn(format="%,d원"),
+                "월세": st.column_config.NumberColumn(format="%,d원"),
+                "집값 대비(%)": st.column_config.NumberColumn(format="%.1f"),
+                "시세 대비(%)": st.column_config.NumberColumn(format="%.1f"),
+                "점수": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%d"),
+            },
+        )
+        st.caption(f"점수 규칙 버전: {result['rules_version'].iat[0]} · 순위는 위험도가 낮은 순서예요.")
+
+        st.download_button(
+            "전체 결과 CSV 다운로드",
+            s["compare_csv"],
+            file_name="kkangtong_compare.csv",
+            mime="text/csv",
+        )
+
+
+with tab_compare:
+    if tab_compare.open is not False:
+        render_compare_tab()
+
+
 st.caption("© 2025 깡통체크(가상 서비스) · 전세사기 예방 교육용 프로토타입")
+
+
+rerun_finished()
+
+# 실행 시간 디버그 패널 (주소 뒤에 ?debug=1 을 붙였을 때만 사이드바에 보임)
+render_profile_panel()
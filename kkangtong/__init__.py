@@ -0,0 +1,10 @@
+"""
+깡통체크 공용 로직 (Streamlit 없이 import 가능한 모듈 모음)
+
+- 점수·등기부·매물 목록·후기 쪽 모듈(rules, scoring, listings, registry, pdf_pages, address, regions, reviews,
+  uploads, ocr, profiling)은 numpy·pandas·plotly·PyPDF2·multiprocessing 같은 무거운 라이브러리를 함수 안에서
+  처음 쓸 때 로드 → 배치 작업·API·테스트·PDF 추출 워커가 import 만 할 때는 기다리지 않음
+- 배열 색인 모듈 market, spatial, review_search 는 거의 모든 함수가 numpy 배열이라 import 할 때 numpy 를 바로 읽음
+  (쓰는 곳은 화면(check.py, Streamlit 이 이미 numpy 를 읽음)과 색인 만드는 CLI 뿐)
+- 확인: benchmarks/bench_imports.py (import 시간·같이 읽힌 라이브러리), tests/test_imports.py
+"""
@@ -0,0 +1,285 @@
+"""
+주소 정규화 (시도/시군구/읍면동/도로명 → 정규 키, Streamlit 없이 import 가능)
+
+- 행정구역 표(data/admin_districts.tsv, 있으면 법정동코드 전체자료.txt 도)를 한 번만 읽어서
+  글자 단위 트라이를 만들어 둠
+- 주소 문자열을 공백을 뺀 채로 앞에서부터 한 번 훑으면서(가장 긴 이름 우선) 시도·시군구·동 이름을
+  찾고, 서로 맞는 조합만 남겨서 "서울 은평구 진관동" 같은 정규 키로 만듦 → 주소 길이에 비례
+- "중구"·"신사동"처럼 여러 곳에 있는 이름은 앞뒤 이름으로 좁히고, 그래도 여러 곳이면 공통 상위 구역까지만
+- 지번(123-4)·도로명(진관2로 10)은 공백 단위로 따로 뽑음
+- normalize_address 결과는 lru_cache 로 프로세스 전체(모든 세션)가 같이 씀
+"""
+import os
+import re
+import functools
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DISTRICTS_PATH = os.path.join(DATA_DIR, "admin_districts.tsv")
+LEGAL_DONG_PATH = os.path.join(DATA_DIR, "법정동코드 전체자료.txt")   # 있으면 같이 읽음 (행정표준코드관리시스템 배포 파일)
+
+_JIBUN_RE = re.compile(r"^(산)?(\d+)(?:-(\d+))?(?:번지)?$")
+_ROAD_RE = re.compile(r"^[가-힣A-Za-z0-9·]+(?:로|길)$")
+_PLACE_RE = re.compile(r"^[가-힣0-9·]+(?:동|읍|면|리|가)$")   # 행정구역 표에 없는 동 이름도 지번 앞에 있으면 씀
+_STRIP_RE = re.compile(r"[\s,()\[\]]+")
+_END = ""  # 트라이에서 이름이 끝나는 자리 표시
+
+
+def jibun_key(token):
+    """"0123-0004번지" → "123-4", "산12-0" → "산12" (지번이 아니면 None)"""
+    m = _JIBUN_RE.match(token)
+    if not m:
+        return None
+    san, main, sub = m.groups()
+    key = ("산" if san else "") + str(int(main))
+    if sub and int(sub):
+        key += f"-{int(sub)}"
+    return key
+
+
+# ================================
+# 행정구역 표 → 트라이
+# ================================
+class DistrictIndex:
+    """
+    이름 → 정규 구역 키 목록 트라이
+
+    정규 구역 키는 "시도약칭 시군구 읍면동" (예: "서울 은평구 진관동", "경기 수원시 장안구")
+    paths[키] = (시도, 시군구, 읍면동)
+    """
+
+    def __init__(self):
+        self.trie = {}
+        self.paths = {}
+        self._sido_names = set()
+
+    def add_name(self, name, key):
+        node = self.trie
+        for ch in _STRIP_RE.sub("", name):
+            node = node.setdefault(ch, {})
+        keys = node.setdefault(_END, [])
+        if key not in keys:
+            keys.append(key)
+
+    def add_district(self, sido_full, sido, sigungu="", dong=""):
+        self.paths.setdefault(sido, (sido, "", ""))
+        self._sido_names.update((sido_full, sido))
+        self.add_name(sido_full, sido)
+        self.add_name(sido, sido)
+        if not sigungu:
+            if dong:  # 세종처럼 시군구 없이 바로 동
+                self.paths.setdefault(f"{sido} {dong}", (sido, "", dong))
+                self.add_name(dong, f"{sido} {dong}")
+            return
+        parts = sigungu.split()
+        if len(parts) > 1:
+            # "수원시 장안구" 는 "수원시" 만 적어도 찾을 수 있게 상위 구역도 등록
+            parent = f"{sido} {parts[0]}"
+            self.paths.setdefault(parent, (sido, parts[0], ""))
+            self.add_name(parts[0], parent)
+        sgg_key = f"{sido} {sigungu}"
+        self.paths.setdefault(sgg_key, (sido, sigungu, ""))
+        self.add_name(sigungu, sgg_key)
+        self.add_name(parts[-1], sgg_key)
+        # "은평구" 를 "은평" 으로만 적는 경우 (두 글자 이상 남고, 시도 이름("광주")과 겹치지 않을 때만)
+        short = parts[-1][:-1]
+        if len(short) >= 2 and short not in self._sido_names:
+            self.add_name(short, sgg_key)
+        if dong:
+            dong_key = f"{sgg_key} {dong}"
+            self.paths.setdefault(dong_key, (sido, sigungu, dong))
+            self.add_name(dong, dong_key)
+
+    def add_alias(self, name, key):
+        """역 이름·동네 별칭 등 → 이미 있는 구역 키"""
+        if key not in self.paths:
+            raise KeyError(f"등록되지 않은 구역입니다: {key}")
+        self.add_name(name, key)
+
+    def scan(self, text):
+        """공백을 뺀 주소를 한 번 훑어서 찾은 이름들의 구역 키 목록 (앞에서부터, 가장 긴 이름 우선)"""
+        s = _STRIP_RE.sub("", text)
+        hits = []
+        i, n = 0, len(s)
+        while i < n:
+            node, end, keys = self.trie, i, None
+            j = i
+            while j < n:
+                node = node.get(s[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    end, keys = j, node[_END]
+            if keys:
+                hits.append(keys)
+                i = end
+            else:
+                i += 1
+        return hits
+
+    def resolve(self, text):
+        """주소 → 정규 구역 키 (못 찾으면 "")"""
+        candidates = None
+        for keys in self.scan(text):
+            if candidates is None:
+                candidates = set(keys)
+                continue
+            # 앞에서 찾은 구역 안에 있는 이름이면 더 좁히고, 상위 구역 이름이면 그 안의 후보만 남김
+            narrower = {k for k in keys if any(_within(k, c) for c in candidates)}
+            if narrower:
+                candidates = narrower
+                continue
+            inside = {c for c in candidates if any(_within(c, k) for k in keys)}
+            if inside:
+                candidates = inside
+        if not candidates:
+            return ""
+        return _common_prefix(candidates)
+
+    @classmethod
+    def load(cls, districts_path=DISTRICTS_PATH, legal_dong_path=LEGAL_DONG_PATH):
+        index = cls()
+        sido_short = {}
+        with open(districts_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                sido_full, sido, sigungu, dong = (line.rstrip("\n").split("\t") + ["", "", "", ""])[:4]
+                sido_short[sido_full] = sido
+                index.add_district(sido_full, sido, sigungu, dong)
+        if legal_dong_path and os.path.exists(legal_dong_path):
+            for sido_full, sigungu, dong in _iter_legal_dong_rows(legal_dong_path):
+                sido = sido_short.get(sido_full)
+                if sido is not None:
+                    index.add_district(sido_full, sido, sigungu, dong)
+        return index
+
+
+def _within(key, parent):
+    return key == parent or key.startswith(parent + " ")
+
+
+def _common_prefix(keys):
+    token_lists = [k.split() for k in keys]
+    prefix = []
+    for tokens in zip(*token_lists):
+        if any(t != tokens[0] for t in tokens):
+            break
+        prefix.append(tokens[0])
+    return " ".join(prefix)
+
+
+def _iter_legal_dong_rows(path):
+    """법정동코드 전체자료.txt (법정동코드\\t법정동명\\t폐지여부) → (시도, 시군구, 읍면동)"""
+    for encoding in ("utf-8", "cp949"):
+        try:
+            with open(path, encoding=encoding) as f:
+                lines = f.read().splitlines()
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        return
+    for line in lines[1:]:
+        cols = line.split("\t")
+        if len(cols) < 3 or cols[2].strip() != "존재":
+            continue
+        tokens = cols[1].split()
+        if len(tokens) < 2:
+            continue
+        sido_full, rest = tokens[0], tokens[1:]
+        if len(rest) >= 2 and rest[0].endswith("시") and rest[1].endswith("구"):
+            sigungu, rest = f"{rest[0]} {rest[1]}", rest[2:]
+        elif rest[0].endswith(("시", "군", "구")):
+            sigungu, rest = rest[0], rest[1:]
+        else:
+            sigungu = ""  # 세종처럼 시군구가 없는 경우
+        dong = rest[0] if rest and rest[0].endswith(("동", "읍", "면", "가")) else ""
+        yield sido_full, sigungu, dong
+
+
+@functools.lru_cache(maxsize=1)
+def get_district_index():
+    """프로세스 전체에서 한 번만 만드는 기본 행정구역 인덱스"""
+    return DistrictIndex.load()
+
+
+# ================================
+# 주소 정규화
+# ================================
+class NormalizedAddress:
+    """
+    normalize_address() 결과 (읽기 전용)
+
+    - region: 정규 구역 키 ("서울 은평구 진관동", 모르면 "")
+    - sido / sigungu / dong: 구역 키를 나눈 값
+    - road: 도로명 ("진관2로"), number: 지번 또는 건물 번호 ("123-4")
+    - place: 지번 바로 앞의 동 이름 원문 ("신당동") — 행정구역 표에 그 동이 없을 때 대신 씀
+    - key: region + 도로명/동 이름 + 번호 (같은 집이면 같은 키). 번호나 동·도로명을 모르면 region 까지만
+    - specific: key 가 집 하나를 가리키는지 (번호 + 도로명/동) — 아니면 key 는 구역 전체
+    """
+
+    __slots__ = ("raw", "region", "sido", "sigungu", "dong", "road", "number", "place", "key")
+
+    def __init__(self, raw, region, sido, sigungu, dong, road, number, place=""):
+        self.raw = raw
+        self.region = region
+        self.sido = sido
+        self.sigungu = sigungu
+        self.dong = dong
+        self.road = road
+        self.number = number
+        self.place = place if (place and not dong and not road) else ""
+        # 번호는 도로명이나 동까지 알 때만 붙임 (동을 모르면 "서울 마포구 1" 처럼 다른 집과 섞임)
+        self.key = " ".join(p for p in (region, road, self.place, number if self.specific else "") if p)
+
+    @property
+    def specific(self):
+        return bool(self.number and (self.road or self.dong or self.place))
+
+    def region_keys(self):
+        """구체적인 구역부터 상위 구역까지 ("서울 은평구 진관동", "서울 은평구", "서울")"""
+        tokens = self.region.split()
+        return [" ".join(tokens[:i]) for i in range(len(tokens), 0, -1)]
+
+    def __repr__(self):
+        return f"NormalizedAddress({self.key!r})"
+
+
+def _split_street(address):
+    """공백 단위로 도로명·지번 찾기 → (도로명, 번호, 지번 바로 앞의 동 이름)"""
+    road = number = place = ""
+    tokens = address.replace(",", " ").split()
+    for i, token in enumerate(tokens):
+        if not road and _ROAD_RE.match(token) and i + 1 < len(tokens):
+            num = jibun_key(tokens[i + 1])
+            if num is not None:
+                return token, num, ""
+        if not number:
+            num = jibun_key(token)
+            if num is not None and i > 0:
+                number = num
+                if _PLACE_RE.match(tokens[i - 1]):
+                    place = tokens[i - 1]
+                break
+    return road, number, place
+
+
+def normalize_address(address, index=None):
+    """주소 문자열 → NormalizedAddress (기본 인덱스 결과는 메모이즈)"""
+    if index is None:
+        return _normalize_cached(address or "")
+    return _normalize(address or "", index)
+
+
+@functools.lru_cache(maxsize=8192)
+def _normalize_cached(address):
+    return _normalize(address, get_district_index())
+
+
+def _normalize(address, index):
+    address = address.strip()
+    region = index.resolve(address) if address else ""
+    sido, sigungu, dong = index.paths.get(region, ("", "", ""))
+    road, number, place = _split_street(address)
+    return NormalizedAddress(address, region, sido, sigungu, dong, road, number, place)
@@ -0,0 +1,275 @@
+"""
+후보 매물 목록(CSV/Excel) 읽기 + 한 번에 점수 계산 (Streamlit 없이 import 가능)
+
+- 파일을 CHUNK_ROWS 행씩 나눠 읽고, 청크마다 score_listings (배열 계산) 로 점수를 매김
+  → 수천 행짜리 파일도 한 번에 DataFrame 을 만들지 않고, 화면은 청크마다 진행률을 갱신할 수 있음
+- 컬럼 이름은 한글/영문 둘 다 받음 (주소/address, 보증금/deposit, ...)
+- 금액 칸의 "1,000,000" 같은 쉼표는 빼고 숫자로 읽고, "2억", "3천만", "2억5천", "300만원" 같은 한글 단위도 읽음
+- 보증금이 비었거나 금액 칸을 못 읽은 행은 점수를 매기지 않음 → 점수 NaN, 위험 수준 "입력 오류",
+  순위(rank) 없이 맨 뒤로 (빈 칸을 0원으로 읽어서 '안전' 1등이 되지 않도록)
+- CSV 인코딩은 UTF-8 을 먼저 보고, 아니면 엑셀 기본 저장 형식인 CP949 로 읽음
+- Excel(.xlsx) 은 openpyxl 읽기 전용 모드로 행 단위 스트리밍 (openpyxl 이 없으면 ListingFileError)
+"""
+import os
+import re
+import codecs
+
+from kkangtong.profiling import timed
+from kkangtong.rules import get_rules
+from kkangtong.scoring import risk_levels, score_listings
+
+CHUNK_ROWS = 2_000          # 한 번에 읽어서 점수 매길 행 수
+MAX_LISTING_ROWS = 100_000  # 이보다 많으면 뒤쪽은 읽지 않음
+SNIFF_BYTES = 64 * 1024
+
+# 표준 컬럼 이름 → 받아 주는 이름들
+LISTING_COLUMN_ALIASES = {
+    "address": ("address", "주소", "매물주소"),
+    "deposit": ("deposit", "보증금"),
+    "rent": ("rent", "월세"),
+    "contract_type": ("contract_type", "계약형태", "계약 형태", "유형"),
+    "sale_price": ("sale_price", "매매가", "매매가격"),
+    "jeonse_price": ("jeonse_price", "전세시세", "전세 시세", "전세가"),
+    "memo": ("memo", "메모", "비고"),
+}
+LISTING_COLUMNS = tuple(LISTING_COLUMN_ALIASES)
+MONEY_COLUMNS = ("deposit", "rent", "sale_price", "jeonse_price")
+MONEY_COLUMN_NAMES = {"deposit": "보증금", "rent": "월세", "sale_price": "매매가", "jeonse_price": "전세시세"}
+INPUT_ERROR_LEVEL = "입력 오류"  # 점수를 못 매긴 행의 위험 수준
+
+
+class ListingFileError(ValueError):
+    """목록 파일을 읽을 수 없을 때 (형식·필수 컬럼 누락 등)"""
+
+
+# ================================
+# 컬럼 정리
+# ================================
+_ALIAS_TO_COLUMN = {
+    alias.replace(" ", "").lower(): col for col, aliases in LISTING_COLUMN_ALIASES.items() for alias in aliases
+}
+
+
+def _column_map(columns):
+    mapping = {}
+    for c in columns:
+        col = _ALIAS_TO_COLUMN.get(str(c).replace(" ", "").lower())
+        if col is not None and col not in mapping.values():
+            mapping[c] = col
+    if "deposit" not in mapping.values():
+        raise ListingFileError("보증금(deposit) 컬럼이 없습니다. 첫 줄에 컬럼 이름을 적어 주세요.")
+    return mapping
+
+
+# "2억5천", "3천만", "1.5억", "300만" → 억 / 만 단위 (억 뒤의 숫자는 만 단위: "2억5000" = 2억 5천만)
+_KOREAN_MONEY_RE = re.compile(r"^(?:(\d+(?:\.\d+)?)억)?(?:(\d+(?:\.\d+)?)(천)?(만)?)?$")
+
+
+def parse_money(text):
+    """금액 문자열 하나 → float (빈 칸·못 읽는 값·음수는 NaN)"""
+    s = str(text).replace(",", "").replace(" ", "").strip()
+    if s.endswith("원"):
+        s = s[:-1]
+    if not s or s.lower() in ("nan", "none"):
+        return float("nan")
+    m = _KOREAN_MONEY_RE.match(s)
+    if m is None or not (m[1] or m[2]):
+        return float("nan")
+    value = float(m[2] or 0) * (1000 if m[3] else 1)
+    if m[4] or m[1]:
+        value *= 10_000
+    return float(m[1] or 0) * 100_000_000 + value
+
+
+def _to_money(values):
+    """
+    금액 칸 → (float Series, 빈 칸 여부 bool Series)
+
+    "1,000,000" 같은 쉼표·"2억" 같은 한글 단위도 읽고, 못 읽은 값은 NaN (0 으로 채우지 않음)
+    """
+    import pandas as pd  # 필요할 때만 로드
+
+    blank = values.isna()
+    if pd.api.types.is_numeric_dtype(values):
+        money = values.astype(float)
+    else:
+        text = values.astype(str).str.strip()
+        blank |= text.eq("")
+        money = pd.to_numeric(text.str.replace(",", "", regex=False), errors="coerce")
+        todo = money.isna() & ~blank
+        if todo.any():  # 숫자로 바로 안 읽히는 칸만 한 칸씩
+            money[todo] = text[todo].map(parse_money)
+    money = money.where((money >= 0) & (money < float("inf")))  # 음수·inf 도 못 읽은 값으로
+    return money, blank
+
+
+def normalize_listing_chunk(raw, mapping):
+    """
+    원본 청크 → 표준 컬럼 + 전세가율 컬럼 (score_listings 입력 형식) + error
+
+    error 는 금액 칸을 못 읽은 이유 (문제없는 행은 "")
+    """
+    import numpy as np
+
+    df = raw[list(mapping)].rename(columns=mapping)
+    for col in LISTING_COLUMNS:
+        if col not in df:
+            df[col] = 0 if col in MONEY_COLUMNS else ""
+    # 보증금은 빈 칸도 오류, 나머지 금액은 빈 칸이면 0 (월세 없음·시세 모름), 적었는데 못 읽으면 오류
+    errors = np.full(len(df), "", dtype=object)
+    for col in MONEY_COLUMNS:
+        money, blank = _to_money(df[col])
+        bad = money.isna().to_numpy()
+        blank = blank.to_numpy()
+        if col != "deposit":
+            bad = bad & ~blank
+            money = money.fillna(0)
+        for i in np.flatnonzero(bad):
+            note = f"{MONEY_COLUMN_NAMES[col]} 칸이 " + ("비어 있음" if blank[i] else "금액이 아님")
+            errors[i] = f"{errors[i]}, {note}" if errors[i] else note
+        df[col] = money
+    df["error"] = errors
+    df["address"] = df["address"].fillna("").astype(str).str.strip()
+    df["memo"] = df["memo"].fillna("").astype(str)
+    df["contract_type"] = df["contract_type"].fillna("").astype(str).str.strip().replace("", "전세")
+
+    deposit = df["deposit"].to_numpy(dtype=float)
+    sale = df["sale_price"].to_numpy(dtype=float)
+    jeonse = df["jeonse_price"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["jeonse_rate_sale"] = np.where((sale > 0) & (deposit > 0), deposit / sale * 100, np.nan)
+        df["jeonse_rate_market"] = np.where((jeonse > 0) & (deposit > 0), deposit / jeonse * 100, np.nan)
+    return df[[*LISTING_COLUMNS, "jeonse_rate_sale", "jeonse_rate_market", "error"]]
+
+
+# ================================
+# 파일 → 청크
+# ================================
+def _sniff_encoding(f):
+    f.seek(0)
+    head = f.read(SNIFF_BYTES)
+    f.seek(0)
+    try:
+        # 앞부분만 잘라 읽어서 끝에 글자가 잘렸을 수 있으므로 final=False
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp949"
+
+
+def _iter_csv_chunks(f, chunk_rows):
+    import pandas as pd
+
+    encoding = _sniff_encoding(f)
+    reader = pd.read_csv(
+        f, chunksize=chunk_rows, encoding=encoding, encoding_errors="replace", dtype=str, skipinitialspace=True
+    )
+    for chunk in reader:
+        yield chunk
+
+
+def _iter_xlsx_chunks(f, chunk_rows):
+    import pandas as pd
+
+    try:
+        from openpyxl import load_workbook  # 필요할 때만 로드
+    except ImportError:
+        raise ListingFileError("Excel 파일을 읽으려면 openpyxl 이 필요합니다. (pip install openpyxl) CSV로 저장해서 올려 주세요.")
+
+    f.seek(0)
+    wb = load_workbook(f, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = ["" if h is None else str(h) for h in header]
+        buf = []
+        for row in rows:
+            if row is None or all(v is None for v in row):
+                continue
+            buf.append(row)
+            if len(buf) >= chunk_rows:
+                yield pd.DataFrame(buf, columns=header, dtype=object)
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf, columns=header, dtype=object)
+    finally:
+        wb.close()
+
+
+def iter_listing_chunks(f, filename, chunk_rows=CHUNK_ROWS, max_rows=MAX_LISTING_ROWS):
+    """
+    업로드 파일 → 표준 컬럼 DataFrame 청크
+
+    max_rows 를 넘는 행은 읽지 않음 (마지막 청크를 잘라서 멈춤)
+    """
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        chunks = _iter_xlsx_chunks(f, chunk_rows)
+    elif ext in (".csv", ".txt", ""):
+        chunks = _iter_csv_chunks(f, chunk_rows)
+    else:
+        raise ListingFileError(f"지원하지 않는 파일 형식입니다: {ext} (CSV 또는 .xlsx)")
+
+    mapping = None
+    seen = 0
+    for raw in chunks:
+        if mapping is None:
+            mapping = _column_map(raw.columns)
+        if seen + len(raw) > max_rows:
+            raw = raw.iloc[: max_rows - seen]
+        seen += len(raw)
+        if len(raw):
+            yield normalize_listing_chunk(raw, mapping)
+        if seen >= max_rows:
+            return
+
+
+# ================================
+# 점수 + 순위
+# ================================
+@timed("listings.score_file")
+def score_listing_file(f, filename, chunk_rows=CHUNK_ROWS, max_rows=MAX_LISTING_ROWS, on_progress=None, rules=None):
+    """
+    목록 파일 전체 점수 계산 → 위험도 낮은 순 순위(rank) 를 붙인 DataFrame
+
+    금액 칸을 못 읽은 행(error 가 빈 문자열이 아님)은 점수 NaN · 위험 수준 INPUT_ERROR_LEVEL ·
+    rank 없음(<NA>) 으로 맨 뒤에 둠
+    on_progress(읽은 행 수) 는 청크 하나 끝날 때마다 호출
+    max_rows 뒤에 행이 더 있어서 잘랐으면 결과의 attrs["truncated"] 가 True
+    """
+    import numpy as np
+    import pandas as pd
+
+    rules = rules or get_rules()
+    scored = []
+    rows = 0
+    truncated = False
+    # 한 행 더 읽어 봐서 정말 잘린 건지 확인 (딱 max_rows 개인 파일은 잘린 게 아님)
+    for chunk in iter_listing_chunks(f, filename, chunk_rows, max_rows + 1):
+        if rows + len(chunk) > max_rows:
+            chunk = chunk.iloc[: max_rows - rows]
+            truncated = True
+            if not len(chunk):
+                break
+        invalid = chunk["error"].ne("").to_numpy()
+        chunk = score_listings(chunk, rules=rules)
+        chunk["score"] = np.where(invalid, np.nan, chunk["score"].to_numpy())
+        chunk["level"] = np.where(invalid, INPUT_ERROR_LEVEL, risk_levels(chunk["score"].fillna(0).to_numpy(), rules))
+        scored.append(chunk)
+        rows += len(chunk)
+        if on_progress is not None:
+            on_progress(rows)
+
+    if not scored:
+        raise ListingFileError("읽을 수 있는 매물 행이 없습니다.")
+    df = pd.concat(scored, ignore_index=True)
+    df.insert(0, "row", np.arange(1, len(df) + 1))  # 원본 파일 순서
+    df = df.sort_values(["score", "row"], kind="stable", ignore_index=True, na_position="last")
+    ranked = df["score"].notna().to_numpy()
+    rank = pd.array(np.arange(1, len(df) + 1), dtype="Int64")
+    rank[~ranked] = pd.NA
+    df.insert(0, "rank", rank)
+    df.attrs["truncated"] = truncated
+    return df
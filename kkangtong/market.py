@@ -0,0 +1,485 @@
+"""
+로컬 실거래가 인덱스 (매매가·전세 시세 자동 채우기용, Streamlit 없이 import 가능)
+
+국토부 실거래가 공개시스템에서 내려받은 CSV(또는 같은 컬럼의 Parquet)를 읽어서
+컬럼별 .npy 파일로 저장하고, 조회할 때는 np.load(mmap_mode="r") 로 필요한 구간만 읽음
+
+저장 구조 (MARKET_INDEX_DIR, 파일 이름의 .g{N} 은 만든 세대 번호)
+- groups.g{N}.json : 단지 목록 (그룹 번호 = 목록 순서, 한 번 정해지면 바뀌지 않음) + 주소/단지명 → 그룹 번호
+- {kind}.gid / .area / .ym / .price .g{N}.npy : 거래 한 건 = 한 행, (그룹 번호, 전용면적) 순으로 정렬
+- {kind}.offsets.g{N}.npy : 그룹 g 의 행 범위 = offsets[g] ~ offsets[g+1]
+- manifest.json : 지금 세대의 파일 이름들, 넣은 파일(SHA-256) 목록, 행 수, 최근 계약 월 → 같은 파일은 다시 넣지 않음
+  (kind 는 "sale"(매매) / "jeonse"(전세))
+
+갱신할 때는 바뀐 파일을 전부 새 세대 이름으로 쓰고 마지막에 manifest.json 하나만 os.replace
+→ 읽는 쪽은 언제 열어도 한 세대의 파일들만 보고, 중간에 죽어도 이전 세대가 그대로 남음
+(직전 세대 파일은 다음 갱신까지 남겨 두고 그보다 오래된 것만 지움)
+
+조회 "같은 단지, 전용 ±N평, 최근 M개월" 은
+주소 → 그룹 번호(dict) → offsets 로 행 범위 → 면적 이분 탐색(searchsorted) → 그 안에서만 월 필터
+→ DataFrame 전체를 훑지 않음
+
+새 달 파일이 오면 update_market_index() 가 새 파일만 읽어서 기존 정렬 배열과 합침
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+import numpy as np
+
+from kkangtong.address import jibun_key
+from kkangtong.profiling import timed
+
+MARKET_INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "market")
+MARKET_KINDS = ("sale", "jeonse")
+PYEONG_M2 = 3.305785          # 1평 = 3.305785㎡
+DEFAULT_AREA_TOLERANCE = 3.0  # ±평
+DEFAULT_MONTHS = 12
+MIN_SAMPLES = 3               # 이보다 적으면 화면에서 참고용이라고 안내
+CSV_CHUNK_ROWS = 100_000
+
+# 국토부 실거래가 CSV 컬럼 → 표준 이름 (영문 컬럼도 그대로 받음)
+MARKET_COLUMN_ALIASES = {
+    "sigungu": ("시군구", "sigungu"),
+    "jibun": ("번지", "jibun"),
+    "complex": ("단지명", "complex"),
+    "road": ("도로명", "road"),
+    "area_m2": ("전용면적(㎡)", "전용면적", "area_m2"),
+    "ym": ("계약년월", "ym"),
+    "sale_price": ("거래금액(만원)", "sale_price"),
+    "deposit": ("보증금(만원)", "deposit"),
+    "monthly_rent": ("월세금(만원)", "월세(만원)", "monthly_rent"),
+    "rent_kind": ("전월세구분", "rent_kind"),
+}
+
+# 시·도 이름은 짧은 이름으로 통일 ("서울특별시" → "서울")
+SIDO_SHORT = {
+    "서울특별시": "서울", "서울시": "서울",
+    "부산광역시": "부산", "대구광역시": "대구", "인천광역시": "인천", "광주광역시": "광주",
+    "대전광역시": "대전", "울산광역시": "울산", "세종특별자치시": "세종",
+    "경기도": "경기", "강원도": "강원", "강원특별자치도": "강원",
+    "충청북도": "충북", "충청남도": "충남", "전라북도": "전북", "전북특별자치도": "전북",
+    "전라남도": "전남", "경상북도": "경북", "경상남도": "경남",
+    "제주특별자치도": "제주", "제주도": "제주",
+}
+
+_COMPLEX_STRIP_RE = re.compile(r"\(.*?\)|\s+|아파트$")
+
+
+class MarketIndexError(ValueError):
+    """실거래가 파일을 읽을 수 없거나 인덱스가 없을 때"""
+
+
+# ================================
+# 주소 / 단지명 정규화
+# ================================
+def market_address_key(address):
+    """
+    "서울특별시 은평구 진관동 123-0 은평뉴타운 101동" → "서울 은평구 진관동 123"
+
+    시·도 이름 통일, 지번 앞의 0·"-0"·"번지" 정리, 지번 뒤(건물명·동·호)는 버림.
+    지번이 없으면(도로명 주소 등) 정리한 주소 전체
+    """
+    tokens = (address or "").replace(",", " ").split()
+    if not tokens:
+        return ""
+    tokens[0] = SIDO_SHORT.get(tokens[0], tokens[0])
+    for i, token in enumerate(tokens[1:], start=1):
+        jibun = jibun_key(token)
+        if jibun is not None:
+            return " ".join(tokens[:i] + [jibun])
+    return " ".join(tokens)
+
+
+def market_road_key(sigungu, road):
+    """시군구 앞 두 단어 + 도로명 ("서울특별시 은평구 진관동", "진관2로 10") → "서울 은평구 진관2로 10" """
+    tokens = (sigungu or "").split()[:2]
+    if len(tokens) < 2 or not road:
+        return ""
+    return market_address_key(" ".join(tokens) + " " + road)
+
+
+def market_complex_key(sigungu, complex_name):
+    """같은 구 안의 단지명 키 ("서울 은평구 진관동", "은평뉴타운 우물골(위브)") → "서울 은평구|은평뉴타운우물골" """
+    tokens = (sigungu or "").split()[:2]
+    if tokens:
+        tokens[0] = SIDO_SHORT.get(tokens[0], tokens[0])
+    name = _COMPLEX_STRIP_RE.sub("", complex_name or "")
+    return " ".join(tokens) + "|" + name if name else ""
+
+
+# ================================
+# 실거래가 파일 읽기
+# ================================
+def _find_csv_header(path, encoding):
+    # 국토부 CSV 는 앞쪽 10여 줄이 안내문이고 그 뒤에 실제 컬럼 줄이 있음
+    with open(path, encoding=encoding, errors="replace") as f:
+        for i, line in enumerate(f):
+            if i > 50:
+                break
+            if "시군구" in line or "sigungu" in line:
+                return i
+    return 0
+
+
+def _sniff_csv_encoding(path):
+    with open(path, "rb") as f:
+        head = f.read(64 * 1024)
+    try:
+        head.decode("utf-8")
+        return "utf-8-sig"
+    except UnicodeDecodeError as e:
+        # 앞부분만 잘라 읽어서 끝 글자가 잘린 경우는 UTF-8 로 봄
+        return "utf-8-sig" if e.start >= len(head) - 3 else "cp949"
+
+
+def _iter_raw_chunks(path):
+    import pandas as pd  # 필요할 때만 로드
+
+    if path.lower().endswith(".parquet"):
+        yield pd.read_parquet(path)
+        return
+    encoding = _sniff_csv_encoding(path)
+    yield from pd.read_csv(
+        path,
+        encoding=encoding,
+        encoding_errors="replace",
+        skiprows=_find_csv_header(path, encoding),
+        dtype=str,
+        chunksize=CSV_CHUNK_ROWS,
+    )
+
+
+def _to_number(values):
+    import pandas as pd
+
+    return pd.to_numeric(values.astype(str).str.replace(",", "", regex=False).str.strip(), errors="coerce")
+
+
+def _map_unique(func, *columns):
+    """같은 값은 한 번만 계산 (한 달 파일에도 같은 단지 거래가 수십 건씩 있음)"""
+    import pandas as pd
+
+    # 구분 문자는 \x1f (pandas 문자열 컬럼은 \x00 을 지워 버림)
+    joined = columns[0] if len(columns) == 1 else columns[0].str.cat(list(columns[1:]), sep="\x1f")
+    codes, uniq = pd.factorize(joined)
+    values = np.array([func(*u.split("\x1f")) for u in uniq], dtype=object)
+    return values[codes]
+
+
+def read_market_file(path):
+    """
+    실거래가 파일 하나 → {kind: DataFrame(address_key, complex_key, road_key, sigungu, complex, area_m2, ym, price)}
+
+    매매 파일(거래금액)은 sale, 전월세 파일은 전세(월세 0)만 jeonse 로 모음. 금액 단위는 원
+    """
+    import pandas as pd
+
+    out = {kind: [] for kind in MARKET_KINDS}
+    for raw in _iter_raw_chunks(path):
+        cols = {}
+        for std, aliases in MARKET_COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in raw.columns:
+                    cols[std] = raw[alias]
+                    break
+        missing = {"sigungu", "jibun", "area_m2", "ym"} - set(cols)
+        if missing:
+            raise MarketIndexError(f"{os.path.basename(path)}: 필요한 컬럼이 없습니다: {sorted(missing)}")
+
+        if "sale_price" in cols:
+            kind = "sale"
+            price = _to_number(cols["sale_price"])
+            keep = price > 0
+        elif "deposit" in cols:
+            kind = "jeonse"
+            price = _to_number(cols["deposit"])
+            keep = price > 0
+            if "rent_kind" in cols:
+                keep &= cols["rent_kind"].astype(str).str.strip() == "전세"
+            if "monthly_rent" in cols:
+                keep &= _to_number(cols["monthly_rent"]).fillna(0) == 0
+        else:
+            raise MarketIndexError(f"{os.path.basename(path)}: 거래금액(만원) 또는 보증금(만원) 컬럼이 없습니다.")
+
+        ym = _to_number(cols["ym"])
+        area = _to_number(cols["area_m2"])
+        keep &= ym.notna() & (area > 0)
+        if not keep.any():
+            continue
+
+        sigungu = cols["sigungu"][keep].fillna("").astype(str).str.strip()
+        jibun = cols["jibun"][keep].fillna("").astype(str).str.strip()
+        complex_name = (cols["complex"][keep].fillna("").astype(str) if "complex" in cols else pd.Series("", index=sigungu.index))
+        road = cols["road"][keep].fillna("").astype(str).str.strip() if "road" in cols else None
+        ym = ym[keep].astype(int)
+
+        df = pd.DataFrame(
+            {
+                "address_key": _map_unique(market_address_key, sigungu + " " + jibun),
+                "complex_key": _map_unique(market_complex_key, sigungu, complex_name),
+                "road_key": _map_unique(market_road_key, sigungu, road) if road is not None else "",
+                "sigungu": sigungu.to_numpy(),
+                "complex": complex_name.str.strip().to_numpy(),
+                "area_m2": area[keep].to_numpy(dtype=np.float32),
+                "ym": (ym // 100 * 12 + ym % 100 - 1).to_numpy(dtype=np.int32),  # 월 번호 (년*12 + 월-1)
+                "price": (price[keep] * 10_000).to_numpy(dtype=np.int64),       # 만원 → 원
+            }
+        )
+        out[kind].append(df)
+    return {kind: pd.concat(dfs, ignore_index=True) for kind, dfs in out.items() if dfs}
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ================================
+# 인덱스 만들기 / 갱신
+# ================================
+def _atomic_save_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+_INDEX_FILE_RE = re.compile(r"^(?:groups(?:\.g\d+)?\.json|(?:%s)\.\w+(?:\.g\d+)?\.npy)$" % "|".join(MARKET_KINDS))
+_COLUMN_NAMES = ("gid", "area", "ym", "price", "offsets")
+
+
+def _index_names(manifest):
+    """manifest 한 세대에 들어 있는 파일 이름들 (예전 인덱스는 있을 수 있는 이름 전부)"""
+    if "paths" in manifest:
+        return list(manifest["paths"])
+    return ["groups"] + [f"{kind}.{name}" for kind in MARKET_KINDS for name in _COLUMN_NAMES]
+
+
+def _index_file(index_dir, manifest, name):
+    """manifest 가 가리키는 파일 경로 ("groups", "sale.gid" 등, 세대 번호가 없던 예전 인덱스는 예전 이름)"""
+    default = "groups.json" if name == "groups" else f"{name}.npy"
+    return os.path.join(index_dir, manifest.get("paths", {}).get(name, default))
+
+
+def _remove_old_generations(index_dir, keep):
+    """지금·직전 세대가 아닌 인덱스 파일 지우기 (다른 프로세스가 열고 있어서 못 지우면 다음에)"""
+    for name in os.listdir(index_dir):
+        if _INDEX_FILE_RE.match(name) and name not in keep:
+            try:
+                os.remove(os.path.join(index_dir, name))
+            except OSError:
+                pass
+
+
+def update_market_index(paths, index_dir=MARKET_INDEX_DIR, log=None):
+    """
+    실거래가 파일들을 인덱스에 추가 (이미 넣은 파일은 SHA-256 으로 건너뜀)
+
+    새 파일만 읽고, 기존 정렬 배열과 합쳐서 다시 (그룹, 면적) 순으로 정렬
+    반환: 새로 넣은 파일 수
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    manifest = _load_json(os.path.join(index_dir, "manifest.json"), {"files": {}, "rows": {}, "max_ym": None})
+    groups_doc = _load_json(_index_file(index_dir, manifest, "groups"), {"groups": [], "keys": {}})
+    groups, keys = groups_doc["groups"], groups_doc["keys"]
+
+    new = {kind: [] for kind in MARKET_KINDS}
+    added = 0
+    for path in paths:
+        digest = _file_sha256(path)
+        if digest in manifest["files"].values():
+            if log:
+                log(f"건너뜀 (이미 추가됨): {path}")
+            continue
+        for kind, df in read_market_file(path).items():
+            new[kind].append(df)
+        manifest["files"][os.path.basename(path) + "@" + digest[:12]] = digest
+        added += 1
+        if log:
+            log(f"읽음: {path}")
+    if not added:
+        return 0
+
+    import pandas as pd
+
+    # 이번 세대 파일은 새 이름으로만 씀 (manifest 를 바꾸기 전까지 읽는 쪽은 이전 세대를 그대로 봄)
+    generation = manifest.get("generation", 0) + 1
+    old_files = {name: os.path.basename(_index_file(index_dir, manifest, name)) for name in _index_names(manifest)}
+    old_files = {name: f for name, f in old_files.items() if os.path.exists(os.path.join(index_dir, f))}
+    index_files = dict(old_files)
+
+    def save_npy(name, arr):
+        index_files[name] = f"{name}.g{generation}.npy"
+        np.save(os.path.join(index_dir, index_files[name]), arr)
+
+    for kind in MARKET_KINDS:
+        if not new[kind]:
+            continue
+        df = pd.concat(new[kind], ignore_index=True)
+
+        # 새 단지는 목록 끝에 번호를 붙임 (기존 그룹 번호는 그대로라 기존 배열을 다시 매길 필요 없음)
+        codes, uniq = pd.factorize(df["address_key"])
+        first = np.unique(codes, return_index=True)[1]
+        uniq_gid = np.empty(len(uniq), dtype=np.int32)
+        for j, i in enumerate(first):
+            addr = uniq[j]
+            g = keys.get(addr)
+            if g is None:
+                g = len(groups)
+                groups.append({"address": addr, "sigungu": df["sigungu"].iat[i], "complex": df["complex"].iat[i]})
+                keys[addr] = g
+            for alias in (df["complex_key"].iat[i], df["road_key"].iat[i]):
+                if alias:
+                    keys.setdefault(alias, g)
+            uniq_gid[j] = g
+        gid = uniq_gid[codes]
+
+        old = _load_columns(index_dir, manifest, kind)
+        cols = {"gid": gid, "area": df["area_m2"].to_numpy(np.float32), "ym": df["ym"].to_numpy(np.int32), "price": df["price"].to_numpy(np.int64)}
+        if old is not None:
+            cols = {name: np.concatenate([old[name], arr]) for name, arr in cols.items()}
+        order = np.lexsort((cols["area"], cols["gid"]))
+        cols = {name: arr[order] for name, arr in cols.items()}
+
+        offsets = np.searchsorted(cols["gid"], np.arange(len(groups) + 1), side="left").astype(np.int64)
+        for name, arr in cols.items():
+            save_npy(f"{kind}.{name}", arr)
+        save_npy(f"{kind}.offsets", offsets)
+        manifest["rows"][kind] = int(len(cols["gid"]))
+        max_ym = int(cols["ym"].max())
+        manifest["max_ym"] = max(manifest["max_ym"] or max_ym, max_ym)
+
+    # 그룹 수가 늘었으면 새 파일이 없던 kind 의 offsets 도 길이를 맞춤
+    for kind in MARKET_KINDS:
+        if f"{kind}.offsets" in index_files:
+            offsets = np.load(os.path.join(index_dir, index_files[f"{kind}.offsets"]))
+            if len(offsets) < len(groups) + 1:
+                offsets = np.concatenate([offsets, np.full(len(groups) + 1 - len(offsets), offsets[-1])])
+                save_npy(f"{kind}.offsets", offsets)
+
+    index_files["groups"] = f"groups.g{generation}.json"
+    with open(os.path.join(index_dir, index_files["groups"]), "w", encoding="utf-8") as f:
+        json.dump({"groups": groups, "keys": keys}, f, ensure_ascii=False)
+    manifest["generation"] = generation
+    manifest["paths"] = index_files
+    manifest["built_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    _atomic_save_json(os.path.join(index_dir, "manifest.json"), manifest)  # 이 한 번의 os.replace 로 새 세대로 바뀜
+    _remove_old_generations(index_dir, set(index_files.values()) | set(old_files.values()))
+    return added
+
+
+# ================================
+# 조회
+# ================================
+def _load_columns(index_dir, manifest, kind):
+    """manifest 가 가리키는 {kind}.*.npy 를 mmap 으로 열기 (아직 없으면 None)"""
+    cols = {}
+    for name in _COLUMN_NAMES:
+        path = _index_file(index_dir, manifest, f"{kind}.{name}")
+        if not os.path.exists(path):
+            return None
+        cols[name] = np.load(path, mmap_mode="r")
+    return cols
+
+
+class MarketIndex:
+    """
+    저장된 인덱스를 mmap 으로 열어서 조회
+
+    열 때는 groups 파일(주소 → 그룹 번호)만 메모리에 올리고, 거래 배열은 조회한 구간만 디스크에서 읽힘
+    """
+
+    def __init__(self, index_dir=MARKET_INDEX_DIR):
+        self.dir = index_dir
+        self.manifest = _load_json(os.path.join(index_dir, "manifest.json"), None)
+        if self.manifest is None:
+            raise MarketIndexError(f"실거래가 인덱스가 없습니다: {index_dir} (python market_index.py add <파일> 로 먼저 만들어 주세요)")
+        doc = _load_json(_index_file(index_dir, self.manifest, "groups"), {"groups": [], "keys": {}})
+        self.groups = doc["groups"]
+        self.keys = doc["keys"]
+        self._cols = {}
+        self._lock = threading.Lock()
+
+    def columns(self, kind):
+        with self._lock:
+            if kind not in self._cols:
+                self._cols[kind] = _load_columns(self.dir, self.manifest, kind)
+            return self._cols[kind]
+
+    def find_group(self, address, complex_name=""):
+        """주소(지번/도로명) 또는 구+단지명 → 그룹 번호 (없으면 None)"""
+        g = self.keys.get(market_address_key(address))
+        if g is None and complex_name:
+            g = self.keys.get(market_complex_key(market_address_key(address), complex_name))
+        return g
+
+    def stats(self, kind, group, area_pyeong=None, tolerance=DEFAULT_AREA_TOLERANCE, months=DEFAULT_MONTHS):
+        """
+        그룹 하나의 최근 거래 가격 통계 → dict(count, median, p25, p75, min, max, ...) 또는 None
+
+        area_pyeong 이 있으면 전용면적 ±tolerance평만, months 는 인덱스 최근 월 기준 최근 몇 개월
+        """
+        cols = self.columns(kind)
+        if cols is None or group is None or group + 1 >= len(cols["offsets"]):
+            return None
+        lo, hi = int(cols["offsets"][group]), int(cols["offsets"][group + 1])
+        if area_pyeong:
+            # 그룹 안은 면적 순으로 정렬돼 있어서 이분 탐색으로 범위만 자름
+            area = cols["area"][lo:hi]
+            a0 = np.searchsorted(area, (area_pyeong - tolerance) * PYEONG_M2, side="left")
+            a1 = np.searchsorted(area, (area_pyeong + tolerance) * PYEONG_M2, side="right")
+            lo, hi = lo + int(a0), lo + int(a1)
+        if lo >= hi:
+            return None
+
+        ym = np.asarray(cols["ym"][lo:hi])
+        price = np.asarray(cols["price"][lo:hi])
+        if months:
+            recent = ym > self.manifest["max_ym"] - months
+            ym, price = ym[recent], price[recent]
+        if price.size == 0:
+            return None
+        p25, median, p75 = np.percentile(price, [25, 50, 75])
+        last = int(ym.max())
+        return {
+            "count": int(price.size),
+            "median": int(median),
+            "p25": int(p25),
+            "p75": int(p75),
+            "min": int(price.min()),
+            "max": int(price.max()),
+            "latest": f"{last // 12}-{last % 12 + 1:02d}",
+        }
+
+    @timed("market.lookup")
+    def lookup(self, address, complex_name="", area_pyeong=None, tolerance=DEFAULT_AREA_TOLERANCE, months=DEFAULT_MONTHS):
+        """주소 하나 → {"group": 단지 정보, "sale": 통계, "jeonse": 통계} (단지를 못 찾으면 None)"""
+        g = self.find_group(address, complex_name)
+        if g is None:
+            return None
+        return {
+            "group": self.groups[g],
+            **{kind: self.stats(kind, g, area_pyeong, tolerance, months) for kind in MARKET_KINDS},
+        }
+
+
+def market_index_stamp(index_dir=MARKET_INDEX_DIR):
+    """인덱스가 바뀌었는지 확인용 (manifest 수정 시각, 없으면 None)"""
+    try:
+        return os.stat(os.path.join(index_dir, "manifest.json")).st_mtime_ns
+    except OSError:
+        return None
@@ -0,0 +1,212 @@
+"""
+이미지·스캔 PDF 등기부 OCR (로컬 Tesseract 사용, Streamlit 없이 import 가능)
+
+- Tesseract 실행 파일 + 한국어 데이터(kor)가 있어야 동작 (없으면 ocr_available() 이 False)
+    예) sudo apt install tesseract-ocr tesseract-ocr-kor poppler-utils
+- 스캔 PDF는 poppler 의 pdftoppm 으로 페이지를 이미지로 바꾼 뒤 OCR
+- OCR 전에 이미지 축소 → 기울기 보정 → 흑백 이진화를 해서 OCR 시간을 줄임
+- OcrJobQueue: 백그라운드 스레드 풀에서 OCR을 돌리고, 화면은 status()로 완료 여부만 확인
+  (tesseract 자체가 별도 프로세스라 스레드로 충분)
+- 결과는 파일 해시(SHA-256) 기준으로 RegistryCache 에 저장해서 같은 파일은 다시 OCR 하지 않음
+"""
+import io
+import os
+import glob
+import shutil
+import tempfile
+import threading
+import subprocess
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+OCR_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "ocr")
+OCR_CACHE_FORMAT = 1       # OCR 캐시 값 모양 ({"pages": [...]}) — 등기부 분석 결과 형식과 따로 올림
+OCR_LANG = "kor"
+OCR_MAX_SIDE = 2400         # 이보다 큰 이미지는 축소 (A4 약 200dpi 수준)
+OCR_DESKEW_MAX_ANGLE = 5.0  # 기울기 보정 탐색 범위 (±도)
+OCR_DESKEW_STEP = 0.5
+OCR_PDF_DPI = 200
+OCR_MAX_PAGES = 20          # 스캔 PDF는 앞쪽 몇 페이지만
+OCR_PAGE_TIMEOUT = 60       # 페이지 하나 OCR 제한 시간 (초)
+OCR_WORKERS = 2
+
+
+@functools.lru_cache(maxsize=1)
+def ocr_available():
+    """tesseract 실행 파일과 한국어 학습 데이터가 모두 있는지"""
+    if shutil.which("tesseract") is None:
+        return False
+    try:
+        out = subprocess.run(
+            ["tesseract", "--list-langs"], capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return OCR_LANG in (out.stdout + out.stderr).split()
+
+
+def pdf_ocr_available():
+    return ocr_available() and shutil.which("pdftoppm") is not None
+
+
+# ================================
+# 전처리 (축소 → 기울기 보정 → 이진화)
+# ================================
+def _otsu_threshold(gray):
+    import numpy as np
+
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 128
+    levels = np.arange(256)
+    w0 = np.cumsum(hist)
+    w1 = total - w0
+    m0 = np.cumsum(hist * levels)
+    mean_total = m0[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mean_total * w0 - m0 * total) ** 2 / (w0 * w1)
+    between[~np.isfinite(between)] = 0
+    return int(np.argmax(between))
+
+
+def _deskew_angle(image):
+    """글자 줄이 가로로 가장 잘 정렬되는 회전 각도 (행별 검은 픽셀 합의 분산이 최대인 각도)"""
+    import numpy as np
+
+    thumb = image.copy()
+    thumb.thumbnail((800, 800))
+    arr = np.asarray(thumb)
+    dark = arr < _otsu_threshold(arr)
+    from PIL import Image
+
+    mask = Image.fromarray((dark * 255).astype("uint8"))
+
+    best_angle, best_score = 0.0, -1.0
+    steps = int(OCR_DESKEW_MAX_ANGLE / OCR_DESKEW_STEP)
+    for i in range(-steps, steps + 1):
+        angle = i * OCR_DESKEW_STEP
+        rotated = np.asarray(mask.rotate(angle, fillcolor=0))
+        score = float(np.var(rotated.sum(axis=1)))
+        if score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
+
+
+def preprocess_image(image):
+    """PIL 이미지 → OCR용 흑백 이미지"""
+    import numpy as np
+    from PIL import Image
+
+    gray = image.convert("L")
+    if max(gray.size) > OCR_MAX_SIDE:
+        gray.thumbnail((OCR_MAX_SIDE, OCR_MAX_SIDE), Image.LANCZOS)
+
+    angle = _deskew_angle(gray)
+    if angle:
+        gray = gray.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+
+    arr = np.asarray(gray)
+    binary = np.where(arr < _otsu_threshold(arr), 0, 255).astype("uint8")
+    return Image.fromarray(binary)
+
+
+# ================================
+# OCR 실행
+# ================================
+def ocr_image(image):
+    """PIL 이미지 한 장 OCR → 텍스트"""
+    buf = io.BytesIO()
+    preprocess_image(image).save(buf, format="PNG")
+    out = subprocess.run(
+        ["tesseract", "stdin", "stdout", "-l", OCR_LANG, "--psm", "6"],
+        input=buf.getvalue(),
+        capture_output=True,
+        timeout=OCR_PAGE_TIMEOUT,
+    )
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.decode("utf-8", "replace").strip() or "tesseract 실행 실패")
+    return out.stdout.decode("utf-8", "replace")
+
+
+def _pdf_page_images(pdf_bytes):
+    from PIL import Image
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "in.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_bytes)
+        subprocess.run(
+            ["pdftoppm", "-r", str(OCR_PDF_DPI), "-gray", "-png", "-l", str(OCR_MAX_PAGES), pdf_path, os.path.join(tmp, "p")],
+            check=True,
+            capture_output=True,
+            timeout=OCR_PAGE_TIMEOUT * OCR_MAX_PAGES,
+        )
+        for path in sorted(glob.glob(os.path.join(tmp, "p*.png"))):
+            with Image.open(path) as im:
+                im.load()
+                yield im
+
+
+def ocr_document(data, mime):
+    """이미지 또는 스캔 PDF 바이트 → 페이지별 텍스트 목록"""
+    from PIL import Image
+
+    if mime == "application/pdf":
+        return [ocr_image(im) for im in _pdf_page_images(data)]
+    with Image.open(io.BytesIO(data)) as im:
+        im.load()
+        return [ocr_image(im)]
+
+
+# ================================
+# 백그라운드 작업 큐
+# ================================
+class OcrJobQueue:
+    """
+    OCR 작업을 백그라운드 스레드 풀에서 처리
+
+    - submit(key, data, mime): 캐시에 없고 진행 중도 아니면 작업 등록
+    - status(key): ("done", 페이지 텍스트 목록) / ("pending", None) / ("error", 메시지) / (None, None)
+    key 는 파일 SHA-256 (registry_file_key) 를 그대로 사용
+    """
+
+    def __init__(self, cache, workers=OCR_WORKERS):
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, data, mime):
+        with self._lock:
+            if key in self._jobs:
+                return
+        if self.cache.get(key) is not None:
+            return
+        with self._lock:
+            if key not in self._jobs:
+                self._jobs[key] = self._pool.submit(self._run, key, data, mime)
+
+    def _run(self, key, data, mime):
+        pages = ocr_document(data, mime)
+        self.cache.put(key, {"pages": pages})
+        return pages
+
+    def status(self, key):
+        # 진행 중인 작업부터 확인 → 기다리는 동안 매 rerun 마다 캐시 미스(디스크 확인)가 쌓이지 않음
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return "done", cached["pages"]
+            return None, None
+        if not job.done():
+            return "pending", None
+        error = job.exception()
+        if error is not None:
+            # 실패한 작업은 남겨둬서 화면이 같은 파일을 계속 다시 OCR 하지 않게 함
+            return "error", f"{type(error).__name__}: {error}"
+        with self._lock:
+            self._jobs.pop(key, None)
+        return "done", job.result()
@@ -0,0 +1,275 @@
+"""
+PDF 등기부 페이지 단위 텍스트 추출
+
+- 페이지를 한 장씩 순서대로 yield (다 읽을 때까지 기다리지 않고 바로 분석 가능)
+- 페이지가 많으면 프로세스 풀로 나눠서 추출
+- 최대 페이지 수 / 전체 제한 시간으로 이상한 PDF가 워커를 붙잡지 못하게 함
+  (제한 시간은 PDF 열기·페이지 한 장 추출 도중에도 끊김 — 메인 스레드면 SIGALRM, 아니면 죽일 수 있는 워커 프로세스에서 추출)
+- 워커 프로세스는 프로세스당 하나인 공용 추출 풀(ProcessPoolExecutor)을 계속 씀 → 업로드마다 프로세스를 띄우지 않음
+  (Streamlit 은 start_extract_pool() 로 서버가 뜰 때 미리 띄워 둠)
+
+Streamlit 스크립트(check.py) 안의 함수는 워커 프로세스에서 다시 import 할 수 없어서
+별도 모듈로 분리했습니다.
+"""
+import io
+import os
+import mmap
+import time
+import signal
+import threading
+import contextlib
+
+MAX_PAGES = 200             # 이 이상 페이지는 분석하지 않음
+EXTRACT_TIMEOUT = 30.0      # 파일 하나 전체 추출 제한 시간 (초)
+PARALLEL_MIN_PAGES = 16     # 이 페이지 수 이상일 때만 여러 워커에 나눠서 추출
+MAX_WORKERS = 4             # 공용 추출 풀 프로세스 수 (= 파일 하나를 동시에 추출하는 최대 워커 수)
+PAGES_PER_TASK = 4          # 풀 작업 하나가 여는 PDF 한 번에 추출할 쪽 수 (작업마다 PDF 를 새로 엶)
+
+
+class PageLimitExceeded(Exception):
+    """max_pages 까지 yield 한 뒤, 남은 페이지가 더 있을 때"""
+
+
+def _open_reader(source):
+    """
+    source 종류별로 PdfReader 열기
+    - bytes: 메모리에서
+    - str: 파일 경로 → mmap (큰 업로드를 임시 파일로 내린 경우)
+    - 그 외: 이미 열린 파일 객체(업로드 객체 등)를 그대로
+    반환: (reader, 닫아야 할 mmap 또는 None)
+    """
+    from PyPDF2 import PdfReader  # requirements.txt 에 PyPDF2 추가 필요
+
+    if isinstance(source, (bytes, bytearray)):
+        return PdfReader(io.BytesIO(source)), None
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return PdfReader(mm), mm
+    source.seek(0)
+    return PdfReader(source), None
+
+
+# ---- 제한 시간 (현재 프로세스) ----
+class _Deadline(BaseException):
+    """SIGALRM 핸들러가 던짐 (_page_text 의 except Exception 에 삼켜지지 않도록 BaseException)"""
+
+
+def _can_alarm():
+    # signal 핸들러는 메인 스레드에서만 설치 가능 → 배치·API 워커 프로세스는 되고, Streamlit 스크립트 스레드는 안 됨
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+@contextlib.contextmanager
+def _alarm(deadline):
+    """
+    deadline 이 지나면 안에서 돌던 코드를 _Deadline 으로 끊음 (메인 스레드 전용, SIGALRM 을 잠깐 빌려 씀)
+
+    PyPDF2 는 순수 파이썬이라 페이지 하나에서 헤매는 중에도 바이트코드 사이에서 핸들러가 실행됨
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise _Deadline
+
+    def on_alarm(signum, frame):
+        raise _Deadline
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, signal.SIG_DFL if previous is None else previous)
+
+
+def _page_text(page):
+    try:
+        return page.extract_text() or ""
+    except Exception:
+        return ""
+
+
+# ---- 공용 추출 풀: 워커 프로세스 쪽 ----
+def _warm_up():
+    import PyPDF2  # noqa: F401  (첫 업로드가 import 를 기다리지 않도록)
+
+
+def _extract_chunk(source, start, stop):
+    """
+    PDF 를 열어서 [start, stop) 쪽 텍스트 → (전체 쪽수, 텍스트 목록)
+
+    작업마다 새로 열고 바로 닫음 (워커가 임시 파일·바이트를 붙잡고 있지 않도록)
+    """
+    reader, mm = _open_reader(source)
+    try:
+        total_pages = len(reader.pages)
+        return total_pages, [_page_text(reader.pages[i]) for i in range(start, min(stop, total_pages))]
+    finally:
+        del reader
+        if mm is not None:
+            mm.close()
+
+
+# ---- 공용 추출 풀: 호출하는 쪽 ----
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _new_pool():
+    # 풀을 띄울 때만 필요 (import 만 해도 10ms 넘게 걸림)
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Streamlit 서버는 스레드가 많아서 fork 대신 spawn 사용
+    workers = max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    for _ in range(workers):
+        pool.submit(_warm_up)
+    return pool
+
+
+def start_extract_pool():
+    """공용 추출 풀 (없으면 새로 띄움) — 여러 스레드가 같이 씀"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _new_pool()
+        return _pool
+
+
+def _recycle_pool(pool):
+    """
+    작업이 멈춘 풀을 버림 (실행 중인 작업은 취소할 수 없어서 워커를 강제 종료, 다음 호출이 새로 띄움)
+
+    같은 풀에서 돌던 다른 호출의 작업은 BrokenProcessPool → 그쪽에서 새 풀로 다시 보냄
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not pool:  # 다른 호출이 이미 바꿈
+            return
+        _pool = None
+    processes = list((pool._processes or {}).values())  # 공개 API 로는 워커를 죽일 수 없음
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.kill()
+
+
+def default_workers(page_count):
+    if page_count < PARALLEL_MIN_PAGES:
+        return 1
+    return max(1, min(MAX_WORKERS, os.cpu_count() or 1, page_count // PARALLEL_MIN_PAGES + 1))
+
+
+def _open_counted(source):
+    reader, mm = _open_reader(source)
+    return reader, mm, len(reader.pages)
+
+
+def iter_pdf_page_texts(source, max_pages=MAX_PAGES, timeout=EXTRACT_TIMEOUT, workers=None):
+    """
+    PDF에서 페이지 텍스트를 순서대로 하나씩 yield
+
+    - source: PDF 바이트, 파일 경로, 또는 파일 객체 (_open_reader 참고)
+    - max_pages 쪽까지 yield 한 뒤 페이지가 더 남아 있으면 PageLimitExceeded
+    - timeout 초 안에 끝나지 않으면 TimeoutError — PDF 열기·페이지 한 장 추출 도중이어도 끊음
+    - workers=None 이면 페이지 수에 따라 자동 결정, 1이면 한 장씩 순차 추출
+    - 메인 스레드에서 workers=1 이면 현재 프로세스에서 SIGALRM 으로 끊음 (배치·API 워커 프로세스)
+      그 밖(Streamlit 스크립트 스레드, 여러 워커)은 여는 일부터 전부 공용 추출 풀에서 하고,
+      시간이 지나면 멈춘 워커를 강제 종료
+    """
+    deadline = time.monotonic() + timeout
+    if workers is not None and workers <= 1 and _can_alarm():
+        yield from _iter_local_pages(source, max_pages, deadline)
+    else:
+        yield from _iter_pool_pages(source, max_pages, deadline, workers)
+
+
+def _iter_local_pages(source, max_pages, deadline):
+    try:
+        with _alarm(deadline):
+            reader, mm, total_pages = _open_counted(source)
+    except _Deadline:
+        raise TimeoutError("PDF 텍스트 추출 시간 초과 (파일 여는 중)") from None
+    try:
+        page_count = min(total_pages, max_pages)
+        for i in range(page_count):
+            try:
+                with _alarm(deadline):
+                    text = _page_text(reader.pages[i])
+            except _Deadline:
+                raise TimeoutError(f"PDF 텍스트 추출 시간 초과 ({i}/{page_count}쪽)") from None
+            yield text  # 알람은 꺼 둔 채로 (받는 쪽 코드를 끊지 않도록)
+        if total_pages > page_count:
+            raise PageLimitExceeded(f"전체 {total_pages}쪽 중 앞 {page_count}쪽만 추출했습니다.")
+    finally:
+        del reader
+        if mm is not None:
+            mm.close()
+
+
+class _PoolChunk:
+    """풀에 보낸 [start, stop) 쪽 작업 하나 (풀이 새로 떠서 끊기면 한 번 다시 보냄)"""
+
+    def __init__(self, source, start, stop):
+        self.source, self.start, self.stop = source, start, stop
+        self.retried = False
+        self.submit()
+
+    def submit(self):
+        self.pool = start_extract_pool()
+        self.future = self.pool.submit(_extract_chunk, self.source, self.start, self.stop)
+
+    def result(self, deadline):
+        from concurrent.futures import TimeoutError as FutureTimeout
+        from concurrent.futures.process import BrokenProcessPool
+
+        while True:
+            try:
+                return self.future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeout:
+                # 아직 대기열에 있으면 취소만, 워커에서 돌고 있으면(이 PDF 에서 멈춤) 그 풀을 버림
+                if not self.future.cancel():
+                    _recycle_pool(self.pool)
+                raise TimeoutError(f"PDF 텍스트 추출 시간 초과 ({self.start + 1}쪽부터)") from None
+            except BrokenProcessPool:
+                if self.retried:
+                    raise
+                self.retried = True
+                self.submit()
+
+
+def _iter_pool_pages(source, max_pages, deadline, workers):
+    if not isinstance(source, (bytes, str)):
+        source = source.getvalue()  # 파일 객체는 워커로 보낼 수 없어서 바이트로
+
+    # 첫 작업이 PDF 를 열어서 전체 쪽수를 알려 줌 (여는 일도 워커에서 → 제한 시간으로 끊을 수 있음)
+    first = _PoolChunk(source, 0, min(PAGES_PER_TASK, max_pages))
+    chunks = []
+    try:
+        total_pages, texts = first.result(deadline)
+        page_count = min(total_pages, max_pages)
+        if workers is None:
+            workers = default_workers(page_count)
+        # 파일 하나가 공용 풀을 다 차지하지 않도록 한 번에 workers 개 작업까지만
+        starts = iter(range(len(texts), page_count, PAGES_PER_TASK))
+
+        def submit_next():
+            start = next(starts, None)
+            if start is not None:
+                chunks.append(_PoolChunk(source, start, min(start + PAGES_PER_TASK, page_count)))
+
+        for _ in range(max(workers, 1)):
+            submit_next()
+        yield from texts
+        while chunks:
+            chunk = chunks.pop(0)
+            _, texts = chunk.result(deadline)
+            submit_next()
+            yield from texts
+        if total_pages > page_count:
+            raise PageLimitExceeded(f"전체 {total_pages}쪽 중 앞 {page_count}쪽만 추출했습니다.")
+    finally:
+        # 중간에 멈추거나(시간 초과, 소비 중단) 예외가 나면 아직 시작 안 한 작업은 취소
+        for chunk in chunks:
+            chunk.future.cancel()
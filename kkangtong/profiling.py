@@ -0,0 +1,216 @@
+"""
+구간별 실행 시간 측정 (rerun 한 번에 어디서 시간이 드는지, Streamlit 없이 import 가능)
+
+- with span("main.score"): ...      → 블록 하나 측정
+- @timed("registry.analyze_file")  → 함수 호출 측정 (이름을 안 주면 함수 이름)
+- rerun_started("check.py") / rerun_finished() 사이에 잰 구간은 같은 rerun 번호로 묶임
+  (rerun 밖에서 시작한 가장 바깥 구간 — fragment 만 다시 실행할 때 등 — 은 그 자체가 rerun 하나)
+- 잰 구간은 프로세스 메모리의 링 버퍼(최근 PROFILE_RING_SIZE 개)에 쌓이고, 구간 이름별 p50/p90/p99 는 span_stats()
+- dump 경로를 켜면 구간마다 JSON 한 줄씩 파일에 덧붙임 (나중에 pandas.read_json(lines=True) 로 분석)
+- 꺼져 있으면 span() 은 미리 만든 빈 context manager 를 돌려주고 timed 는 플래그 하나만 보고 바로 원래 함수 호출
+
+켜는 법: 환경 변수 KKANGTONG_PROFILE=1 (KKANGTONG_PROFILE_DUMP=파일 경로 를 주면 JSONL 도 저장)
+또는 실행 중에 set_profiling(True, dump_path=...)
+"""
+import contextlib
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+PROFILE_RING_SIZE = 20_000
+PROFILE_DUMP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "profile.jsonl")
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _ProfileState:
+    def __init__(self):
+        self.enabled = os.environ.get("KKANGTONG_PROFILE", "") not in ("", "0")
+        self.dump_path = os.environ.get("KKANGTONG_PROFILE_DUMP") or None
+        self.spans = deque(maxlen=PROFILE_RING_SIZE)   # (rerun 번호, 이름, 깊이, 시작 시각(epoch), ms)
+        self.run_ids = itertools.count(1)
+        self.local = threading.local()                 # 스레드(= 세션 스크립트 실행)마다 rerun 번호·구간 깊이
+        self.dump_lock = threading.Lock()
+        self.dump_file = None
+
+
+_state = _ProfileState()
+
+
+def profiling_enabled():
+    return _state.enabled
+
+
+def profiling_dump_path():
+    """JSONL 로 저장 중인 파일 경로 (저장 안 하면 None)"""
+    return _state.dump_path
+
+
+def set_profiling(enabled, dump_path=None):
+    """측정 켜기/끄기. dump_path 를 주면 그 파일에 JSONL 로도 저장 (None 이면 저장 안 함)"""
+    with _state.dump_lock:
+        if _state.dump_file is not None and dump_path != _state.dump_path:
+            _state.dump_file.close()
+            _state.dump_file = None
+        _state.dump_path = dump_path
+        _state.enabled = bool(enabled)
+
+
+def clear_spans():
+    _state.spans.clear()
+
+
+class _Span:
+    __slots__ = ("name", "started", "wall", "root")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        local = _state.local
+        depth = getattr(local, "depth", 0)
+        self.root = depth == 0 and getattr(local, "run_id", None) is None
+        if self.root:
+            local.run_id = next(_state.run_ids)
+        local.depth = depth + 1
+        self.wall = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (time.perf_counter() - self.started) * 1000
+        local = _state.local
+        local.depth -= 1
+        _record(local.run_id, self.name, local.depth, self.wall, elapsed)
+        if self.root:
+            local.run_id = None
+        return False
+
+
+def span(name):
+    """블록 하나 측정하는 context manager (꺼져 있으면 아무것도 안 함)"""
+    if not _state.enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name=None):
+    """함수 호출 시간을 재는 데코레이터"""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            with _Span(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def rerun_started(name):
+    """스크립트 맨 위에서 호출 → 이후 구간을 새 rerun 번호로 묶고, 스크립트 전체도 name 구간으로 잼"""
+    if not _state.enabled:
+        return
+    local = _state.local
+    # 앞 rerun 이 st.rerun()/st.stop() 으로 끝까지 안 갔으면 그 상태는 버림
+    local.depth = 1
+    local.run_id = next(_state.run_ids)
+    local.rerun = (name, time.time(), time.perf_counter())
+
+
+def rerun_finished():
+    """스크립트 맨 아래에서 호출"""
+    local = _state.local
+    rerun = getattr(local, "rerun", None)
+    if rerun is None:
+        return
+    name, wall, started = rerun
+    if _state.enabled and local.run_id is not None:
+        _record(local.run_id, name, 0, wall, (time.perf_counter() - started) * 1000)
+    local.rerun = None
+    local.run_id = None
+    local.depth = 0
+
+
+def _record(run_id, name, depth, wall, elapsed):
+    _state.spans.append((run_id, name, depth, wall, elapsed))
+    if _state.dump_path is None:
+        return
+    line = json.dumps(
+        {"run": run_id, "name": name, "depth": depth, "ts": round(wall, 6), "ms": round(elapsed, 3)},
+        ensure_ascii=False,
+    )
+    with _state.dump_lock:
+        if _state.dump_path is None:
+            return
+        if _state.dump_file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(_state.dump_path)), exist_ok=True)
+            _state.dump_file = open(_state.dump_path, "a", encoding="utf-8")
+        _state.dump_file.write(line + "\n")
+        _state.dump_file.flush()
+
+
+def recent_spans(limit=None):
+    """링 버퍼의 구간 → [{"run", "name", "depth", "ts", "ms"}, ...] (오래된 것부터)"""
+    spans = list(_state.spans)
+    if limit is not None:
+        spans = spans[-limit:]
+    return [{"run": r, "name": n, "depth": d, "ts": t, "ms": ms} for r, n, d, t, ms in spans]
+
+
+def last_rerun_spans():
+    """끝까지 잰 가장 최근 rerun 하나의 구간 (시작 순서)"""
+    spans = list(_state.spans)
+    last = next((s[0] for s in reversed(spans) if s[2] == 0), None)
+    if last is None:
+        return []
+    rows = [s for s in spans if s[0] == last]
+    rows.sort(key=lambda s: s[3])
+    return [{"run": r, "name": n, "depth": d, "ts": t, "ms": ms} for r, n, d, t, ms in rows]
+
+
+def _percentile(sorted_values, q):
+    # 선형 보간 (numpy.percentile 기본값과 같음)
+    pos = (len(sorted_values) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
+
+
+def span_stats():
+    """구간 이름별 {"name", "count", "p50", "p90", "p99", "max", "total"} (ms, 합계가 큰 순)"""
+    by_name = {}
+    for _, name, _, _, elapsed in list(_state.spans):
+        by_name.setdefault(name, []).append(elapsed)
+    rows = []
+    for name, values in by_name.items():
+        values.sort()
+        rows.append({
+            "name": name,
+            "count": len(values),
+            "p50": _percentile(values, 50),
+            "p90": _percentile(values, 90),
+            "p99": _percentile(values, 99),
+            "max": values[-1],
+            "total": sum(values),
+        })
+    rows.sort(key=lambda r: -r["total"])
+    return rows
+
+
+def dump_spans(path=PROFILE_DUMP_PATH):
+    """지금 링 버퍼 내용을 JSONL 파일에 덧붙임 → 쓴 줄 수"""
+    spans = recent_spans()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for row in spans:
+            f.write(json.dumps({**row, "ts": round(row["ts"], 6), "ms": round(row["ms"], 3)}, ensure_ascii=False) + "\n")
+    return len(spans)
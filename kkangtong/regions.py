@@ -0,0 +1,108 @@
+"""
+지역별 교통·생활·편의시설 설명 (data/regions.json, Streamlit 없이 import 가능)
+
+- 설명 문구는 코드 분기 대신 data/regions.json 에 지역(정규 구역 키) 단위로 둠
+- 주소 → normalize_address 로 정규 구역 키를 구하고, 구체적인 구역부터 상위 구역 순으로
+  regions.json 의 areas 와 맞춰 봄 ("서울 강서구 마곡동" → "서울 강서구" → "서울")
+- 역 이름 같은 별칭(landmarks)은 행정구역 인덱스에 별칭으로 넣어서 같은 한 번의 훑기로 찾음
+- lookup_region 은 주소별로 메모이즈 → 세 설명 함수가 같은 주소로 불려도 실제 조회는 한 번
+"""
+import os
+import json
+import functools
+
+from kkangtong.address import DATA_DIR, DistrictIndex, normalize_address
+
+REGIONS_PATH = os.path.join(DATA_DIR, "regions.json")
+
+
+class RegionTable:
+    """regions.json 을 읽어서 정규 구역 키 → 지역 설명으로 바로 찾을 수 있게 만든 표"""
+
+    def __init__(self, doc, index):
+        self.doc = doc
+        self.index = index
+        self.default = doc["default"]
+        self.by_area = {}
+        for region in doc["regions"]:
+            for area in region["areas"]:
+                self.by_area[area] = region
+            for landmark in region.get("landmarks", ()):
+                index.add_alias(landmark, region["areas"][0])
+
+    def find(self, address):
+        """주소 → (NormalizedAddress, 지역 dict 또는 None)"""
+        normalized = normalize_address(address, self.index)
+        for key in normalized.region_keys():
+            region = self.by_area.get(key)
+            if region is not None:
+                return normalized, region
+        return normalized, None
+
+    @classmethod
+    def load(cls, path=REGIONS_PATH):
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+        return cls(doc, DistrictIndex.load())
+
+
+@functools.lru_cache(maxsize=1)
+def get_region_table():
+    """프로세스 전체에서 한 번만 읽는 지역 설명 표"""
+    return RegionTable.load()
+
+
+@functools.lru_cache(maxsize=8192)
+def lookup_region(address):
+    """
+    주소 → 세 설명 함수가 쓰는 지역 정보 (주소별로 메모이즈)
+
+    반환 dict: normalized(NormalizedAddress), id, transit(줄 목록), lifestyle(dict), poi(줄 목록)
+    지역에 없는 항목은 default 값을 씀
+    """
+    table = get_region_table()
+    normalized, region = table.find(address)
+    region = region or {}
+    default = table.default
+    return {
+        "normalized": normalized,
+        "id": region.get("id"),
+        "transit": region.get("transit", default["transit"]),
+        "lifestyle": {**default["lifestyle"], **region.get("lifestyle", {})},
+        "poi": region.get("poi", default["poi"]),
+    }
+
+
+# ================================
+# 주변 교통/인프라 설명용 함수
+# ================================
+def get_transit_summary_text(address: str) -> str:
+    addr = (address or "").strip()
+    if not addr:
+        return ""
+    return "\n".join(lookup_region(addr)["transit"])
+
+
+def get_lifestyle_comment(address: str, noise_sensitive: bool, hate_walking: bool, night_active: bool) -> str:
+    addr = (address or "").strip()
+    if not addr:
+        return ""
+    comments = lookup_region(addr)["lifestyle"]
+    lines = [
+        comments[name]
+        for name, on in (("noise", noise_sensitive), ("walking", hate_walking), ("night", night_active))
+        if on
+    ]
+    if not lines:
+        return ""
+    return "\n".join([get_region_table().doc["lifestyle_title"], *lines])
+
+
+def get_poi_summary_text(address: str) -> str:
+    addr = (address or "").strip()
+    if not addr:
+        return ""
+    lines = list(lookup_region(addr)["poi"])
+    lines.append("")
+    lines.append(get_region_table().doc["poi_footer"])
+    return "\n".join(lines)
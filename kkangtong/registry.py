@@ -0,0 +1,538 @@
+"""
+등기부등본 텍스트 추출·분석 (Streamlit 없이 import 가능)
+
+check.py 화면과 batch_registry.py 일괄 분석 CLI가 같이 사용합니다.
+"""
+import re
+import os
+import json
+import bisect
+import threading
+from collections import OrderedDict
+
+from kkangtong.pdf_pages import iter_pdf_page_texts, PageLimitExceeded, MAX_PAGES, EXTRACT_TIMEOUT
+from kkangtong.profiling import timed
+from kkangtong.uploads import UploadTooLarge, file_sha256, spool_upload
+
+# ================================
+# 등기부 텍스트 추출 & 분석 함수
+# ================================
+def iter_registry_file_pages(uploaded_file, max_pages=MAX_PAGES, timeout=EXTRACT_TIMEOUT):
+    """
+    등기부 파일 텍스트를 페이지 단위로 하나씩 yield (텍스트 기반 PDF만, 스캔 이미지 PDF는 불가)
+
+    - 페이지가 많으면 프로세스 풀에서 병렬 추출 (kkangtong/pdf_pages.py)
+    - 큰 파일은 임시 파일 + mmap 으로 읽고, 추출이 끝나면 바로 정리 (kkangtong/uploads.py)
+    - 파일이 MAX_UPLOAD_BYTES 를 넘으면 UploadTooLarge
+    - max_pages 쪽 이후가 남아 있으면 PageLimitExceeded, timeout 초가 지나면 TimeoutError
+    """
+    if uploaded_file is None:
+        return
+
+    if uploaded_file.type == "application/pdf":
+        try:
+            with spool_upload(uploaded_file) as upload:
+                yield from iter_pdf_page_texts(upload.source, max_pages=max_pages, timeout=timeout)
+        except (TimeoutError, PageLimitExceeded, UploadTooLarge):
+            raise
+        except Exception:
+            return
+    else:
+        # 이미지(JPG, PNG)는 현재 OCR 미지원
+        return
+
+
+def extract_text_from_registry_file(uploaded_file):
+    """텍스트 기반 PDF 등기부에서 텍스트 추출 (스캔 이미지 PDF는 불가)"""
+    texts = []
+    try:
+        for t in iter_registry_file_pages(uploaded_file):
+            texts.append(t)
+    except (TimeoutError, PageLimitExceeded):
+        pass  # 그때까지 읽은 페이지만
+    except UploadTooLarge:
+        return ""
+    return "\n".join(texts)
+
+
+REGISTRY_TIMEOUT_WARNING = "등기부 텍스트 추출 시간이 너무 오래 걸려서 앞부분 페이지만 분석했습니다. (PDF 구조 문제일 수 있어요.)"
+REGISTRY_PAGE_LIMIT_WARNING = "등기부 페이지가 너무 많아서 앞부분 페이지만 분석했습니다. ({detail})"
+
+
+# 등기부 키워드를 한 번에 찾는 정규식 (왼쪽부터 한 번만 훑음)
+# - 같은 위치에서는 먼저 적힌 패턴이 우선이라 '가압류' 안의 '압류'는 따로 잡히지 않음
+# - amount 는 채권최고액 뒤 금액까지 같이 잡음
+REGISTRY_SCAN_RE = re.compile(
+    r"(?P<mortgage>근저당권)"
+    r"|(?P<amount>채권최고액\s*(?P<amount_value>[\d,]+)\s*원)"
+    r"|(?P<owner>소유[자권])"
+    r"|(?P<provisional_seizure>가압류)"
+    r"|(?P<injunction>가처분)"
+    r"|(?P<seizure>압류)"
+    r"|(?P<auction>경매 ?개시결정)"
+)
+
+
+def scan_registry_text(text, offset=0):
+    """
+    등기부 텍스트를 한 번만 훑어서 키워드·채권최고액·소유자 줄 위치를 모두 찾음
+
+    반환: [(종류, 시작, 끝, 값), ...]  (시작·끝은 offset 을 더한 전체 텍스트 기준 위치)
+    - mortgage / provisional_seizure / injunction / seizure / auction: 값은 매칭된 문자열
+    - amount: 값은 채권최고액(정수, 원)
+    - owner: '소유자/소유권'이 들어간 줄 (같은 줄은 한 번만), 위치는 그 줄의 시작·끝
+    """
+    hits = []
+    last_owner_line = -1
+    for m in REGISTRY_SCAN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "amount":
+            try:
+                value = int(m.group("amount_value").replace(",", ""))
+            except ValueError:
+                continue
+            hits.append((kind, offset + m.start(), offset + m.end(), value))
+        elif kind == "owner":
+            line_start = text.rfind("\n", 0, m.start()) + 1
+            if line_start == last_owner_line:
+                continue
+            last_owner_line = line_start
+            line_end = text.find("\n", m.end())
+            if line_end < 0:
+                line_end = len(text)
+            hits.append((kind, offset + line_start, offset + line_end, text[line_start:line_end].strip()))
+        else:
+            hits.append((kind, offset + m.start(), offset + m.end(), m.group()))
+    return hits
+
+
+def _new_registry_tally():
+    return {
+        "mortgage_count": 0,
+        "mortgage_total": 0,
+        "owner_lines": [],
+        "keywords": set(),
+        "offset": 0,
+    }
+
+
+def _scan_registry_chunk(chunk, tally):
+    """페이지 하나(또는 텍스트 조각)를 한 번 훑어서 tally 에 누적"""
+    hits = scan_registry_text(chunk, offset=tally["offset"])
+    tally["offset"] += len(chunk) + 1  # 페이지 사이 줄바꿈
+
+    for kind, _, _, value in hits:
+        if kind == "mortgage":
+            tally["mortgage_count"] += 1
+        elif kind == "amount":
+            tally["mortgage_total"] += value
+        elif kind == "owner":
+            if len(tally["owner_lines"]) < 5:
+                tally["owner_lines"].append(value)
+        else:
+            tally["keywords"].add(kind)
+
+
+# ================================
+# 등기부 구조화 모델 (표제부/갑구/을구 + 항목 레코드)
+# ================================
+REGISTRY_SECTION_RE = re.compile(r"【\s*(표\s*제\s*부|갑\s*구|을\s*구)\s*】")
+REGISTRY_ENTRY_START_RE = re.compile(r"^[ \t]*(\d+(?:-\d+)?)[ \t]+(?=\S)", re.M)
+REGISTRY_ENTRY_KIND_RE = re.compile(
+    r"(?P<cancel>(?P<target>\d+(?:-\d+)?)번\S*말소)"
+    r"|(?P<kind>근저당권|전세권|임차권|소유권이전청구권가등기|소유권보존|소유권이전"
+    r"|가압류|가처분|압류|(?:임의|강제)?경매 ?개시결정|신탁)"
+)
+REGISTRY_DATE_RE = re.compile(r"(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일")
+REGISTRY_AMOUNT_RE = re.compile(r"(?:채권최고액|전세금|보증금|청구금액)\s*금?\s*([\d,]+)\s*원")
+
+
+def _entry_kind(matched):
+    if "경매" in matched:
+        return "경매개시결정"
+    if matched == "소유권이전청구권가등기":
+        return "가등기"
+    return matched
+
+
+class RegistryEntry:
+    """등기 항목 하나 (순위번호 단위)"""
+
+    __slots__ = ("section", "rank", "kind", "date", "amount", "cancelled", "start")
+
+    def __init__(self, section, rank, kind, date=None, amount=0, cancelled=False, start=0):
+        self.section = section        # "표제부" / "갑구" / "을구"
+        self.rank = rank              # 순위번호 (문자열, 예: "3", "2-1")
+        self.kind = kind              # "근저당권", "가압류", "소유권이전", "말소", "기타" 등
+        self.date = date              # 접수일 "YYYY-MM-DD"
+        self.amount = amount          # 채권최고액·전세금·청구금액 (원)
+        self.cancelled = cancelled    # 뒤 순위의 말소 등기로 지워졌는지
+        self.start = start            # 원문에서 항목이 시작하는 위치 (scan_registry_text 결과와 연결용)
+
+    def to_row(self):
+        return [self.section, self.rank, self.kind, self.date, self.amount, self.cancelled, self.start]
+
+
+class RegistryModel:
+    """
+    등기부 구조화 결과
+
+    - entries: 원문 순서대로의 RegistryEntry 목록
+    - by_kind: 항목 종류별 인덱스 (kind -> [RegistryEntry, ...]) 라서 종류별 조회가 O(1)
+    원문 텍스트는 들고 있지 않음 (세션에는 이 모델만 저장)
+    """
+
+    __slots__ = ("entries", "by_kind", "text_length")
+
+    def __init__(self, entries, text_length=0):
+        self.entries = entries
+        self.text_length = text_length
+        self.by_kind = {}
+        for e in entries:
+            self.by_kind.setdefault(e.kind, []).append(e)
+
+    def of_kind(self, kind, active_only=False):
+        entries = self.by_kind.get(kind, [])
+        if active_only:
+            return [e for e in entries if not e.cancelled]
+        return entries
+
+    def count(self, kind, active_only=False):
+        return len(self.of_kind(kind, active_only))
+
+    def entry_at(self, pos):
+        """원문 위치(예: scan_registry_text 의 hit 시작 위치)가 속한 항목"""
+        i = bisect.bisect_right(self.entries, pos, key=lambda e: e.start)
+        return self.entries[i - 1] if i else None
+
+    def to_json(self):
+        return {"__registry_model__": [e.to_row() for e in self.entries], "text_length": self.text_length}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls([RegistryEntry(*row) for row in data["__registry_model__"]], data.get("text_length", 0))
+
+
+def parse_registry_model(text):
+    """등기부 텍스트를 표제부/갑구/을구 구역과 순위번호별 항목으로 나눔"""
+    text = text or ""
+    entries = []
+
+    headers = list(REGISTRY_SECTION_RE.finditer(text))
+    for i, h in enumerate(headers):
+        section = re.sub(r"\s", "", h.group(1))
+        body_start = h.end()
+        body_end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        body = text[body_start:body_end]
+
+        starts = list(REGISTRY_ENTRY_START_RE.finditer(body))
+        by_rank = {}
+        for j, m in enumerate(starts):
+            entry_text = body[m.end(): starts[j + 1].start() if j + 1 < len(starts) else len(body)]
+            rank = m.group(1)
+
+            kind = "표시" if section == "표제부" else "기타"
+            target = None
+            km = REGISTRY_ENTRY_KIND_RE.search(entry_text)
+            if km and section != "표제부":
+                if km.group("cancel"):
+                    kind = "말소"
+                    target = km.group("target")
+                else:
+                    kind = _entry_kind(km.group("kind"))
+
+            dm = REGISTRY_DATE_RE.search(entry_text)
+            date = f"{int(dm.group(1)):04d}-{int(dm.group(2)):02d}-{int(dm.group(3)):02d}" if dm else None
+
+            amount = 0
+            am = REGISTRY_AMOUNT_RE.search(entry_text)
+            if am:
+                try:
+                    amount = int(am.group(1).replace(",", ""))
+                except ValueError:
+                    pass
+
+            entry = RegistryEntry(section, rank, kind, date, amount, False, body_start + m.start(1))
+            entries.append(entry)
+            by_rank[rank] = entry
+            if target is not None and target in by_rank:
+                by_rank[target].cancelled = True
+
+    return RegistryModel(entries, len(text))
+
+
+def _registry_json_default(o):
+    # RegistryCache 디스크 저장용
+    if isinstance(o, RegistryModel):
+        return o.to_json()
+    raise TypeError(f"JSON 으로 저장할 수 없는 값: {type(o).__name__}")
+
+
+def _registry_json_object_hook(d):
+    if "__registry_model__" in d:
+        return RegistryModel.from_json(d)
+    return d
+
+
+def _registry_warnings(tally):
+    """누적된 키워드 집계로 위험 신호 문장 만들기"""
+    mortgage_count = tally["mortgage_count"]
+    total_amount = tally["mortgage_total"]
+    keywords = tally["keywords"]
+
+    warnings = []
+    if mortgage_count >= 2:
+        warnings.append(
+            f"근저당권이 {mortgage_count}건 등기되어 있습니다. (선순위 권리관계 꼭 확인 필요)"
+        )
+    elif mortgage_count == 1:
+        warnings.append(
+            "근저당권이 1건 등기되어 있습니다. 채권최고액과 보증금 규모를 꼭 비교해 보세요."
+        )
+
+    if total_amount > 0:
+        warnings.append(
+            f"채권최고액 합계가 약 {total_amount:,}원 정도로 표시됩니다. (실제 매매가·보증금과 비교 필요)"
+        )
+
+    if "provisional_seizure" in keywords:
+        warnings.append("등기부에 '가압류' 기록이 있습니다. 채권자가 재산을 묶어둔 상태일 수 있어요.")
+    if "injunction" in keywords:
+        warnings.append("등기부에 '가처분' 기록이 있습니다. 소유권 분쟁 가능성을 의심해 볼 수 있어요.")
+    if "seizure" in keywords:
+        warnings.append("등기부에 '압류' 기록이 있습니다. 세금·채무 문제 여부를 꼭 확인해야 합니다.")
+    if "auction" in keywords:
+        warnings.append("등기부에 '경매개시결정' 기록이 있습니다. 매우 위험한 매물일 수 있어요.")
+    return warnings
+
+
+def analyze_registry_pages(pages):
+    """
+    페이지 텍스트가 들어오는 대로 분석하면서, 페이지마다 중간 결과를 yield
+    (마지막으로 yield 되는 값이 최종 결과)
+    """
+    tally = _new_registry_tally()
+    texts = []
+    stop_warning = None  # 시간 초과·페이지 제한으로 중간에 멈췄을 때 붙일 안내
+
+    try:
+        for page in pages:
+            page = page or ""
+            texts.append(page)
+            _scan_registry_chunk(page, tally)
+            yield {
+                "partial": True,
+                "pages_done": len(texts),
+                "mortgage_count": tally["mortgage_count"],
+                "mortgage_total": tally["mortgage_total"],
+                "owner_lines": list(tally["owner_lines"]),
+                "warnings": _registry_warnings(tally),
+            }
+    except TimeoutError:
+        stop_warning = REGISTRY_TIMEOUT_WARNING
+    except PageLimitExceeded as e:
+        stop_warning = REGISTRY_PAGE_LIMIT_WARNING.format(detail=e)
+
+    full_text = "\n".join(texts)
+    text = full_text.strip()
+
+    # 원문 텍스트는 결과에 남기지 않고 구조화 모델만 보관
+    # (항목 위치가 scan_registry_text 위치와 맞도록 strip 전 텍스트로 파싱)
+    result = {
+        "pages": len(texts),
+        "text_length": len(text),
+        "mortgage_count": 0,
+        "mortgage_total": 0,
+        "owner_lines": [],
+        "warnings": [],
+        "registry": parse_registry_model(full_text),
+    }
+
+    if not text:
+        result["warnings"].append(
+            "텍스트를 추출하지 못했습니다. (스캔 이미지이거나 PDF 구조 문제일 수 있어요.)"
+        )
+        if stop_warning:
+            result["warnings"].append(stop_warning)
+        yield result
+        return
+
+    result["mortgage_count"] = tally["mortgage_count"]
+    result["mortgage_total"] = tally["mortgage_total"]
+    result["owner_lines"] = tally["owner_lines"][:5]
+
+    # 위험 신호 요약
+    warnings = _registry_warnings(tally)
+    if stop_warning:
+        warnings.append(stop_warning)
+
+    if not warnings:
+        warnings.append(
+            "텍스트에서 뚜렷한 근저당/가압류/경매 관련 키워드가 많이 보이지 않습니다.\n"
+            "그래도 최종 판단은 반드시 전문가와 등기부 원문을 함께 보고 결정해야 합니다."
+        )
+
+    result["warnings"] = warnings
+    yield result
+
+
+def analyze_registry_text(text: str):
+    """등기부 텍스트를 아주 단순하게 키워드 위주로 분석"""
+    result = None
+    for result in analyze_registry_pages([(text or "").strip()]):
+        pass
+    return result
+
+
+def analyze_registry_pdf_bytes(source, max_pages=MAX_PAGES, timeout=EXTRACT_TIMEOUT, workers=None):
+    """
+    PDF를 바로 분석해서 최종 결과만 돌려줌 (일괄 분석 CLI 용)
+
+    source 는 PDF 바이트 또는 파일 경로 (경로면 mmap 으로 읽음)
+    업로드 화면과 달리 PDF를 열지 못하면 예외를 그대로 올려서 호출한 쪽이 기록하게 함
+    """
+    result = None
+    for result in analyze_registry_pages(iter_pdf_page_texts(source, max_pages, timeout, workers)):
+        pass
+    return result
+
+
+# ================================
+# 등기부 분석 결과 캐시 (업로드 파일 SHA-256 기준)
+# ================================
+REGISTRY_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "registry")
+REGISTRY_CACHE_MEMORY_ITEMS = 32                 # 메모리 LRU에 보관할 분석 결과 개수
+REGISTRY_CACHE_DISK_BYTES = 50 * 1024 * 1024     # 디스크 캐시 최대 크기 (50MB)
+# 분석 결과 dict 모양(키·RegistryModel JSON)이 바뀌면 올림 → 예전 디스크 파일은 읽지 않고 LRU 로 자연히 지워짐
+# (1: 버전 없는 파일 이름 시절, 2: registry 모델 + text_length)
+REGISTRY_CACHE_FORMAT = 2
+
+
+class RegistryCache:
+    """
+    등기부 분석 결과 2단 캐시
+
+    - 키: 업로드한 파일 바이트의 SHA-256 (같은 파일이면 이름이 달라도 같은 키)
+    - 디스크 파일 이름에는 형식 버전을 붙임 (<키>.v<version>.json) → 결과 모양이 바뀐 뒤 예전 파일을 읽지 않음
+    - 1단: 프로세스 메모리 LRU (최근에 쓴 순서대로 max_items 개까지)
+    - 2단: 디스크 JSON 파일 (앱을 재시작해도 유지, 전체 크기가 max_disk_bytes를 넘으면
+           가장 오래 안 쓴 파일부터 삭제)
+    - stats: 메모리 적중 / 디스크 적중 / 미스 횟수
+    """
+
+    def __init__(
+        self,
+        cache_dir,
+        max_items=REGISTRY_CACHE_MEMORY_ITEMS,
+        max_disk_bytes=REGISTRY_CACHE_DISK_BYTES,
+        version=REGISTRY_CACHE_FORMAT,
+    ):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_items = max_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()   # 여러 세션(스레드)이 같은 캐시를 같이 씀
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.v{self.version}.json")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f, object_hook=_registry_json_object_hook)
+            os.utime(path)  # 디스크 쪽 LRU 순서 갱신
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        with self._lock:
+            self.stats["disk_hits"] += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False, default=_registry_json_default)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError:
+            # 디스크 캐시는 실패해도 메모리 캐시만으로 동작
+            pass
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for e in it:
+                if not e.name.endswith(".json"):
+                    continue
+                info = e.stat()
+                entries.append((info.st_mtime, info.st_size, e.path))
+                total += info.st_size
+        if total <= self.max_disk_bytes:
+            return
+        entries.sort()  # 오래 안 쓴 파일부터
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats_text(self):
+        s = self.stats
+        total = s["memory_hits"] + s["disk_hits"] + s["misses"]
+        hit_rate = (s["memory_hits"] + s["disk_hits"]) / total * 100 if total else 0.0
+        return (
+            f"메모리 적중 {s['memory_hits']}회 · 디스크 적중 {s['disk_hits']}회 · "
+            f"미스 {s['misses']}회 (적중률 {hit_rate:.0f}%)"
+        )
+
+
+def registry_file_key(uploaded_file):
+    """업로드 파일 내용 기준 캐시 키 (SHA-256, 파일을 통째로 복사하지 않고 청크 단위로 계산)"""
+    return file_sha256(uploaded_file)
+
+
+@timed("registry.analyze_file")
+def analyze_registry_file_cached(uploaded_file, cache, on_progress=None):
+    """
+    같은 등기부 파일이면 PDF 파싱·분석을 다시 하지 않고 캐시된 결과를 돌려줌
+
+    캐시에 없으면 페이지 단위로 추출·분석하면서 on_progress(중간 결과)를 호출
+    시간 초과로 앞부분만 분석한 결과는 캐시하지 않음 (서버가 바빠서 늦었을 수 있으니 다음에 다시 시도)
+    파일이 MAX_UPLOAD_BYTES 를 넘으면 UploadTooLarge
+    """
+    key = registry_file_key(uploaded_file)
+    analysis = cache.get(key)
+    if analysis is None:
+        for analysis in analyze_registry_pages(iter_registry_file_pages(uploaded_file)):
+            if analysis.get("partial") and on_progress is not None:
+                on_progress(analysis)
+        if REGISTRY_TIMEOUT_WARNING not in analysis["warnings"]:
+            cache.put(key, analysis)
+    return analysis
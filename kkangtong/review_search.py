@@ -0,0 +1,226 @@
+"""
+후기 본문 검색 (글자 n-gram 역색인, Streamlit 없이 import 가능)
+
+- 형태소 분석기 없이 한국어를 찾기 위해 좋았던 점/아쉬웠던 점을 글자 2-gram·3-gram 으로 쪼개서 색인
+  ("층간소음" → 층간·간소·소음 / 층간소·간소음)
+- 띄어쓰기가 들쭉날쭉해도 ("층간 소음") 찾을 수 있게 공백·문장부호를 뺀 글자열로 만듦
+- 검색어는 공백 단위 낱말마다: 3글자 이상이면 3-gram, 2글자면 2-gram 목록을 (가장 드문 것부터) 교집합
+  → 4글자 이상은 원문에 붙어 있는지 한 번 더 확인해서 틀린 결과가 없음
+  모든 낱말이 들어간 후기가 없으면 낱말 일부만 맞는 후기를 점수순으로 (partial)
+- 점수: n-gram 별 BM25 (드문 n-gram 일수록, 짧은 후기에서 여러 번 나올수록 높음), 같으면 최신 후기 먼저
+- 별점 범위·태그(소음 등)·주소 필터는 후보에 NumPy 배열 마스크로 적용
+- 색인은 프로세스 메모리에 있고, 검색할 때마다 저장소에서 마지막으로 본 id 이후 후기만 읽어 붙임
+  (후기는 id 가 계속 커지므로 postings 가 항상 정렬된 채로 append 만 됨)
+"""
+import re
+import threading
+from array import array
+from collections import Counter
+
+import numpy as np
+
+from kkangtong.profiling import timed
+from kkangtong.reviews import REVIEW_FLAGS
+
+SEARCH_PAGE_SIZE = 20
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_NON_WORD_RE = re.compile(r"[^0-9a-z가-힣]+")
+_FLAG_BITS = {name: 1 << i for i, (name, _) in enumerate(REVIEW_FLAGS)}
+
+
+def normalize_search_text(text):
+    """소문자 + 한글·영문·숫자만 남기고 공백·문장부호 제거"""
+    return _NON_WORD_RE.sub("", (text or "").lower())
+
+
+def text_ngrams(text):
+    """정규화된 글자열 → 2-gram, 3-gram 목록 (겹치게)"""
+    return [text[i:i + 2] for i in range(len(text) - 1)] + [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+def query_terms(query):
+    """검색어 → 정규화된 낱말 목록 (2글자 미만 낱말은 색인으로 찾을 수 없어서 뺌, 중복 제거)"""
+    terms = []
+    for token in (query or "").split():
+        term = normalize_search_text(token)
+        if len(term) >= 2 and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def _term_grams(term):
+    n = 3 if len(term) >= 3 else 2
+    return list(dict.fromkeys(term[i:i + n] for i in range(len(term) - n + 1)))
+
+
+class _Column:
+    """필요할 때 두 배씩 늘어나는 NumPy 열 (문서 번호로 바로 접근)"""
+
+    def __init__(self, dtype):
+        self.data = np.zeros(1024, dtype=dtype)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.data):
+            self.data = np.concatenate([self.data, np.zeros_like(self.data)])
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self):
+        return self.data[:self.size]
+
+
+class ReviewSearchIndex:
+    """
+    후기 n-gram 역색인
+
+    - 문서 번호(0, 1, 2, ...) 는 색인에 들어온 순서 = 후기 id 순서
+    - postings[n-gram] = (문서 번호 array, 그 문서 안 등장 횟수 array)
+    - search() 전에 저장소(ReviewStore)에서 새 후기를 자동으로 따라 읽음 (store 가 있을 때)
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.last_id = 0
+        self.postings = {}
+        self.texts = []                       # 정규화된 본문 (긴 낱말 확인용)
+        self.review_ids = _Column(np.int64)
+        self.ratings = _Column(np.int8)
+        self.flag_bits = _Column(np.uint8)
+        self.lengths = _Column(np.int32)      # n-gram 개수 (BM25 길이 보정)
+        self.address_ids = _Column(np.int32)
+        self.address_keys = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, review):
+        """후기 dict 하나 색인 (id 는 이전에 넣은 후기보다 커야 함)"""
+        with self._lock:
+            self._add(review)
+
+    def _add(self, review):
+        if review["id"] <= self.last_id:
+            return
+        doc = len(self.texts)
+        text = normalize_search_text(f"{review.get('pros', '')}\n{review.get('cons', '')}")
+        grams = text_ngrams(text)
+        for gram, count in Counter(grams).items():
+            entry = self.postings.get(gram)
+            if entry is None:
+                entry = self.postings[gram] = (array("I"), array("B"))
+            entry[0].append(doc)
+            entry[1].append(min(count, 255))
+        self.texts.append(text)
+        self.review_ids.append(review["id"])
+        self.ratings.append(review.get("rating", 0))
+        self.flag_bits.append(sum(bit for name, bit in _FLAG_BITS.items() if review.get(name)))
+        self.lengths.append(len(grams))
+        self.address_ids.append(self.address_keys.setdefault(review.get("address_key", ""), len(self.address_keys)))
+        self._total_length += len(grams)
+        self.last_id = review["id"]
+
+    def sync(self):
+        """저장소에서 아직 안 읽은 후기만 색인에 추가 → 추가한 개수"""
+        if self.store is None:
+            return 0
+        with self._lock:
+            before = len(self.texts)
+            for review in self.store.iter_reviews(self.last_id):
+                self._add(review)
+            return len(self.texts) - before
+
+    def _docs(self, gram):
+        entry = self.postings.get(gram)
+        if entry is None:
+            return np.empty(0, dtype=np.int64)
+        return np.array(entry[0], dtype=np.int64)
+
+    def _match_term(self, term):
+        """낱말 하나가 들어 있는 문서 번호 (정렬된 배열)"""
+        grams = sorted(_term_grams(term), key=lambda g: len(self.postings[g][0]) if g in self.postings else 0)
+        docs = self._docs(grams[0])
+        for gram in grams[1:]:
+            if not len(docs):
+                break
+            docs = np.intersect1d(docs, self._docs(gram), assume_unique=True)
+        if len(term) > 3 and len(docs):
+            # n-gram 이 전부 있어도 떨어져 있을 수 있으므로 원문에서 한 번 더 확인
+            docs = docs[[term in self.texts[d] for d in docs.tolist()]]
+        return docs
+
+    def _bm25(self, docs, terms):
+        n = len(self.texts)
+        avg_len = self._total_length / n if n else 1.0
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths.view()[docs] / avg_len)
+        scores = np.zeros(len(docs))
+        for term in terms:
+            for gram in _term_grams(term):
+                entry = self.postings.get(gram)
+                if entry is None:
+                    continue
+                gram_docs = np.frombuffer(entry[0], dtype=np.uint32)
+                pos = np.searchsorted(gram_docs, docs)
+                pos_ok = np.minimum(pos, len(gram_docs) - 1)
+                present = gram_docs[pos_ok] == docs
+                tf = np.where(present, np.frombuffer(entry[1], dtype=np.uint8)[pos_ok], 0).astype(float)
+                df = len(gram_docs)
+                idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+                scores += idf * tf * (BM25_K1 + 1) / (tf + length_norm)
+                del gram_docs   # 배열 버퍼를 잡고 있으면 다음 append 가 실패하므로 바로 놓음
+        return scores
+
+    @timed("reviews.search")
+    def search(self, query, limit=SEARCH_PAGE_SIZE, offset=0, min_rating=None, max_rating=None, flags=(),
+               address_key=None):
+        """
+        검색 → {"total": 맞은 후기 수, "partial": 일부 낱말만 맞은 결과인지, "hits": [(후기 id, 점수), ...]}
+
+        flags: 모두 체크된 후기만 (예: ["noise_issue"]), address_key: 그 주소 후기만
+        """
+        self.sync()
+        terms = query_terms(query)
+        empty = {"total": 0, "partial": False, "hits": [], "terms": terms}
+        if not terms:
+            return empty
+
+        with self._lock:
+            per_term = [self._match_term(t) for t in terms]
+            docs = per_term[0]
+            for other in per_term[1:]:
+                docs = np.intersect1d(docs, other, assume_unique=True)
+            partial = not len(docs) and len(terms) > 1
+            if partial:
+                docs = np.unique(np.concatenate(per_term))
+
+            mask = np.ones(len(docs), dtype=bool)
+            if min_rating is not None:
+                mask &= self.ratings.view()[docs] >= min_rating
+            if max_rating is not None:
+                mask &= self.ratings.view()[docs] <= max_rating
+            required = sum(_FLAG_BITS[name] for name in flags)
+            if required:
+                mask &= (self.flag_bits.view()[docs] & required) == required
+            if address_key is not None:
+                address_id = self.address_keys.get(address_key)
+                mask &= self.address_ids.view()[docs] == (-1 if address_id is None else address_id)
+            docs = docs[mask]
+            if not len(docs):
+                return {**empty, "partial": partial}
+
+            scores = self._bm25(docs, terms)
+            # 점수 높은 순, 같으면 최신(문서 번호 큰) 순 → 필요한 페이지까지만 정렬
+            end = min(offset + limit, len(docs))
+            top = np.arange(len(docs))
+            if end < len(docs):
+                cutoff = np.partition(scores, len(docs) - end)[len(docs) - end]
+                top = np.flatnonzero(scores >= cutoff)
+            order = top[np.lexsort((-docs[top], -scores[top]))]
+            page = order[offset:end]
+            review_ids = self.review_ids.view()[docs[page]]
+            hits = list(zip(review_ids.tolist(), scores[page].round(3).tolist()))
+        return {"total": int(len(docs)), "partial": partial, "hits": hits, "terms": terms}
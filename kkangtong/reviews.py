@@ -0,0 +1,380 @@
+"""
+집 후기 저장소 (Streamlit 없이 import 가능)
+
+- 후기는 세션이 아니라 프로세스 밖 저장소에 두고 모든 사용자가 같이 봄
+- 주소는 normalize_address 정규 키로 묶음 ("서울 은평구 진관동 1" 과 "서울시 은평구 진관동 1번지" 는 같은 집)
+  정규 키가 집 하나를 가리키지 못하면(구까지만 읽힘, 번호 없음) 공백만 정리한 원문 그대로 → 다른 집과 섞이지 않음
+- ReviewStore 는 화면이 쓰는 메서드만 정한 인터페이스 → 나중에 서버 DB 구현으로 바꿔 끼울 수 있음
+- 기본 구현 SqliteReviewStore
+  - WAL 모드: 쓰는 중에도 읽기가 막히지 않음 (읽기는 마지막으로 커밋된 스냅샷을 봄)
+  - 연결 풀: 세션(스레드)마다 연결을 새로 열지 않고 빌려 쓰고 돌려줌
+  - 쓰기는 프로세스 안에서 락으로 한 줄로 세움 (SQLite 는 어차피 쓰기 1개씩 → busy 재시도 대신 대기)
+  - (address_key, created_at) 인덱스로 주소별 목록을 최신순 페이지 단위로 읽음
+- 주소별 요약(개수·별점 합/분포·태그 개수)은 review_stats 테이블에 후기를 넣는 같은 트랜잭션에서
+  +1 씩 갱신 → 요약 읽기는 후기 수와 상관없이 행 하나 (get_stats, 프로세스 메모리에 캐시하고 쓰면 무효화)
+"""
+import abc
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from kkangtong.address import normalize_address
+
+REVIEW_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "reviews.sqlite3")
+REVIEW_POOL_SIZE = 8
+REVIEW_PAGE_SIZE = 10
+REVIEW_BUSY_TIMEOUT_MS = 5_000
+REVIEW_STATS_CACHE_ITEMS = 10_000
+
+# 체크박스 컬럼 → 한 줄 요약 태그 (화면 순서)
+REVIEW_FLAGS = (
+    ("noise_issue", "소음 심함"),
+    ("bug_issue", "벌레 자주 나옴"),
+    ("mold_issue", "곰팡이/누수 문제"),
+    ("landlord_good", "집주인 친절함"),
+    ("landlord_bad", "집주인/관리 응대 불친절"),
+)
+REVIEW_TEXT_FIELDS = ("nickname", "period", "pros", "cons")
+
+_SCHEMA_VERSION = 3
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id            INTEGER PRIMARY KEY,
+    address_key   TEXT    NOT NULL,
+    address       TEXT    NOT NULL,
+    nickname      TEXT    NOT NULL DEFAULT '익명',
+    period        TEXT    NOT NULL DEFAULT '',
+    rating        INTEGER NOT NULL,
+    pros          TEXT    NOT NULL DEFAULT '',
+    cons          TEXT    NOT NULL DEFAULT '',
+    noise_issue   INTEGER NOT NULL DEFAULT 0,
+    bug_issue     INTEGER NOT NULL DEFAULT 0,
+    mold_issue    INTEGER NOT NULL DEFAULT 0,
+    landlord_good INTEGER NOT NULL DEFAULT 0,
+    landlord_bad  INTEGER NOT NULL DEFAULT 0,
+    created_at    REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_address_created ON reviews (address_key, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS reviews_created ON reviews (created_at);
+CREATE TABLE IF NOT EXISTS review_stats (
+    address_key   TEXT    PRIMARY KEY,
+    count         INTEGER NOT NULL DEFAULT 0,
+    rating_sum    INTEGER NOT NULL DEFAULT 0,
+    rating_1      INTEGER NOT NULL DEFAULT 0,
+    rating_2      INTEGER NOT NULL DEFAULT 0,
+    rating_3      INTEGER NOT NULL DEFAULT 0,
+    rating_4      INTEGER NOT NULL DEFAULT 0,
+    rating_5      INTEGER NOT NULL DEFAULT 0,
+    noise_issue   INTEGER NOT NULL DEFAULT 0,
+    bug_issue     INTEGER NOT NULL DEFAULT 0,
+    mold_issue    INTEGER NOT NULL DEFAULT 0,
+    landlord_good INTEGER NOT NULL DEFAULT 0,
+    landlord_bad  INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+_STAT_COUNTERS = ("count", "rating_sum", *(f"rating_{r}" for r in range(1, 6)), *(name for name, _ in REVIEW_FLAGS))
+_STATS_UPSERT = (
+    f"INSERT INTO review_stats (address_key, {', '.join(_STAT_COUNTERS)}) "
+    f"VALUES (?, {', '.join('?' * len(_STAT_COUNTERS))}) "
+    f"ON CONFLICT (address_key) DO UPDATE SET "
+    + ", ".join(f"{c} = {c} + excluded.{c}" for c in _STAT_COUNTERS)
+)
+# 버전 1 DB(요약 테이블 없음)를 열면 기존 후기로 한 번 채움
+_STATS_BACKFILL = (
+    f"INSERT OR REPLACE INTO review_stats (address_key, {', '.join(_STAT_COUNTERS)}) "
+    "SELECT address_key, COUNT(*), SUM(rating), "
+    + ", ".join(f"SUM(rating = {r})" for r in range(1, 6)) + ", "
+    + ", ".join(f"SUM({name})" for name, _ in REVIEW_FLAGS)
+    + " FROM reviews GROUP BY address_key"
+)
+# 버전 2 이하 DB 는 후기 키를 지금 규칙으로 다시 계산하고 요약 테이블을 새로 채움
+# (예전 키는 동을 모르면 "서울 중구" 처럼 구 단위로 묶여서 다른 집 후기가 섞였음)
+_STATS_RESET = "DELETE FROM review_stats"
+
+_COLUMNS = ("id", "address_key", "address", *REVIEW_TEXT_FIELDS[:2], "rating", *REVIEW_TEXT_FIELDS[2:],
+            *(name for name, _ in REVIEW_FLAGS), "created_at")
+# 목록·검색 결과 머리글용 (본문 pros/cons 는 펼칠 때 get_reviews 로 따로)
+_SUMMARY_COLUMNS = tuple(c for c in _COLUMNS if c not in ("pros", "cons"))
+
+
+class ReviewError(ValueError):
+    """후기 내용이 올바르지 않을 때 (주소 없음, 별점 범위 밖 등)"""
+
+
+def review_address_key(address):
+    """
+    주소 → 후기를 묶는 키
+
+    정규 키가 집 하나를 가리킬 때(번호 + 도로명/동)만 정규 키, 아니면 공백만 정리한 원문
+    (구 단위까지만 읽힌 주소를 정규 키로 묶으면 그 구의 모든 집 후기가 한곳에 섞임)
+    """
+    address = " ".join((address or "").split())
+    if not address:
+        return ""
+    normalized = normalize_address(address)
+    return normalized.key if normalized.specific else address
+
+
+def is_specific_address(address):
+    """주소가 집 하나를 가리키는지 (아니면 후기는 원문이 똑같은 주소끼리만 묶임)"""
+    return normalize_address(" ".join((address or "").split())).specific
+
+
+def review_flags(review):
+    """후기 dict → 한 줄 요약 태그 목록"""
+    return [label for name, label in REVIEW_FLAGS if review.get(name)]
+
+
+class ReviewStats:
+    """
+    주소 하나의 후기 요약 (읽기 전용)
+
+    - count, rating_sum, rating_hist (별점 1~5 개수), flags (태그 컬럼 → 개수)
+    - average_rating / flag_share 는 후기가 없으면 None
+    """
+
+    __slots__ = ("address_key", "count", "rating_sum", "rating_hist", "flags")
+
+    def __init__(self, address_key, count=0, rating_sum=0, rating_hist=(0, 0, 0, 0, 0), flags=None):
+        self.address_key = address_key
+        self.count = count
+        self.rating_sum = rating_sum
+        self.rating_hist = tuple(rating_hist)
+        self.flags = dict(flags or {name: 0 for name, _ in REVIEW_FLAGS})
+
+    @property
+    def average_rating(self):
+        return self.rating_sum / self.count if self.count else None
+
+    def flag_share(self, name):
+        return self.flags[name] / self.count if self.count else None
+
+    def __repr__(self):
+        return f"ReviewStats({self.address_key!r}, count={self.count}, rating_sum={self.rating_sum})"
+
+
+def _clean_review(review):
+    try:
+        rating = int(review.get("rating", 0))
+    except (TypeError, ValueError):
+        rating = 0
+    if not 1 <= rating <= 5:
+        raise ReviewError(f"별점은 1~5 사이여야 합니다: {review.get('rating')!r}")
+    row = {name: str(review.get(name) or "").strip() for name in REVIEW_TEXT_FIELDS}
+    row["nickname"] = row["nickname"] or "익명"
+    row["rating"] = rating
+    for name, _ in REVIEW_FLAGS:
+        row[name] = int(bool(review.get(name)))
+    return row
+
+
+class ReviewStore(abc.ABC):
+    """
+    후기 저장소 인터페이스 (화면은 이 메서드만 씀)
+
+    - address_key 는 review_address_key() 결과
+    - 목록은 최신 후기부터, offset/limit 페이지 단위
+    - 반환하는 후기는 dict (id, address_key, address, nickname, period, rating, pros, cons, 플래그들, created_at)
+    """
+
+    @abc.abstractmethod
+    def add_review(self, address, review):
+        """후기 하나 저장 → 새 후기 dict"""
+
+    @abc.abstractmethod
+    def count_reviews(self, address_key):
+        """주소 하나의 후기 개수"""
+
+    @abc.abstractmethod
+    def list_reviews(self, address_key, limit=REVIEW_PAGE_SIZE, offset=0):
+        """주소 하나의 후기 dict 목록 (최신순, offset 부터 limit 개)"""
+
+    @abc.abstractmethod
+    def list_review_summaries(self, address_key, limit=REVIEW_PAGE_SIZE, offset=0):
+        """list_reviews 와 같은 순서, 본문(pros/cons)을 뺀 머리글 정보만"""
+
+    @abc.abstractmethod
+    def get_stats(self, address_key):
+        """주소별 요약 → ReviewStats (후기가 없으면 count 0)"""
+
+    @abc.abstractmethod
+    def iter_reviews(self, after_id=0, batch_size=1000):
+        """id 가 after_id 보다 큰 후기를 id 순서로 (검색 인덱스가 새 후기만 따라 읽을 때 사용)"""
+
+    @abc.abstractmethod
+    def get_reviews(self, ids):
+        """id 목록 → 같은 순서의 후기 dict 목록 (없는 id 는 빠짐)"""
+
+    @abc.abstractmethod
+    def get_review_summaries(self, ids):
+        """get_reviews 와 같은 순서, 본문(pros/cons)을 뺀 머리글 정보만"""
+
+    def close(self):
+        """연결 등 자원 정리 (필요한 구현만 재정의)"""
+
+
+def _rekey_reviews(conn):
+    rows = conn.execute("SELECT id, address_key, address FROM reviews").fetchall()
+    updates = [(key, r["id"]) for r in rows if (key := review_address_key(r["address"])) != r["address_key"]]
+    conn.executemany("UPDATE reviews SET address_key = ? WHERE id = ?", updates)
+
+
+class SqliteReviewStore(ReviewStore):
+    """SQLite(WAL) + 연결 풀 구현 (프로세스 하나에서 여러 세션이 같이 씀)"""
+
+    def __init__(self, path=REVIEW_DB_PATH, pool_size=REVIEW_POOL_SIZE):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._opened = 0
+        self._pool_size = pool_size
+        self._pool_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stats_cache = {}
+        self._stats_generation = 0   # 쓸 때마다 +1 → 읽는 도중 쓰기가 끼었으면 캐시에 넣지 않음
+        self._stats_lock = threading.Lock()
+        with self._write_lock, self._connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < _SCHEMA_VERSION:
+                conn.executescript(_SCHEMA)
+                if version in (1, 2):
+                    _rekey_reviews(conn)
+                    conn.execute(_STATS_RESET)
+                    conn.execute(_STATS_BACKFILL)
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=REVIEW_BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                               isolation_level=None)   # 트랜잭션은 직접 BEGIN/COMMIT
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")     # WAL 에서는 NORMAL 이어도 커밋이 깨지지 않음
+        conn.execute(f"PRAGMA busy_timeout = {REVIEW_BUSY_TIMEOUT_MS}")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """풀에서 연결 빌리기 (모자라면 pool_size 까지 새로 열고, 그 이상이면 반납될 때까지 대기)"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                create = self._opened < self._pool_size
+                if create:
+                    self._opened += 1
+            conn = self._open() if create else self._pool.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put(conn)
+
+    def add_review(self, address, review):
+        address = " ".join((address or "").split())
+        key = review_address_key(address)
+        if not key:
+            raise ReviewError("주소가 비어 있습니다")
+        row = _clean_review(review)
+        row.update(address_key=key, address=address, created_at=time.time())
+        names = list(row)
+        counters = [1, row["rating"], *(int(row["rating"] == r) for r in range(1, 6)), *(row[n] for n, _ in REVIEW_FLAGS)]
+        with self._write_lock, self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.execute(
+                f"INSERT INTO reviews ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                [row[n] for n in names],
+            )
+            conn.execute(_STATS_UPSERT, [key, *counters])
+            conn.execute("COMMIT")
+            with self._stats_lock:
+                self._stats_cache.pop(key, None)
+                self._stats_generation += 1
+        row["id"] = cur.lastrowid
+        return row
+
+    def count_reviews(self, address_key):
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM reviews WHERE address_key = ?", (address_key,)).fetchone()[0]
+
+    def list_reviews(self, address_key, limit=REVIEW_PAGE_SIZE, offset=0):
+        return self._list(_COLUMNS, address_key, limit, offset)
+
+    def list_review_summaries(self, address_key, limit=REVIEW_PAGE_SIZE, offset=0):
+        return self._list(_SUMMARY_COLUMNS, address_key, limit, offset)
+
+    def _list(self, columns, address_key, limit, offset):
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(columns)} FROM reviews WHERE address_key = ? "
+                "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                (address_key, int(limit), int(offset)),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def iter_reviews(self, after_id=0, batch_size=1000):
+        while True:
+            with self._connection() as conn:
+                rows = conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM reviews WHERE id > ? ORDER BY id LIMIT ?",
+                    (int(after_id), int(batch_size)),
+                ).fetchall()
+            for r in rows:
+                yield dict(r)
+            if len(rows) < batch_size:
+                return
+            after_id = rows[-1]["id"]
+
+    def get_reviews(self, ids):
+        return self._get(_COLUMNS, ids)
+
+    def get_review_summaries(self, ids):
+        return self._get(_SUMMARY_COLUMNS, ids)
+
+    def _get(self, columns, ids):
+        ids = [int(i) for i in ids]
+        if not ids:
+            return []
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(columns)} FROM reviews WHERE id IN ({', '.join('?' * len(ids))})", ids
+            ).fetchall()
+        by_id = {r["id"]: dict(r) for r in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def get_stats(self, address_key):
+        with self._stats_lock:
+            stats = self._stats_cache.get(address_key)
+            generation = self._stats_generation
+        if stats is not None:
+            return stats
+        with self._connection() as conn:
+            r = conn.execute(
+                f"SELECT {', '.join(_STAT_COUNTERS)} FROM review_stats WHERE address_key = ?", (address_key,)
+            ).fetchone()
+        if r is None:
+            stats = ReviewStats(address_key)
+        else:
+            stats = ReviewStats(
+                address_key,
+                r["count"],
+                r["rating_sum"],
+                [r[f"rating_{k}"] for k in range(1, 6)],
+                {name: r[name] for name, _ in REVIEW_FLAGS},
+            )
+        with self._stats_lock:
+            if generation == self._stats_generation:
+                if len(self._stats_cache) >= REVIEW_STATS_CACHE_ITEMS:
+                    self._stats_cache.clear()
+                self._stats_cache[address_key] = stats
+        return stats
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,299 @@
+"""
+위험도 점수 규칙 (risk_rules.json → 정렬된 구간 경계표로 한 번만 컴파일)
+
+- 점수 구간(전세가율·보증금·전세 시세 대비·월세), 계약 형태 점수, 메모 키워드, 등급(45/70점) 경계를
+  전부 설정 파일 하나에 두고, 코드에는 if/elif 로 숫자를 적지 않음
+- compile 결과(RuleSet)는 한 건씩 계산(bisect)과 배열 계산(np.digitize)이 같이 씀
+  → 두 경로가 같은 경계표를 보므로 결과가 어긋나지 않음
+- 화면 설명 문구도 같은 구간표에서 꺼냄 (text_for / describe_rules)
+- get_rules(): 파일 수정 시각이 바뀌면 앱 재시작 없이 다시 읽음. 새 파일이 잘못됐으면 이전 규칙을
+  그대로 쓰고 reload_error() 로 이유를 알려 줌
+- 모든 점수 결과에 RuleSet.version 을 같이 붙여서 어떤 규칙으로 계산했는지 남김
+"""
+import os
+import re
+import json
+import time
+import bisect
+import threading
+
+RISK_RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "risk_rules.json")
+RELOAD_CHECK_INTERVAL = 1.0   # 파일 수정 시각 확인 간격 (초) — 한 건씩 계산할 때 매번 stat 하지 않도록
+
+
+class RuleError(ValueError):
+    """규칙 파일 형식이 잘못됐을 때"""
+
+
+# ================================
+# 구간표
+# ================================
+class BandTable:
+    """
+    정렬된 경계값 + 구간별 점수/문구
+
+    compare 가 "<" 이면 x < upper 인 첫 구간, "<=" 이면 x <= upper 인 첫 구간
+    (마지막 구간은 upper 없이 '그 이상')
+    """
+
+    __slots__ = ("name", "compare", "breakpoints", "points", "bands", "_bins", "_points")
+
+    def __init__(self, name, compare, bands):
+        if compare not in ("<", "<="):
+            raise RuleError(f"{name}: compare 는 '<' 또는 '<=' 이어야 합니다. ({compare!r})")
+        if not bands or bands[-1].get("upper") is not None:
+            raise RuleError(f"{name}: 마지막 구간은 upper 가 null 이어야 합니다.")
+        breakpoints = [b.get("upper") for b in bands[:-1]]
+        if any(not isinstance(x, (int, float)) for x in breakpoints):
+            raise RuleError(f"{name}: 마지막을 뺀 구간은 숫자 upper 가 있어야 합니다.")
+        if any(a >= b for a, b in zip(breakpoints, breakpoints[1:])):
+            raise RuleError(f"{name}: upper 는 오름차순이어야 합니다. {breakpoints}")
+
+        self.name = name
+        self.compare = compare
+        self.breakpoints = breakpoints
+        self.points = [b.get("points", 0) for b in bands]
+        self.bands = bands
+        self._bins = None     # 배열 계산용 NumPy 배열은 처음 쓸 때 만듦 (한 건씩 계산만 하면 numpy 를 안 읽음)
+        self._points = None
+
+    def index(self, x):
+        """값 하나 → 구간 번호"""
+        if self.compare == "<=":
+            return bisect.bisect_left(self.breakpoints, x)
+        return bisect.bisect_right(self.breakpoints, x)
+
+    def _ensure_arrays(self):
+        if self._bins is None:
+            import numpy as np  # 필요할 때만 로드
+
+            self._points = np.array(self.points)
+            self._bins = np.array(self.breakpoints, dtype=float)   # 마지막에 채움 (다른 스레드는 이걸 보고 판단)
+
+    def indices(self, values):
+        """배열 → 구간 번호 배열 (index 와 같은 규칙)"""
+        import numpy as np
+
+        self._ensure_arrays()
+        return np.digitize(values, self._bins, right=self.compare == "<=")
+
+    def points_for(self, x):
+        return self.points[self.index(x)]
+
+    def points_array(self, values):
+        index = self.indices(values)
+        return self._points[index]
+
+    def band_for(self, x):
+        return self.bands[self.index(x)]
+
+    def bounds(self, i):
+        """i 번째 구간의 (아래 경계, 위 경계) — 없으면 None"""
+        lower = self.breakpoints[i - 1] if i > 0 else None
+        upper = self.breakpoints[i] if i < len(self.breakpoints) else None
+        return lower, upper
+
+    def text_for(self, x):
+        """값에 맞는 설명 문구 ({lower}, {upper} 자리에 실제 경계값을 넣음)"""
+        i = self.index(x)
+        lower, upper = self.bounds(i)
+        return self.bands[i].get("text", "").format(lower=lower, upper=upper)
+
+
+# ================================
+# 규칙 묶음
+# ================================
+class RuleSet:
+    """risk_rules.json 한 벌을 컴파일한 결과 (읽기 전용으로 사용)"""
+
+    __slots__ = (
+        "version",
+        "path",
+        "mtime",
+        "sale",
+        "deposit",
+        "market",
+        "contract_points",
+        "contract_other_points",
+        "rent_exempt",
+        "rent_steps",
+        "memo_keywords",
+        "memo_re",
+        "memo_index",
+        "review_min_count",
+        "review_flags",
+        "review_low_rating",
+        "labels",
+    )
+
+    def label_cutoffs(self):
+        """등급 경계 점수 목록 (예: [45, 70])"""
+        return list(self.labels.breakpoints)
+
+    @property
+    def key(self):
+        """다시 계산할지 판단하는 값 (version, mtime) — 버전을 안 올리고 파일만 고쳐도 바뀜"""
+        return (self.version, self.mtime)
+
+
+def _compile_memo_matcher(keywords, overlaps):
+    # 새 키워드를 추가했는데 겹침 규칙을 빠뜨렸으면 바로 알 수 있게 확인
+    found = {}
+    for long_key in keywords:
+        inner = [k for k in keywords if k != long_key and k in long_key]
+        if inner:
+            found[long_key] = inner
+    if found != {k: list(v) for k, v in overlaps.items()}:
+        raise RuleError(f"memo_keyword_overlaps 가 실제 키워드 겹침과 다릅니다: {found}")
+
+    # 긴 키워드를 앞에 두면 같은 위치에서는 긴 쪽이 잡히고, 그 안의 짧은 키워드는 건너뜀
+    keys = sorted(keywords, key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in keys))
+
+
+def compile_rules(config, path=None, mtime=None):
+    """설정 dict → RuleSet"""
+    try:
+        rules = RuleSet()
+        rules.version = str(config["version"])
+        rules.path = path
+        rules.mtime = mtime
+
+        rules.sale = BandTable("jeonse_rate_sale", **_band_args(config["jeonse_rate_sale"]))
+        rules.deposit = BandTable("deposit", **_band_args(config["deposit"]))
+        rules.market = BandTable("jeonse_rate_market", **_band_args(config["jeonse_rate_market"]))
+
+        contract = config["contract_type"]
+        rules.contract_points = dict(contract["points"])
+        rules.contract_other_points = contract["other_points"]
+
+        rent = config["rent"]
+        rules.rent_exempt = frozenset(rent.get("exempt_contract_types", ()))
+        rules.rent_steps = tuple(sorted((s["at_least"], s["points"]) for s in rent["steps"]))
+
+        rules.memo_keywords = {k: (v["points"], v["issue"]) for k, v in config["memo_keywords"].items()}
+        rules.memo_re = _compile_memo_matcher(rules.memo_keywords, config.get("memo_keyword_overlaps", {}))
+        rules.memo_index = {key: j for j, key in enumerate(rules.memo_keywords)}
+
+        # 같은 주소 후기 요약 (없으면 후기는 점수에 반영하지 않음)
+        reviews = config.get("reviews", {})
+        rules.review_min_count = reviews.get("min_count", 1)
+        rules.review_flags = tuple(
+            (name, v["share_at_least"], v["points"], v["issue"]) for name, v in reviews.get("flags", {}).items()
+        )
+        low = reviews.get("low_rating")
+        rules.review_low_rating = (low["below"], low["points"], low["issue"]) if low else None
+
+        rules.labels = BandTable("labels", "<", config["labels"])
+    except (KeyError, TypeError) as e:
+        raise RuleError(f"규칙 파일 형식 오류: {type(e).__name__}: {e}") from e
+    return rules
+
+
+def _band_args(section):
+    return {"compare": section.get("compare", "<"), "bands": section["bands"]}
+
+
+def load_rules(path=RISK_RULES_PATH):
+    """규칙 파일을 읽어서 바로 컴파일 (캐시 없음)"""
+    mtime = os.stat(path).st_mtime_ns
+    with open(path, encoding="utf-8") as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise RuleError(f"규칙 파일 JSON 오류: {e}") from e
+    return compile_rules(config, path=path, mtime=mtime)
+
+
+# ================================
+# 핫 리로드
+# ================================
+_rules = None
+_checked_at = 0.0
+_reload_error = None
+_lock = threading.Lock()
+
+
+def get_rules():
+    """
+    현재 규칙 (RISK_RULES_PATH)
+
+    RELOAD_CHECK_INTERVAL 마다 파일 수정 시각을 확인해서 바뀌었으면 다시 컴파일.
+    새 파일을 못 읽으면 이전 규칙을 계속 씀 (처음부터 못 읽으면 예외)
+    """
+    global _rules, _checked_at, _reload_error
+
+    rules = _rules
+    now = time.monotonic()
+    if rules is not None and now - _checked_at < RELOAD_CHECK_INTERVAL:
+        return rules
+
+    with _lock:
+        if _rules is not None and now - _checked_at < RELOAD_CHECK_INTERVAL:
+            return _rules
+        _checked_at = now
+        try:
+            mtime = os.stat(RISK_RULES_PATH).st_mtime_ns
+            if _rules is None or mtime != _rules.mtime:
+                _rules = load_rules(RISK_RULES_PATH)
+            _reload_error = None
+        except (OSError, RuleError) as e:
+            if _rules is None:
+                raise
+            _reload_error = f"{type(e).__name__}: {e}"
+        return _rules
+
+
+def reload_error():
+    """마지막 리로드가 실패했으면 이유 (이전 규칙을 쓰는 중), 아니면 None"""
+    return _reload_error
+
+
+# ================================
+# 화면용 설명
+# ================================
+def _num(x):
+    return f"{int(x):,}" if float(x).is_integer() else f"{x:,}"
+
+
+def _band_range_text(table, i, unit):
+    lower, upper = table.bounds(i)
+    low_op = "초과" if table.compare == "<=" else "이상"
+    high_op = "이하" if table.compare == "<=" else "미만"
+    if lower is None:
+        return f"{_num(upper)}{unit} {high_op}"
+    if upper is None:
+        return f"{_num(lower)}{unit} {low_op}"
+    return f"{_num(lower)}{unit} {low_op} ~ {_num(upper)}{unit} {high_op}"
+
+
+def describe_rules(rules):
+    """점수 기준 설명 (마크다운 줄 목록)"""
+    lines = [f"**점수 규칙 버전 {rules.version}**", "", "집값 대비 전세가율 (매매가를 알 때)"]
+    for i, p in enumerate(rules.sale.points):
+        lines.append(f"- {_band_range_text(rules.sale, i, '%')}: +{p}점")
+    lines += ["", "보증금 크기 (매매가를 모를 때)"]
+    for i, p in enumerate(rules.deposit.points):
+        lines.append(f"- {_band_range_text(rules.deposit, i, '원')}: +{p}점")
+    lines += ["", "전세 시세 대비 보증금 비율"]
+    for i, p in enumerate(rules.market.points):
+        lines.append(f"- {_band_range_text(rules.market, i, '%')}: +{p}점")
+    lines += ["", "계약 형태 / 월세"]
+    for name, p in rules.contract_points.items():
+        lines.append(f"- {name}: +{p}점")
+    lines.append(f"- 그 외(월세 등): +{rules.contract_other_points}점")
+    for at_least, p in rules.rent_steps:
+        lines.append(f"- 월세 {at_least:,}원 이상: +{p}점")
+    lines += ["", "메모 키워드"]
+    lines.append("- " + ", ".join(f"{k} +{w}" for k, (w, _) in rules.memo_keywords.items()))
+    if rules.review_flags or rules.review_low_rating:
+        lines += ["", f"같은 주소 후기 ({rules.review_min_count}개 이상일 때)"]
+        for _, share, p, issue in rules.review_flags:
+            lines.append(f"- {issue} (후기의 {share:.0%} 이상): +{p}점")
+        if rules.review_low_rating:
+            below, p, issue = rules.review_low_rating
+            lines.append(f"- {issue} ({below:g}점 미만): +{p}점")
+    lines += ["", "위험 등급"]
+    for i, band in enumerate(rules.labels.bands):
+        lines.append(f"- {_band_range_text(rules.labels, i, '점')}: {band['level']}")
+    return lines
@@ -0,0 +1,297 @@
+"""
+전·월세 위험도 점수 계산 (Streamlit 없이 import 가능)
+
+- compute_risk_score: 매물 하나 점수 (화면에서 사용)
+- compute_risk_scores / score_listings: 여러 매물을 NumPy 배열로 한 번에 계산
+  (결과는 compute_risk_score 와 항상 같아야 함 → tests/test_scoring.py 로 확인)
+- 구간 경계·점수·등급 경계는 risk_rules.json 에 있고, 두 경로 모두 kkangtong.rules 의 같은 구간표를 씀
+"""
+from kkangtong.profiling import timed
+from kkangtong.rules import get_rules
+
+
+# ================================
+# 메모 키워드 (규칙 파일에서 컴파일된 정규식 사용)
+# ================================
+def match_memo_keywords(memo, rules=None):
+    """메모에서 잡힌 키워드 집합 (메모를 한 번만 훑음)"""
+    rules = rules or get_rules()
+    return set(rules.memo_re.findall(memo or ""))
+
+
+def review_signal(review_stats, rules=None):
+    """
+    같은 주소 후기 요약(ReviewStats) → (추가 점수, 위험 요소 목록)
+
+    후기 목록을 다시 훑지 않고 요약의 개수·비율만 봄. 후기가 min_count 개보다 적으면 반영하지 않음
+    집 하나를 가리키는 주소(kkangtong.reviews.is_specific_address)의 요약만 넘겨야 함 — 구·동 단위 요약은 None 으로
+    """
+    rules = rules or get_rules()
+    if review_stats is None or review_stats.count < rules.review_min_count:
+        return 0, []
+    points = 0
+    issues = []
+    for name, share, flag_points, issue in rules.review_flags:
+        if review_stats.flag_share(name) >= share:
+            points += flag_points
+            issues.append(issue)
+    if rules.review_low_rating:
+        below, low_points, issue = rules.review_low_rating
+        if review_stats.average_rating < below:
+            points += low_points
+            issues.append(issue)
+    return points, issues
+
+# ================================
+# 위험도 계산 (매매가 + 전세 시세 둘 다 반영)
+# ================================
+def compute_risk_score(
+    deposit,
+    rent,
+    contract_type,
+    memo="",
+    jeonse_rate_sale=None,
+    jeonse_rate_market=None,
+    rules=None,
+    review_stats=None,
+):
+    """
+    위험도 계산 (0~100점)
+
+    - 메인 1: 집값 대비 전세가율 jeonse_rate_sale (보증금 회수 가능성)
+    - 메인 2: 전세 시세 대비 jeonse_rate_market (시장 전세보다 과하게 비싼지)
+    - 서브: 전세가율 모를 때 보증금 절대 크기
+    - 추가: 계약 형태, 월세, 메모 키워드 (곰팡이·누수·소음·귀신 등)
+    - 선택: review_stats (같은 주소 후기 요약, kkangtong.reviews.ReviewStats) 의 태그 비율·평균 별점
+
+    구간 경계와 점수는 risk_rules.json (kkangtong.rules) 에서 가져옴.
+    단위는 모두 "원". 반환: (점수, 위험 요소 목록, 규칙 버전)
+    """
+    rules = rules or get_rules()
+    if deposit <= 0:
+        return 0, [], rules.version
+
+    score = 0
+
+    # 1) 집값 대비 전세가율, 모르면 보증금 절대 크기
+    if jeonse_rate_sale is not None and jeonse_rate_sale > 0:
+        score += rules.sale.points_for(jeonse_rate_sale)
+    else:
+        score += rules.deposit.points_for(deposit)
+
+    # 2) 전세 시세 대비 (100% = 전세 시세와 동일)
+    if jeonse_rate_market is not None and jeonse_rate_market > 0:
+        score += rules.market.points_for(jeonse_rate_market)
+
+    # 3) 계약 형태 / 월세
+    score += rules.contract_points.get(contract_type, rules.contract_other_points)
+    if contract_type not in rules.rent_exempt:
+        for at_least, points in rules.rent_steps:
+            if rent >= at_least:
+                score += points
+
+    # 4) 메모 키워드 → 내부 거주 환경 리스크
+    matched = match_memo_keywords(memo, rules)
+    score += sum(rules.memo_keywords[key][0] for key in matched)
+    issues = [rules.memo_keywords[key][1] for key in matched]
+
+    # 5) 같은 주소 후기 요약
+    review_points, review_issues = review_signal(review_stats, rules)
+    score += review_points
+    issues += review_issues
+
+    score = max(0, min(100, score))
+    issues = sorted(set(issues))
+    return score, issues, rules.version
+
+
+def risk_label(score: int, rules=None):
+    """점수 → (등급, 안내 문구)"""
+    band = (rules or get_rules()).labels.band_for(score)
+    return band["level"], band["message"]
+
+
+def risk_levels(scores, rules=None):
+    """점수 배열 → 위험 등급 이름 배열 (risk_label 과 같은 경계)"""
+    import numpy as np  # 배열 계산에서만 로드 (compute_risk_score 한 건씩은 numpy 없이)
+
+    rules = rules or get_rules()
+    levels = np.array([band["level"] for band in rules.labels.bands], dtype=object)
+    return levels[rules.labels.indices(np.asarray(scores))]
+
+
+# ================================
+# 여러 매물 한 번에 계산 (NumPy 벡터화)
+# ================================
+# compute_risk_score 와 같은 구간표(BandTable)를 np.digitize 로 한 번에 적용
+def _as_float_array(values, n):
+    """None/NaN 섞인 값 → float 배열 (None 은 NaN)"""
+    import numpy as np
+
+    if values is None:
+        return np.full(n, np.nan)
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        arr = np.array([np.nan if v is None else v for v in arr], dtype=float)
+    return np.broadcast_to(arr.astype(float), (n,))
+
+
+def compute_risk_scores(
+    deposit,
+    rent,
+    contract_type,
+    memo=None,
+    jeonse_rate_sale=None,
+    jeonse_rate_market=None,
+    rules=None,
+    review_stats=None,
+):
+    """
+    compute_risk_score 의 배열 버전
+
+    인자는 같은 길이의 배열/리스트/Series (memo, 전세가율은 None 이면 전부 없음으로 처리,
+    전세가율 배열 안의 None·NaN 은 '모름', review_stats 는 행마다 ReviewStats 또는 None)
+    반환: (점수 int 배열, 메모 위험 요소 목록의 리스트, 규칙 버전)
+    """
+    import numpy as np
+
+    rules = rules or get_rules()
+    deposit = np.asarray(deposit, dtype=float)
+    n = deposit.shape[0]
+    rent = np.broadcast_to(np.asarray(rent, dtype=float), (n,))
+    contract_type = np.broadcast_to(np.asarray(contract_type, dtype=object), (n,))
+    sale = _as_float_array(jeonse_rate_sale, n)
+    market = _as_float_array(jeonse_rate_market, n)
+
+    # 1) 집값 대비 전세가율, 모르면 보증금 크기
+    sale_known = sale > 0  # NaN 은 False
+    score = np.where(
+        sale_known,
+        rules.sale.points_array(np.nan_to_num(sale)),
+        rules.deposit.points_array(deposit),
+    )
+
+    # 2) 전세 시세 대비
+    market_known = market > 0
+    score = score + np.where(
+        market_known,
+        rules.market.points_array(np.nan_to_num(market)),
+        0,
+    )
+
+    # 3) 계약 형태 / 월세
+    contract_points = np.full(n, rules.contract_other_points)
+    for name, points in rules.contract_points.items():
+        contract_points[contract_type == name] = points
+    score = score + contract_points
+    rent_exempt = np.zeros(n, dtype=bool)
+    for name in rules.rent_exempt:
+        rent_exempt |= contract_type == name
+    rent_for_calc = np.where(rent_exempt, 0, rent)
+    for at_least, points in rules.rent_steps:
+        score = score + np.where(rent_for_calc >= at_least, points, 0)
+
+    # 4) 메모 키워드
+    if memo is None:
+        issues = [[] for _ in range(n)]
+    else:
+        memo_score, issues = memo_keyword_scores(memo, rules)
+        score = score + memo_score
+
+    # 5) 같은 주소 후기 요약 (요약이 있는 행만, 행마다 개수 비교 몇 번)
+    if review_stats is not None:
+        review_score = np.zeros(n, dtype=int)
+        for i, stats in enumerate(review_stats):
+            points, review_issues = review_signal(stats, rules)
+            if review_issues:
+                review_score[i] = points
+                issues[i] = sorted(set(issues[i]) | set(review_issues))   # 메모 쪽 목록은 여러 행이 공유하므로 새 목록으로
+        score = score + review_score
+
+    # 보증금 0 이하는 점수 0, 요소 없음 (compute_risk_score 와 동일)
+    valid = deposit > 0
+    score = np.where(valid, np.clip(score, 0, 100), 0).astype(int)
+    for i in np.flatnonzero(~valid):
+        issues[i] = []
+    return score, issues, rules.version
+
+
+def memo_keyword_scores(memos, rules=None):
+    """
+    메모 여러 개를 한 번에 점수화 → (키워드 점수 합 배열, 위험 요소 목록의 리스트)
+
+    메모 전체를 구분 문자(\\x00)로 이어 붙여서 컴파일된 정규식으로 딱 한 번만 훑고,
+    잡힌 위치를 행 번호로 되돌림 (키워드 개수만큼 반복해서 훑지 않음)
+    """
+    import numpy as np
+
+    rules = rules or get_rules()
+    memos = [m if type(m) is str else ("" if m is None or m != m else str(m)) for m in memos]  # None·NaN → ""
+    n = len(memos)
+    keywords = rules.memo_keywords
+    keys = list(keywords)
+    weights = np.array([keywords[k][0] for k in keys])
+
+    lengths = np.fromiter(map(len, memos), dtype=np.int64, count=n)
+    row_starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+    found = [(m.start(), m.group()) for m in rules.memo_re.finditer("\x00".join(memos))]
+
+    hits = np.zeros((n, len(keys)), dtype=bool)
+    if found:
+        positions, matched = zip(*found)
+        rows = np.searchsorted(row_starts, positions, side="right") - 1
+        hits[rows, [rules.memo_index[k] for k in matched]] = True
+
+    # 같은 키워드 조합(행)은 위험 요소 목록을 한 번만 만들어서 같은 list 객체를 공유 (읽기 전용으로 사용)
+    # 행을 64비트 단위로 묶어서 비교 → 키워드가 64개를 넘으면 여러 칸 행 그대로 np.unique(axis=0)
+    # (64개 이하면 한 칸짜리라 1차원 np.unique 가 훨씬 빠름)
+    packed = np.packbits(hits, axis=1)
+    packed = np.pad(packed, ((0, 0), (0, -packed.shape[1] % 8)))
+    codes = np.ascontiguousarray(packed).view(np.uint64)
+    if codes.shape[1] == 1:
+        _, first, inverse = np.unique(codes[:, 0], return_index=True, return_inverse=True)
+    else:
+        _, first, inverse = np.unique(codes, axis=0, return_index=True, return_inverse=True)
+    table = [sorted({keywords[keys[j]][1] for j in np.flatnonzero(hits[i]).tolist()}) for i in first.tolist()]
+    issues = list(map(table.__getitem__, inverse.ravel().tolist()))
+    return hits @ weights, issues
+
+
+@timed("scoring.risk_score_grid")
+def risk_score_grid(deposits, rents, contract_types, rules=None):
+    """
+    보증금 × 월세 × 계약 형태 전체 조합 점수를 한 번에 계산 (메모·전세가율 없음)
+
+    반환: shape (계약 형태 수, 월세 수, 보증금 수) 의 int 배열
+    """
+    import numpy as np
+
+    deposits = np.asarray(deposits, dtype=float)
+    rents = np.asarray(rents, dtype=float)
+    types = np.asarray(contract_types, dtype=object)
+    t, r, d = np.meshgrid(np.arange(len(types)), rents, deposits, indexing="ij")
+    scores, _, _ = compute_risk_scores(d.ravel(), r.ravel(), types[t.ravel()], rules=rules)
+    return scores.reshape(t.shape)
+
+
+def score_listings(df, rules=None):
+    """
+    DataFrame 한 번에 점수 계산 → score, issues, rules_version 컬럼을 붙인 새 DataFrame
+
+    필요한 컬럼: deposit, rent, contract_type
+    선택 컬럼: memo, jeonse_rate_sale, jeonse_rate_market
+    """
+    scores, issues, version = compute_risk_scores(
+        df["deposit"].to_numpy(),
+        df["rent"].to_numpy(),
+        df["contract_type"].to_numpy(),
+        df["memo"].to_numpy() if "memo" in df else None,
+        df["jeonse_rate_sale"].to_numpy() if "jeonse_rate_sale" in df else None,
+        df["jeonse_rate_market"].to_numpy() if "jeonse_rate_market" in df else None,
+        rules=rules,
+    )
+    out = df.copy()
+    out["score"] = scores
+    out["issues"] = issues
+    out["rules_version"] = version
+    return out
@@ -0,0 +1,336 @@
+"""
+오프라인 주변 시설 거리 계산 (지하철역·편의점·공원·고속도로 IC, Streamlit 없이 import 가능)
+
+외부 지도 API 없이, 미리 받아 둔 시설 좌표 CSV 와 주소 좌표표로만 계산
+
+저장 구조 (POI_INDEX_DIR)
+- {category}.cell / .lat / .lon .npy : 시설 한 곳 = 한 행, 격자 칸 번호 순으로 정렬
+- {category}.names.json             : 같은 순서의 시설 이름
+- geocode.latlon.npy + geocode.json : 정규 주소 키(+ 동·구 중심) → 좌표 행 번호
+- manifest.json                     : 격자 크기, 카테고리별 개수
+조회할 때는 np.load(mmap_mode="r") 로 열어서 필요한 칸만 읽음
+
+격자 (geohash 와 같은 방식의 위경도 고정 격자)
+- 칸 번호 = 행(위도) * POI_GRID_NX + 열(경도) → 같은 행의 이웃 칸은 번호가 연속이라
+  (2r+1)×(2r+1) 정사각형도 행마다 searchsorted 한 번으로 범위를 잘라 냄
+- 정사각형 반지름 r 을 1, 2, 4, ... 로 넓히다가 k 번째 거리 ≤ r 칸 거리가 되면 멈춤
+  (정사각형 밖 시설은 r 칸 거리보다 멀어서 답이 바뀌지 않음)
+- 여러 주소는 같은 칸끼리 묶어서 (주소 수 × 후보 수) 거리 행렬을 한 번에 계산
+"""
+import os
+import json
+import math
+import threading
+
+import numpy as np
+
+from kkangtong.address import normalize_address
+from kkangtong.profiling import timed
+
+POI_INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "poi")
+POI_CATEGORIES = {
+    "station": "지하철역",
+    "store": "편의점",
+    "park": "공원",
+    "ic": "고속도로 IC",
+}
+
+# 한반도 남쪽을 덮는 격자 (약 550m 칸)
+POI_GRID_LAT0, POI_GRID_LON0 = 33.0, 124.0
+POI_GRID_LAT_STEP, POI_GRID_LON_STEP = 0.005, 0.00625
+POI_GRID_NX = int(round((132.0 - POI_GRID_LON0) / POI_GRID_LON_STEP))
+POI_GRID_NY = int(round((39.0 - POI_GRID_LAT0) / POI_GRID_LAT_STEP))
+M_PER_DEG_LAT = 110_540.0
+M_PER_DEG_LON = 111_320.0   # 적도 기준, 위도 cos 를 곱해서 씀
+# 칸 한 변의 최소 길이 (격자 북쪽 끝 기준) → 멈춤 조건에 사용
+POI_CELL_MIN_M = min(
+    POI_GRID_LAT_STEP * M_PER_DEG_LAT,
+    POI_GRID_LON_STEP * M_PER_DEG_LON * math.cos(math.radians(POI_GRID_LAT0 + POI_GRID_NY * POI_GRID_LAT_STEP)),
+)
+MAX_SEARCH_M = 30_000       # 이보다 멀면 '없음'
+WALK_M_PER_MIN = 67         # 도보 4km/h
+WALK_DETOUR = 1.3           # 직선거리 → 실제 걷는 거리 보정
+
+POI_COLUMN_ALIASES = {
+    "name": ("name", "이름", "명칭", "역명", "역사명", "사업장명", "상호명", "공원명", "시설명", "IC명", "영업소명"),
+    "lat": ("lat", "latitude", "위도", "y"),
+    "lon": ("lon", "lng", "longitude", "경도", "x"),
+}
+GEOCODE_COLUMN_ALIASES = {
+    "address": ("address", "주소", "도로명주소", "지번주소"),
+    "lat": POI_COLUMN_ALIASES["lat"],
+    "lon": POI_COLUMN_ALIASES["lon"],
+}
+
+
+class PoiIndexError(ValueError):
+    """좌표 파일을 읽을 수 없거나 인덱스가 없을 때"""
+
+
+def grid_cells(lat, lon):
+    """위경도(배열) → (행, 열) 격자 번호"""
+    iy = np.floor((np.asarray(lat, dtype=float) - POI_GRID_LAT0) / POI_GRID_LAT_STEP).astype(np.int64)
+    ix = np.floor((np.asarray(lon, dtype=float) - POI_GRID_LON0) / POI_GRID_LON_STEP).astype(np.int64)
+    return np.clip(iy, 0, POI_GRID_NY - 1), np.clip(ix, 0, POI_GRID_NX - 1)
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """가까운 거리용 평면 근사 거리 (m, 브로드캐스트 가능)"""
+    lat1 = np.asarray(lat1, dtype=float)
+    dy = (np.asarray(lat2, dtype=float) - lat1) * M_PER_DEG_LAT
+    dx = (np.asarray(lon2, dtype=float) - np.asarray(lon1, dtype=float)) * M_PER_DEG_LON * np.cos(np.radians(lat1))
+    return np.hypot(dx, dy)
+
+
+def walk_minutes(meters):
+    return int(math.ceil(meters * WALK_DETOUR / WALK_M_PER_MIN))
+
+
+# ================================
+# CSV 읽기
+# ================================
+def _read_table(path, aliases):
+    import pandas as pd  # 필요할 때만 로드
+
+    with open(path, "rb") as f:
+        head = f.read(64 * 1024)
+    try:
+        head.decode("utf-8")
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError as e:
+        encoding = "utf-8-sig" if e.start >= len(head) - 3 else "cp949"
+    raw = pd.read_csv(path, encoding=encoding, encoding_errors="replace", dtype=str)
+    cols = {}
+    for std, names in aliases.items():
+        for name in names:
+            if name in raw.columns:
+                cols[std] = raw[name]
+                break
+    missing = set(aliases) - set(cols)
+    if missing:
+        raise PoiIndexError(f"{os.path.basename(path)}: 필요한 컬럼이 없습니다: {sorted(missing)}")
+    df = pd.DataFrame(cols)
+    df["lat"] = pd.to_numeric(df["lat"], errors="coerce")
+    df["lon"] = pd.to_numeric(df["lon"], errors="coerce")
+    # 위경도 범위 밖(좌표계가 다른 파일 등)은 버림
+    ok = df["lat"].between(POI_GRID_LAT0, POI_GRID_LAT0 + POI_GRID_NY * POI_GRID_LAT_STEP) & df["lon"].between(
+        POI_GRID_LON0, POI_GRID_LON0 + POI_GRID_NX * POI_GRID_LON_STEP
+    )
+    return df[ok].reset_index(drop=True)
+
+
+# ================================
+# 인덱스 만들기
+# ================================
+def _save_npy(path, arr):
+    tmp = path + ".tmp.npy"
+    np.save(tmp, arr)
+    os.replace(tmp, path)
+
+
+def _save_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def build_poi_index(poi_paths, geocode_paths=(), index_dir=POI_INDEX_DIR, log=None):
+    """
+    시설 좌표 CSV(카테고리별)와 주소 좌표 CSV 로 인덱스 만들기 (넘긴 카테고리만 새로 씀)
+
+    poi_paths: {"station": [경로, ...], ...}
+    """
+    import pandas as pd
+
+    os.makedirs(index_dir, exist_ok=True)
+    manifest_path = os.path.join(index_dir, "manifest.json")
+    manifest = {"categories": {}, "geocode": 0}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    for category, paths in poi_paths.items():
+        if category not in POI_CATEGORIES:
+            raise PoiIndexError(f"알 수 없는 카테고리입니다: {category}")
+        if not paths:
+            continue
+        df = pd.concat([_read_table(p, POI_COLUMN_ALIASES) for p in paths], ignore_index=True)
+        iy, ix = grid_cells(df["lat"], df["lon"])
+        cell = iy * POI_GRID_NX + ix
+        order = np.argsort(cell, kind="stable")
+        _save_npy(os.path.join(index_dir, f"{category}.cell.npy"), cell[order])
+        _save_npy(os.path.join(index_dir, f"{category}.lat.npy"), df["lat"].to_numpy(float)[order])
+        _save_npy(os.path.join(index_dir, f"{category}.lon.npy"), df["lon"].to_numpy(float)[order])
+        _save_json(os.path.join(index_dir, f"{category}.names.json"), df["name"].fillna("").astype(str).to_numpy()[order].tolist())
+        manifest["categories"][category] = int(len(df))
+        if log:
+            log(f"{POI_CATEGORIES[category]}: {len(df):,}곳")
+
+    if geocode_paths:
+        df = pd.concat([_read_table(p, GEOCODE_COLUMN_ALIASES) for p in geocode_paths], ignore_index=True)
+        keys = {}
+        coords = []
+        region_sums = {}
+        for address, lat, lon in zip(df["address"], df["lat"], df["lon"]):
+            norm = normalize_address(address)
+            if norm.key and norm.key != norm.region and norm.key not in keys:
+                keys[norm.key] = [len(coords), "주소"]
+                coords.append((lat, lon))
+            # 동·구 중심 좌표 (주소 좌표 평균) → 번지까지 못 찾을 때 대신 씀
+            for region in norm.region_keys()[:2]:
+                acc = region_sums.setdefault(region, [0.0, 0.0, 0])
+                acc[0] += lat
+                acc[1] += lon
+                acc[2] += 1
+        for region, (lat_sum, lon_sum, n) in region_sums.items():
+            if region not in keys:
+                keys[region] = [len(coords), "동네 중심"]
+                coords.append((lat_sum / n, lon_sum / n))
+        _save_npy(os.path.join(index_dir, "geocode.latlon.npy"), np.array(coords, dtype=float).reshape(-1, 2))
+        _save_json(os.path.join(index_dir, "geocode.json"), keys)
+        manifest["geocode"] = len(keys)
+        if log:
+            log(f"주소 좌표: {len(keys):,}개 (동·구 중심 포함)")
+
+    manifest["grid"] = [POI_GRID_LAT0, POI_GRID_LON0, POI_GRID_LAT_STEP, POI_GRID_LON_STEP]
+    _save_json(manifest_path, manifest)  # 마지막에 써야 읽는 쪽이 새 버전으로 봄
+
+
+# ================================
+# 조회
+# ================================
+class PoiIndex:
+    """저장된 시설·주소 좌표 인덱스를 mmap 으로 열어서 가까운 시설 찾기"""
+
+    def __init__(self, index_dir=POI_INDEX_DIR):
+        self.dir = index_dir
+        path = os.path.join(index_dir, "manifest.json")
+        if not os.path.exists(path):
+            raise PoiIndexError(f"주변 시설 인덱스가 없습니다: {index_dir} (python poi_index.py build ... 로 먼저 만들어 주세요)")
+        with open(path, encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("grid") != [POI_GRID_LAT0, POI_GRID_LON0, POI_GRID_LAT_STEP, POI_GRID_LON_STEP]:
+            raise PoiIndexError("격자 설정이 바뀌었습니다. 인덱스를 다시 만들어 주세요.")
+        self._cats = {}
+        self._lock = threading.Lock()
+
+        self.geocode_keys = {}
+        self.geocode_latlon = None
+        geo_path = os.path.join(index_dir, "geocode.json")
+        if os.path.exists(geo_path):
+            with open(geo_path, encoding="utf-8") as f:
+                self.geocode_keys = json.load(f)
+            self.geocode_latlon = np.load(os.path.join(index_dir, "geocode.latlon.npy"), mmap_mode="r")
+
+    @property
+    def categories(self):
+        return [c for c in POI_CATEGORIES if c in self.manifest["categories"]]
+
+    def _category(self, category):
+        with self._lock:
+            data = self._cats.get(category)
+            if data is None:
+                base = os.path.join(self.dir, category)
+                with open(base + ".names.json", encoding="utf-8") as f:
+                    names = json.load(f)
+                data = {
+                    "cell": np.load(base + ".cell.npy", mmap_mode="r"),
+                    "lat": np.load(base + ".lat.npy", mmap_mode="r"),
+                    "lon": np.load(base + ".lon.npy", mmap_mode="r"),
+                    "names": names,
+                }
+                self._cats[category] = data
+        return data
+
+    def geocode(self, address):
+        """주소 → (위도, 경도, 정확도 "주소"/"동네 중심") 또는 None"""
+        if self.geocode_latlon is None:
+            return None
+        norm = normalize_address(address)
+        for key in (norm.key, *norm.region_keys()[:2]):
+            hit = self.geocode_keys.get(key)
+            if hit is not None:
+                lat, lon = self.geocode_latlon[hit[0]]
+                return float(lat), float(lon), hit[1]
+        return None
+
+    def _square(self, data, iy, ix, r):
+        """(iy, ix) 중심 반지름 r 칸 정사각형 안 시설 행 번호"""
+        rows = np.arange(max(iy - r, 0), min(iy + r, POI_GRID_NY - 1) + 1)
+        lo_ids = rows * POI_GRID_NX + max(ix - r, 0)
+        hi_ids = rows * POI_GRID_NX + min(ix + r, POI_GRID_NX - 1)
+        lo = np.searchsorted(data["cell"], lo_ids, side="left")
+        hi = np.searchsorted(data["cell"], hi_ids, side="right")
+        if not len(lo):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(a, b) for a, b in zip(lo.tolist(), hi.tolist())])
+
+    def nearest_batch(self, lats, lons, category, k=3, max_m=MAX_SEARCH_M):
+        """
+        여러 지점의 가장 가까운 시설 k 곳 → (거리 배열 (n, k), 행 번호 배열 (n, k))
+
+        못 찾은 자리는 거리 inf, 행 번호 -1
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        n = lats.shape[0]
+        dist = np.full((n, k), np.inf)
+        idx = np.full((n, k), -1, dtype=np.int64)
+        data = self._category(category)
+        if not len(data["cell"]) or not n:
+            return dist, idx
+
+        iy, ix = grid_cells(lats, lons)
+        cells = iy * POI_GRID_NX + ix
+        max_r = int(math.ceil(max_m / POI_CELL_MIN_M))
+        # 같은 칸에 있는 지점끼리 후보를 같이 씀
+        order = np.argsort(cells, kind="stable")
+        bounds = np.flatnonzero(np.diff(cells[order])) + 1
+        for group in np.split(order, bounds):
+            gy, gx = int(iy[group[0]]), int(ix[group[0]])
+            r = 1
+            while True:
+                cand = self._square(data, gy, gx, r)
+                if len(cand):
+                    d = distance_m(lats[group, None], lons[group, None], data["lat"][cand][None, :], data["lon"][cand][None, :])
+                    kk = min(k, len(cand))
+                    part = np.argpartition(d, kk - 1, axis=1)[:, :kk]
+                    part_d = np.take_along_axis(d, part, axis=1)
+                    sort = np.argsort(part_d, axis=1)
+                    best_d = np.take_along_axis(part_d, sort, axis=1)
+                    # k 번째까지 찾았고 그 거리가 정사각형 안쪽이면 밖의 시설은 볼 필요 없음
+                    if kk == k and (best_d[:, -1] <= r * POI_CELL_MIN_M).all() or r >= max_r:
+                        dist[group, :kk] = best_d
+                        idx[group, :kk] = cand[np.take_along_axis(part, sort, axis=1)]
+                        break
+                elif r >= max_r:
+                    break
+                r = min(r * 2, max_r)
+        too_far = dist > max_m
+        dist[too_far] = np.inf
+        idx[too_far] = -1
+        return dist, idx
+
+    def nearest(self, lat, lon, category, k=3, max_m=MAX_SEARCH_M):
+        """지점 하나 → [(시설 이름, 직선거리 m), ...] (가까운 순)"""
+        dist, idx = self.nearest_batch([lat], [lon], category, k, max_m)
+        names = self._category(category)["names"]
+        return [(names[i], float(d)) for d, i in zip(dist[0], idx[0]) if i >= 0]
+
+    @timed("spatial.summary")
+    def summary(self, address, k=3):
+        """주소 → {"location": (위도, 경도, 정확도), "station": [(이름, m), ...], ...} (좌표를 모르면 None)"""
+        loc = self.geocode(address)
+        if loc is None:
+            return None
+        lat, lon, _ = loc
+        return {"location": loc, **{c: self.nearest(lat, lon, c, k) for c in self.categories}}
+
+
+def poi_index_stamp(index_dir=POI_INDEX_DIR):
+    """인덱스가 바뀌었는지 확인용 (manifest 수정 시각, 없으면 None)"""
+    try:
+        return os.stat(os.path.join(index_dir, "manifest.json")).st_mtime_ns
+    except OSError:
+        return None
@@ -0,0 +1,111 @@
+"""
+업로드 파일 처리 (크기 제한 + 큰 파일은 임시 파일로 내림)
+
+Streamlit 업로드 파일은 이미 메모리에 한 벌 있어서, 여기서는 그 이상 복사본을
+만들지 않는 게 목표입니다.
+- 해시는 청크 단위로 읽으면서 계산 (getvalue() 로 통째 복사하지 않음)
+- 작은 파일은 업로드 객체를 그대로 넘김
+- SPOOL_THRESHOLD 를 넘는 파일은 청크 단위로 임시 파일에 쓰고 경로만 넘김 → 추출 워커가
+  그 경로를 직접 열어서(pdf_pages 에서 mmap) 바이트를 프로세스마다 복사해 보내지 않음
+- with 블록이 끝나면 임시 파일을 바로 지움
+"""
+import os
+import hashlib
+import tempfile
+import contextlib
+
+MAX_UPLOAD_BYTES = 30 * 1024 * 1024     # 등기부 파일 최대 크기 (30MB)
+SPOOL_THRESHOLD = 4 * 1024 * 1024       # 이보다 크면 임시 파일로 내림
+CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """업로드 파일이 MAX_UPLOAD_BYTES 를 넘을 때"""
+
+
+def _check_size(size, max_bytes):
+    if size > max_bytes:
+        raise UploadTooLarge(
+            f"파일이 너무 큽니다. ({size / 1024 / 1024:.1f}MB, 최대 {max_bytes / 1024 / 1024:.0f}MB)"
+        )
+
+
+def _iter_chunks(f):
+    f.seek(0)
+    while True:
+        chunk = f.read(CHUNK_BYTES)
+        if not chunk:
+            break
+        yield chunk
+    f.seek(0)
+
+
+def file_sha256(f, max_bytes=MAX_UPLOAD_BYTES):
+    """파일 객체 내용을 청크 단위로 읽어서 SHA-256 계산 (크기 제한도 같이 확인)"""
+    h = hashlib.sha256()
+    size = 0
+    for chunk in _iter_chunks(f):
+        size += len(chunk)
+        _check_size(size, max_bytes)
+        h.update(chunk)
+    return h.hexdigest()
+
+
+class SpooledUpload:
+    """
+    spool_upload() 결과
+
+    - source: PDF 추출에 넘길 대상 (작은 파일은 업로드 객체 자체, 큰 파일은 임시 파일 경로)
+    - size: 바이트 수
+    """
+
+    __slots__ = ("source", "size", "_path")
+
+    def __init__(self, source, size, path=None):
+        self.source = source
+        self.size = size
+        self._path = path
+
+    def close(self):
+        if self._path is not None:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+            self._path = None
+        self.source = None
+
+
+@contextlib.contextmanager
+def spool_upload(uploaded_file, max_bytes=MAX_UPLOAD_BYTES, threshold=SPOOL_THRESHOLD):
+    """
+    업로드 파일을 크기에 따라 메모리 그대로 / 임시 파일로 준비
+
+    with spool_upload(f) as up:
+        iter_pdf_page_texts(up.source)
+    """
+    size = getattr(uploaded_file, "size", None)
+    if size is None:
+        uploaded_file.seek(0, os.SEEK_END)
+        size = uploaded_file.tell()
+        uploaded_file.seek(0)
+    _check_size(size, max_bytes)
+
+    if size <= threshold:
+        uploaded_file.seek(0)
+        upload = SpooledUpload(uploaded_file, size)
+    else:
+        fd, path = tempfile.mkstemp(prefix="kkangtong-upload-", suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in _iter_chunks(uploaded_file):
+                    tmp.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        upload = SpooledUpload(path, size, path)
+
+    try:
+        yield upload
+    finally:
+        upload.close()
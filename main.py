@@ -1,7 +1,12 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
+
+from kkangtong.profiling import rerun_finished, rerun_started, span, timed
+from mbti_charts import COUNTRY_COL, country_mbti_table, ranked_bar_figure
+from profile_panel import render_profile_panel
+
+# 이번 rerun 에서 재는 구간을 한 묶음으로 (측정이 꺼져 있으면 아무것도 안 함)
+rerun_started("main.py")
 
 # -----------------------
 # 기본 설정
@@ -18,6 +23,7 @@ st.caption("국가를 선택하면 해당 국가의 MBTI 비율을 인터랙티
 # -----------------------
 # 데이터 불러오기
 # -----------------------
+@timed("mbti.load_data")
 @st.cache_data
 def load_data():
     # 같은 폴더에 있는 CSV 파일
@@ -26,83 +32,31 @@ def load_data():
 
 df = load_data()
 
-# 컬럼 분리
-country_col = "Country"
-mbti_cols = [c for c in df.columns if c != country_col]
-
 # -----------------------
 # 사이드바: 국가 선택
 # -----------------------
 st.sidebar.header("⚙️ 설정")
 selected_country = st.sidebar.selectbox(
     "국가를 선택해 주세요:",
-    sorted(df[country_col].unique())
+    sorted(df[COUNTRY_COL].unique())
 )
 
 st.sidebar.markdown("선택한 국가의 MBTI 분포를 아래 그래프로 확인해 보세요 👀")
 
 # -----------------------
-# 선택한 국가의 MBTI 분포 준비
+# 선택한 국가의 MBTI 분포 준비 + Plotly 그래프 생성 (mbti_charts.py)
 # -----------------------
-country_row = df[df[country_col] == selected_country].iloc[0]
-
-mbti_values = country_row[mbti_cols]
-mbti_df = (
-    mbti_values
-    .reset_index()
-    .rename(columns={"index": "MBTI", 0: "Value"})
-)
+with span("mbti.prepare"):
+    mbti_df = country_mbti_table(df, selected_country)
 
-# 내림차순 정렬 (1등 찾기)
-mbti_df = mbti_df.sort_values("Value", ascending=False).reset_index(drop=True)
-
-# -----------------------
-# 색상 설정: 1등은 빨간색, 나머지는 그라데이션
-# -----------------------
-n = len(mbti_df)
-
-# 파란 계열 그라데이션 색상 생성
-gradient_colors = px.colors.sample_colorscale(
-    "Blues",
-    [i / (n - 1) for i in range(n)]
-)
-
-colors = gradient_colors.copy()
-# 1등 막대는 붉은색으로 강조
-colors[0] = "#FF4B4B"
-
-# -----------------------
-# Plotly 그래프 생성
-# -----------------------
-fig = go.Figure(
-    data=go.Bar(
-        x=mbti_df["MBTI"],
-        y=mbti_df["Value"],
-        marker_color=colors,
-        text=mbti_df["Value"].round(2),
-        textposition="outside",
-        hovertemplate="<b>%{x}</b><br>값: %{y}<extra></extra>",
-    )
-)
-
-fig.update_layout(
-    title={
-        "text": f"🇺🇳 {selected_country} 의 MBTI 분포",
-        "x": 0.5,
-        "xanchor": "center",
-        "yanchor": "top",
-    },
-    xaxis_title="MBTI 유형",
-    yaxis_title="값 (비율 또는 점수)",
-    yaxis=dict(tickformat=".2f"),
-    template="simple_white",
-    margin=dict(l=40, r=40, t=80, b=40),
-)
+with span("mbti.figure"):
+    fig = ranked_bar_figure(mbti_df, selected_country)
 
 # -----------------------
 # 화면에 출력
 # -----------------------
-st.plotly_chart(fig, use_container_width=True)
+with span("mbti.plotly_chart"):
+    st.plotly_chart(fig, use_container_width=True)
 
 # -----------------------
 # 부가 정보 텍스트
@@ -123,3 +77,8 @@ st.markdown(
 )
 
 st.info("필요하면 나중에 I/E, N/S, F/T, J/P 축별로 합쳐서 비교하는 그래프도 추가해 볼 수 있어요 😊")
+
+rerun_finished()
+
+# 실행 시간 디버그 패널 (주소 뒤에 ?debug=1 을 붙였을 때만 사이드바에 보임)
+render_profile_panel()
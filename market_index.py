@@ -0,0 +1,86 @@
+"""
+로컬 실거래가 인덱스 만들기 / 갱신 / 조회 (Streamlit 없이 터미널에서 실행)
+
+사용 예)
+    python market_index.py add ./molit/2025*_아파트*.csv      # 새 달 파일만 골라서 추가 (이미 넣은 파일은 건너뜀)
+    python market_index.py rebuild ./molit/*.csv              # 인덱스를 지우고 처음부터 다시
+    python market_index.py query "서울 은평구 진관동 123" --area 25 --tolerance 3 --months 12
+    python market_index.py info
+
+- 입력: 국토부 실거래가 공개시스템 CSV (아파트 매매 / 전월세) 또는 같은 컬럼의 Parquet
+- 인덱스 위치: .cache/market (--dir 로 변경)
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+
+from kkangtong.market import (
+    DEFAULT_AREA_TOLERANCE,
+    DEFAULT_MONTHS,
+    MARKET_INDEX_DIR,
+    MarketIndex,
+    update_market_index,
+)
+
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        matched = sorted(glob.glob(pattern))
+        if os.path.isdir(pattern):
+            matched = sorted(
+                os.path.join(pattern, name)
+                for name in os.listdir(pattern)
+                if name.lower().endswith((".csv", ".parquet"))
+            )
+        paths.extend(matched or [pattern])
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 실거래가 인덱스")
+    parser.add_argument("--dir", default=MARKET_INDEX_DIR, help="인덱스 폴더")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_add = sub.add_parser("add", help="파일 추가 (증분)")
+    p_add.add_argument("files", nargs="+")
+    p_rebuild = sub.add_parser("rebuild", help="인덱스를 지우고 다시 만들기")
+    p_rebuild.add_argument("files", nargs="+")
+    p_query = sub.add_parser("query", help="주소 하나 조회")
+    p_query.add_argument("address")
+    p_query.add_argument("--complex", default="", help="단지명 (지번 주소가 없을 때)")
+    p_query.add_argument("--area", type=float, default=None, help="전용 면적 (평)")
+    p_query.add_argument("--tolerance", type=float, default=DEFAULT_AREA_TOLERANCE, help="면적 허용 범위 (±평)")
+    p_query.add_argument("--months", type=int, default=DEFAULT_MONTHS, help="최근 몇 개월")
+    sub.add_parser("info", help="인덱스 정보")
+    args = parser.parse_args(argv)
+
+    if args.command in ("add", "rebuild"):
+        if args.command == "rebuild" and os.path.isdir(args.dir):
+            shutil.rmtree(args.dir)
+        started = time.perf_counter()
+        added = update_market_index(expand_paths(args.files), args.dir, log=lambda msg: print(msg, file=sys.stderr))
+        print(f"추가한 파일: {added}개 · {time.perf_counter() - started:.1f}초", file=sys.stderr)
+        args.command = "info"
+
+    index = MarketIndex(args.dir)
+    if args.command == "info":
+        info = dict(index.manifest)
+        info["files"] = len(info["files"])
+        info.pop("paths", None)
+        info["groups"] = len(index.groups)
+        print(json.dumps(info, ensure_ascii=False, indent=2))
+    elif args.command == "query":
+        started = time.perf_counter()
+        result = index.lookup(args.address, args.complex, args.area, args.tolerance, args.months)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        print(f"조회 {elapsed:.2f}ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+국가별 MBTI 그래프 만들기 (main.py · 01_MBTI국가.py 가 같이 씀, Streamlit 없이 import 가능)
+
+- 화면 스크립트는 국가 선택·출력만 하고, 표 준비와 Plotly Figure 는 여기서 만듦
+  → benchmarks/bench_suite.py 에서 화면 없이 그래프 만드는 시간을 잴 수 있음
+- plotly 는 그래프를 만들 때 처음 로드 (import 만 하는 쪽은 기다리지 않음)
+"""
+COUNTRY_COL = "Country"
+
+
+def mbti_columns(df):
+    return [c for c in df.columns if c != COUNTRY_COL]
+
+
+def country_mbti_table(df, country):
+    """국가 하나 → MBTI·Value 두 컬럼 표 (값이 큰 순)"""
+    row = df[df[COUNTRY_COL] == country].iloc[0]
+    mbti_df = row[mbti_columns(df)].rename_axis("MBTI").reset_index(name="Value")
+    mbti_df["Value"] = mbti_df["Value"].astype(float)
+    return mbti_df.sort_values("Value", ascending=False).reset_index(drop=True)
+
+
+def ranked_bar_figure(mbti_df, country):
+    """main.py 그래프: 값이 큰 순 막대, 1등은 빨간색 나머지는 파란 계열 그라데이션"""
+    import plotly.express as px  # 필요할 때만 로드
+    import plotly.graph_objects as go
+
+    n = len(mbti_df)
+
+    # 파란 계열 그라데이션 색상 생성
+    colors = px.colors.sample_colorscale("Blues", [i / (n - 1) for i in range(n)])
+    # 1등 막대는 붉은색으로 강조
+    colors[0] = "#FF4B4B"
+
+    fig = go.Figure(
+        data=go.Bar(
+            x=mbti_df["MBTI"],
+            y=mbti_df["Value"],
+            marker_color=colors,
+            text=mbti_df["Value"].round(2),
+            textposition="outside",
+            hovertemplate="<b>%{x}</b><br>값: %{y}<extra></extra>",
+        )
+    )
+
+    fig.update_layout(
+        title={
+            "text": f"🇺🇳 {country} 의 MBTI 분포",
+            "x": 0.5,
+            "xanchor": "center",
+            "yanchor": "top",
+        },
+        xaxis_title="MBTI 유형",
+        yaxis_title="값 (비율 또는 점수)",
+        yaxis=dict(tickformat=".2f"),
+        template="simple_white",
+        margin=dict(l=40, r=40, t=80, b=40),
+    )
+    return fig
+
+
+def highlight_bar_figure(df, country):
+    """01_MBTI국가.py 그래프: 유형 순서 그대로, 최대값은 빨강 나머지는 값에 따라 회색 농도"""
+    import numpy as np
+    import plotly.graph_objects as go
+
+    row = df[df[COUNTRY_COL] == country].iloc[0]
+    mbti_cols = mbti_columns(df)
+    values = row[mbti_cols].to_numpy(dtype=float)
+    max_idx = np.argmax(values)
+
+    # 색 구성: 최대값 = 빨강, 나머지는 회색 그라데이션 (밝은색→진한색)
+    colors = []
+    for i, v in enumerate(values):
+        if i == max_idx:
+            colors.append("red")
+        else:
+            intensity = 0.8 - (v / values.max()) * 0.6
+            colors.append(f"rgba(100,100,100,{round(intensity, 2)})")
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=mbti_cols, y=values, marker_color=colors))
+    fig.update_layout(
+        title=f"{country} MBTI Distribution",
+        xaxis_title="MBTI Type",
+        yaxis_title="Proportion",
+        template="plotly_white",
+        width=900,
+        height=600,
+    )
+    return fig
@@ -0,0 +1,68 @@
+"""
+오프라인 주변 시설 인덱스 만들기 / 조회 (Streamlit 없이 터미널에서 실행, 외부 지도 API 호출 없음)
+
+사용 예)
+    python poi_index.py build --station ./poi/역사정보.csv --store ./poi/편의점*.csv \\
+        --park ./poi/도시공원.csv --ic ./poi/고속도로IC.csv --geocode ./poi/주소좌표.csv
+    python poi_index.py query "서울 은평구 진관동 123" -k 3
+    python poi_index.py info
+
+- 시설 CSV: 이름(역명·사업장명·공원명 등) + 위도 + 경도 컬럼 (공공데이터포털 파일 등)
+- 주소 좌표 CSV: 주소 + 위도 + 경도 컬럼 → 정규 주소 키로 저장, 동·구 중심 좌표도 같이 만듦
+- 넘긴 카테고리만 새로 쓰고 나머지는 그대로 둠
+- 인덱스 위치: .cache/poi (--dir 로 변경)
+"""
+import argparse
+import json
+import sys
+import time
+
+from kkangtong.spatial import POI_CATEGORIES, POI_INDEX_DIR, PoiIndex, build_poi_index, walk_minutes
+from market_index import expand_paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="오프라인 주변 시설 인덱스")
+    parser.add_argument("--dir", default=POI_INDEX_DIR, help="인덱스 폴더")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="시설·주소 좌표 파일로 인덱스 만들기")
+    for category, label in POI_CATEGORIES.items():
+        p_build.add_argument(f"--{category}", nargs="+", default=[], help=f"{label} 좌표 CSV")
+    p_build.add_argument("--geocode", nargs="+", default=[], help="주소 좌표 CSV")
+    p_query = sub.add_parser("query", help="주소 하나 조회")
+    p_query.add_argument("address")
+    p_query.add_argument("-k", type=int, default=3, help="카테고리별 몇 곳")
+    sub.add_parser("info", help="인덱스 정보")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        poi_paths = {c: expand_paths(getattr(args, c)) for c in POI_CATEGORIES if getattr(args, c)}
+        if not poi_paths and not args.geocode:
+            parser.error("넣을 파일이 없습니다")
+        started = time.perf_counter()
+        build_poi_index(poi_paths, expand_paths(args.geocode), args.dir, log=lambda msg: print(msg, file=sys.stderr))
+        print(f"{time.perf_counter() - started:.1f}초", file=sys.stderr)
+        args.command = "info"
+
+    index = PoiIndex(args.dir)
+    if args.command == "info":
+        print(json.dumps(index.manifest, ensure_ascii=False, indent=2))
+    elif args.command == "query":
+        started = time.perf_counter()
+        result = index.summary(args.address, args.k)
+        elapsed = (time.perf_counter() - started) * 1000
+        if result is None:
+            print("주소 좌표를 찾지 못했습니다.")
+        else:
+            lat, lon, precision = result.pop("location")
+            print(f"좌표: {lat:.5f}, {lon:.5f} ({precision})")
+            for category, hits in result.items():
+                print(f"[{POI_CATEGORIES[category]}]")
+                for name, meters in hits:
+                    print(f"  {name}: {meters:,.0f}m (도보 약 {walk_minutes(meters)}분)")
+        print(f"조회 {elapsed:.2f}ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+구간별 실행 시간 디버그 패널 (check.py · main.py 가 같이 씀)
+
+- 주소 뒤에 ?debug=1 을 붙였을 때만 사이드바에 보임
+- 측정 켜기/끄기, JSONL 저장 켜기, 구간 이름별 p50/p90/p99, 방금 rerun 의 구간 트리
+- 측정 상태는 프로세스 하나에 하나라서 모든 세션이 같이 씀 (kkangtong/profiling.py)
+  → 토글은 그 상태를 보여 주기만 하고, 이 세션에서 토글을 바꿨을 때만 set_profiling 호출
+"""
+import streamlit as st
+
+from kkangtong.profiling import (
+    PROFILE_DUMP_PATH,
+    clear_spans,
+    dump_spans,
+    last_rerun_spans,
+    profiling_dump_path,
+    profiling_enabled,
+    set_profiling,
+    span_stats,
+)
+
+
+def _apply_profiling():
+    # 토글 on_change → 사용자가 바꾼 rerun 에서만 (다른 세션이 켠 측정을 rerun 마다 덮어쓰지 않음)
+    s = st.session_state
+    dump_path = profiling_dump_path() or PROFILE_DUMP_PATH
+    set_profiling(s["profile_enabled"], dump_path if s["profile_enabled"] and s["profile_dump"] else None)
+
+
+def render_profile_panel():
+    if st.query_params.get("debug") != "1":
+        return
+    # 다른 세션이 바꿨을 수도 있으니 토글은 매번 지금 프로세스 상태로 맞춤
+    st.session_state["profile_enabled"] = enabled = profiling_enabled()
+    st.session_state["profile_dump"] = profiling_dump_path() is not None
+    with st.sidebar.expander("⏱️ 구간별 실행 시간", expanded=True):
+        st.toggle("측정하기", key="profile_enabled", on_change=_apply_profiling)
+        st.toggle(
+            "JSONL 로도 저장",
+            key="profile_dump",
+            on_change=_apply_profiling,
+            disabled=not enabled,
+            help=profiling_dump_path() or PROFILE_DUMP_PATH,
+        )
+        if not enabled:
+            st.caption("켜면 다음 rerun 부터 구간별 시간이 쌓여요.")
+            return
+
+        stats = span_stats()
+        if not stats:
+            st.caption("아직 잰 구간이 없어요. 화면을 한 번 조작해 보세요.")
+            return
+        st.dataframe(
+            [
+                {"구간": row["name"], "횟수": row["count"], **{k: round(row[k], 1) for k in ("p50", "p90", "p99", "max")}}
+                for row in stats
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.caption("방금 rerun (ms)")
+        st.dataframe(
+            [{"구간": "  " * row["depth"] + row["name"], "ms": round(row["ms"], 1)} for row in last_rerun_spans()],
+            hide_index=True,
+            use_container_width=True,
+        )
+        c1, c2 = st.columns(2)
+        if c1.button("비우기", key="profile_clear"):
+            clear_spans()
+        if c2.button("파일로 저장", key="profile_save"):
+            st.caption(f"{dump_spans():,}줄 → {PROFILE_DUMP_PATH}")
@@ -0,0 +1,439 @@
+"""
+위험도 점수·등기부 분석 로컬 HTTP API (Streamlit 없이, Starlette + uvicorn)
+
+사용 예)
+    python score_api.py --port 8000 --workers 4
+    uvicorn score_api:app --port 8000                     # 기본 설정으로
+
+    curl -s localhost:8000/score -d '{"deposit": 300000000, "rent": 0, "contract_type": "전세"}'
+    curl -s localhost:8000/score -d '{"listings": [{"deposit": 3e8}, {"deposit": 5e7, "rent": 6e5, "contract_type": "월세"}]}'
+    curl -s localhost:8000/label -d '{"scores": [10, 50, 80]}'
+    curl -s localhost:8000/registry -H 'Content-Type: application/pdf' --data-binary @등기부.pdf
+    curl -s localhost:8000/registry -d '{"text": "... 근저당권설정 채권최고액 금120,000,000원 ..."}'
+    curl -s localhost:8000/grid -d '{"deposits": [1e8, 2e8], "rents": [0, 500000], "contract_types": ["전세", "월세"]}'
+
+- POST /score    매물 하나 또는 {"listings": [...]} 여러 개 (최대 MAX_BATCH_LISTINGS)
+                 → 점수·등급·안내 문구·위험 요소 + 규칙 버전 (compute_risk_score / compute_risk_scores 와 같은 결과)
+- POST /label    {"score": n} 또는 {"scores": [...]} → 등급·안내 문구 (risk_label)
+- POST /registry PDF 바이트(Content-Type: application/pdf) 또는 {"text": "..."} → 등기부 분석 요약 + 항목 목록
+- POST /grid     보증금 × 월세 × 계약 형태 점수표 (화면의 조건 시뮬레이션과 같은 risk_score_grid)
+- GET  /health   워커 수·대기 중인 작업 수·규칙 버전
+
+- CPU 를 오래 쓰는 일(PDF 추출·등기부 분석, INLINE_BATCH_LISTINGS 를 넘는 배치, 점수표)은 프로세스 풀로 보내서
+  이벤트 루프는 계속 다른 요청을 받음. 매물 한두 건은 몇 µs 라 그냥 이벤트 루프에서 계산
+- 풀에 들어간 작업 수가 workers + --queue 에 닿으면 기다리게 하지 않고 바로 503 + Retry-After (backpressure)
+  → 클라이언트가 물러섰다가 다시 보내고, 서버 메모리·지연이 끝없이 늘지 않음
+- 풀 작업 하나가 --job-timeout 초를 넘으면 504, 멈춘 워커는 풀째로 새로 띄움 (자리·pending 을 계속 붙잡지 않도록)
+- 요청 본문은 MAX_UPLOAD_BYTES 까지만 읽음 (넘으면 413)
+- 부하 측정: benchmarks/bench_api.py
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from kkangtong.pdf_pages import EXTRACT_TIMEOUT, MAX_PAGES
+from kkangtong.rules import get_rules
+from kkangtong.scoring import compute_risk_score, risk_label
+from kkangtong.uploads import MAX_UPLOAD_BYTES
+
+DEFAULT_PORT = 8000
+DEFAULT_QUEUE = 32              # 워커가 다 바쁠 때 더 받아 둘 작업 수 (넘으면 503)
+MAX_BATCH_LISTINGS = 10_000     # /score 한 번에 받는 매물 수
+INLINE_BATCH_LISTINGS = 64      # 이하면 이벤트 루프에서 바로 계산, 넘으면 프로세스 풀에서 배열 계산
+MAX_GRID_CELLS = 200_000        # /grid 보증금 × 월세 × 계약 형태 칸 수
+JOB_TIMEOUT = EXTRACT_TIMEOUT * 2   # 풀 작업 하나 제한 시간 (PDF 추출 제한 + 분석 여유)
+RETRY_AFTER_SECONDS = 1
+LISTING_FIELDS = ("deposit", "rent", "contract_type", "memo", "jeonse_rate_sale", "jeonse_rate_market")
+
+
+class ApiError(Exception):
+    """요청이 잘못됐을 때 → status 코드와 함께 {"error": 메시지}"""
+
+    def __init__(self, message, status=400, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+
+# ================================
+# 프로세스 풀 (워커에서 실행되는 함수는 모듈 최상위에 둠 — spawn 으로 pickle 해서 보냄)
+# ================================
+def _warm_up():
+    """워커가 처음 뜰 때 규칙 파일을 미리 읽어 둠"""
+    return get_rules().version
+
+
+def _registry_row(result):
+    registry = result["registry"]
+    return {
+        "pages": result["pages"],
+        "text_length": result["text_length"],
+        "mortgage_count": result["mortgage_count"],
+        "mortgage_total": result["mortgage_total"],
+        "active_mortgage_count": registry.count("근저당권", active_only=True),
+        "owner_lines": result["owner_lines"],
+        "warnings": result["warnings"],
+        "entries": [e.to_row() for e in registry.entries],
+    }
+
+
+def _analyze_registry_pdf(data, max_pages, timeout):
+    from kkangtong.registry import analyze_registry_pdf_bytes
+
+    # 워커 안에서 다시 프로세스 풀을 띄우지 않도록 workers=1 (워커 메인 스레드라 제한 시간은 SIGALRM 으로 쪽 도중에도 끊김)
+    return _registry_row(analyze_registry_pdf_bytes(data, max_pages=max_pages, timeout=timeout, workers=1))
+
+
+def _analyze_registry_text(text):
+    from kkangtong.registry import analyze_registry_text
+
+    return _registry_row(analyze_registry_text(text))
+
+
+def _score_batch(columns):
+    from kkangtong.scoring import compute_risk_scores, risk_levels
+
+    rules = get_rules()
+    scores, issues, version = compute_risk_scores(*columns, rules=rules)
+    messages = {band["level"]: band["message"] for band in rules.labels.bands}
+    levels = risk_levels(scores, rules).tolist()
+    results = [
+        {"score": s, "level": level, "message": messages[level], "issues": i}
+        for s, level, i in zip(scores.tolist(), levels, issues)
+    ]
+    return results, version
+
+
+def _score_grid(deposits, rents, contract_types):
+    from kkangtong.scoring import risk_score_grid
+
+    return risk_score_grid(deposits, rents, contract_types).tolist()
+
+
+class QueueFull(Exception):
+    pass
+
+
+class WorkerTimeout(Exception):
+    """풀 작업이 job_timeout 안에 끝나지 않음 (그 워커는 이미 정리됨)"""
+
+
+class WorkerPool:
+    """
+    ProcessPoolExecutor + 대기열 상한
+
+    executor 자체의 대기열은 끝이 없어서, 들어가 있는 작업 수를 직접 세고
+    max_pending (= 워커 수 + queue) 에 닿으면 넣지 않고 QueueFull
+    (이벤트 루프 하나에서만 부르므로 카운터에 잠금이 필요 없음)
+
+    executor 에는 워커 수만큼만 넣고(나머지는 세마포어에서 기다림) 넣은 뒤부터 job_timeout 을 잼 → 대기열에서 기다린
+    시간은 제한 시간에 들어가지 않음. 넘으면 WorkerTimeout — 실행 중인 작업은 취소할 수 없어서 executor 를 새로 띄우고
+    예전 워커 프로세스는 강제 종료 (그때 같은 executor 에서 돌던 다른 작업은 BrokenProcessPool)
+    """
+
+    def __init__(self, workers, queue, job_timeout=JOB_TIMEOUT):
+        self.workers = workers
+        self.max_pending = workers + queue
+        self.job_timeout = job_timeout
+        self.pending = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.executor = None
+        self._slots = None
+
+    def _new_executor(self):
+        # Streamlit 과 같은 이유로 fork 대신 spawn (스레드가 있는 프로세스를 fork 하지 않음)
+        executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        for _ in range(self.workers):
+            executor.submit(_warm_up)
+        return executor
+
+    def start(self):
+        self.executor = self._new_executor()
+        self._slots = asyncio.Semaphore(self.workers)
+
+    def recycle(self):
+        """멈춘 워커가 있는 executor 를 버리고 새로 띄움"""
+        old, self.executor = self.executor, self._new_executor()
+        processes = list((old._processes or {}).values())  # 공개 API 로는 워커 프로세스를 죽일 수 없음
+        old.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise QueueFull
+        self.pending += 1
+        try:
+            async with self._slots:
+                executor = self.executor
+                future = asyncio.get_running_loop().run_in_executor(executor, func, *args)
+                try:
+                    return await asyncio.wait_for(future, self.job_timeout)
+                except asyncio.TimeoutError:
+                    self.timed_out += 1
+                    if self.executor is executor:  # 같이 멈춘 다른 작업이 이미 새로 띄웠으면 그대로
+                        self.recycle()
+                    raise WorkerTimeout from None
+        finally:
+            self.pending -= 1
+
+
+# ================================
+# 입력 검사
+# ================================
+def _number(value, name, default=None, optional=False):
+    if value is None:
+        if default is not None or optional:
+            return default
+        raise ApiError(f"{name} 값이 필요합니다.")
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ApiError(f"{name} 는 숫자여야 합니다. ({value!r})")
+    if value != value or value in (float("inf"), float("-inf")):
+        raise ApiError(f"{name} 는 유한한 숫자여야 합니다.")
+    return value
+
+
+def _positive_int(text, name):
+    """쿼리 문자열 값 → 1 이상의 int"""
+    if not (text.isascii() and text.isdigit()) or int(text) < 1:
+        raise ApiError(f"{name} 는 1 이상의 정수여야 합니다. ({text!r})")
+    return int(text)
+
+
+def parse_listing(item, where="listing"):
+    """JSON 매물 하나 → compute_risk_score 인자 (단위는 원, 전세가율은 %)"""
+    if not isinstance(item, dict):
+        raise ApiError(f"{where} 는 객체여야 합니다.")
+    unknown = set(item) - set(LISTING_FIELDS)
+    if unknown:
+        raise ApiError(f"{where}: 알 수 없는 필드 {sorted(unknown)} (가능: {list(LISTING_FIELDS)})")
+    contract_type = item.get("contract_type", "전세")
+    memo = item.get("memo") or ""
+    if not isinstance(contract_type, str) or not isinstance(memo, str):
+        raise ApiError(f"{where}: contract_type, memo 는 문자열이어야 합니다.")
+    return (
+        _number(item.get("deposit"), f"{where}.deposit"),
+        _number(item.get("rent"), f"{where}.rent", default=0),
+        contract_type,
+        memo,
+        _number(item.get("jeonse_rate_sale"), f"{where}.jeonse_rate_sale", optional=True),
+        _number(item.get("jeonse_rate_market"), f"{where}.jeonse_rate_market", optional=True),
+    )
+
+
+def _score_one(args, rules):
+    deposit, rent, contract_type, memo, sale, market = args
+    score, issues, _ = compute_risk_score(
+        deposit, rent, contract_type, memo, jeonse_rate_sale=sale, jeonse_rate_market=market, rules=rules
+    )
+    level, message = risk_label(score, rules)
+    return {"score": score, "level": level, "message": message, "issues": issues}
+
+
+async def read_body(request, limit=MAX_UPLOAD_BYTES):
+    """본문을 limit 바이트까지만 읽음 (Content-Length 가 없어도 스트림 도중에 끊음)"""
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > limit:
+        raise ApiError(f"요청이 너무 큽니다. (최대 {limit / 1024 / 1024:.0f}MB)", status=413)
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise ApiError(f"요청이 너무 큽니다. (최대 {limit / 1024 / 1024:.0f}MB)", status=413)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def read_json(request):
+    body = await read_body(request)
+    try:
+        data = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ApiError(f"JSON 을 읽을 수 없습니다: {e}") from None
+    if not isinstance(data, dict):
+        raise ApiError("요청 본문은 JSON 객체여야 합니다.")
+    return data
+
+
+# ================================
+# 엔드포인트
+# ================================
+async def score(request):
+    data = await read_json(request)
+    rules = get_rules()
+    if "listings" not in data:
+        return {**_score_one(parse_listing(data), rules), "rules_version": rules.version}
+
+    listings = data["listings"]
+    if not isinstance(listings, list):
+        raise ApiError("listings 는 배열이어야 합니다.")
+    if len(listings) > MAX_BATCH_LISTINGS:
+        raise ApiError(f"listings 는 한 번에 {MAX_BATCH_LISTINGS}개까지입니다. ({len(listings)}개)", status=413)
+    parsed = [parse_listing(item, f"listings[{i}]") for i, item in enumerate(listings)]
+    if len(parsed) <= INLINE_BATCH_LISTINGS:
+        return {"results": [_score_one(p, rules) for p in parsed], "rules_version": rules.version}
+
+    # 행 목록 → 컬럼 (None 은 compute_risk_scores 에서 '모름')
+    columns = [list(col) for col in zip(*parsed)]
+    results, version = await request.app.state.pool.run(_score_batch, columns)
+    return {"results": results, "rules_version": version}
+
+
+async def label(request):
+    data = await read_json(request)
+    rules = get_rules()
+    if "scores" in data:
+        scores = data["scores"]
+        if not isinstance(scores, list) or len(scores) > MAX_BATCH_LISTINGS:
+            raise ApiError(f"scores 는 {MAX_BATCH_LISTINGS}개 이하의 배열이어야 합니다.")
+        labels = [risk_label(_number(s, f"scores[{i}]"), rules) for i, s in enumerate(scores)]
+        return {"results": [{"level": l, "message": m} for l, m in labels], "rules_version": rules.version}
+    level, message = risk_label(_number(data.get("score"), "score"), rules)
+    return {"level": level, "message": message, "rules_version": rules.version}
+
+
+async def registry(request):
+    pool = request.app.state.pool
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "application/pdf":
+        max_pages = min(_positive_int(request.query_params.get("max_pages", str(MAX_PAGES)), "max_pages"), MAX_PAGES)
+        data = await read_body(request)
+        if not data:
+            raise ApiError("PDF 본문이 비어 있습니다.")
+        try:
+            return await pool.run(_analyze_registry_pdf, data, max_pages, EXTRACT_TIMEOUT)
+        except (QueueFull, WorkerTimeout, BrokenProcessPool):
+            raise
+        except Exception as e:
+            # 화면과 달리 못 읽은 이유를 그대로 알려 줌 (암호 걸린 PDF, 깨진 파일 등)
+            raise ApiError(f"PDF 를 분석할 수 없습니다: {type(e).__name__}: {e}", status=422) from None
+
+    data = await read_json(request)
+    text = data.get("text")
+    if not isinstance(text, str):
+        raise ApiError("PDF 본문(Content-Type: application/pdf) 또는 {\"text\": \"...\"} 가 필요합니다.")
+    return await pool.run(_analyze_registry_text, text)
+
+
+async def grid(request):
+    data = await read_json(request)
+    axes = {}
+    for name in ("deposits", "rents", "contract_types"):
+        values = data.get(name)
+        if not isinstance(values, list) or not values:
+            raise ApiError(f"{name} 는 비어 있지 않은 배열이어야 합니다.")
+        axes[name] = values
+    for i, v in enumerate(axes["deposits"]):
+        _number(v, f"deposits[{i}]")
+    for i, v in enumerate(axes["rents"]):
+        _number(v, f"rents[{i}]")
+    if not all(isinstance(t, str) for t in axes["contract_types"]):
+        raise ApiError("contract_types 는 문자열 배열이어야 합니다.")
+    cells = len(axes["deposits"]) * len(axes["rents"]) * len(axes["contract_types"])
+    if cells > MAX_GRID_CELLS:
+        raise ApiError(f"칸 수가 너무 많습니다. ({cells}칸, 최대 {MAX_GRID_CELLS})", status=413)
+    scores = await request.app.state.pool.run(_score_grid, axes["deposits"], axes["rents"], axes["contract_types"])
+    return {**axes, "scores": scores, "rules_version": get_rules().version}
+
+
+async def health(request):
+    pool = request.app.state.pool
+    return {
+        "status": "ok",
+        "workers": pool.workers,
+        "pending": pool.pending,
+        "max_pending": pool.max_pending,
+        "rejected": pool.rejected,
+        "timed_out": pool.timed_out,
+        "rules_version": get_rules().version,
+    }
+
+
+def _endpoint(handler):
+    """handler 가 돌려준 dict → JSON, ApiError / QueueFull / WorkerTimeout → 오류 JSON"""
+    async def endpoint(request):
+        try:
+            return JSONResponse(await handler(request))
+        except ApiError as e:
+            return JSONResponse({"error": str(e)}, status_code=e.status, headers=e.headers)
+        except QueueFull:
+            return JSONResponse(
+                {"error": "처리 중인 요청이 너무 많습니다. 잠시 후 다시 시도하세요."},
+                status_code=503,
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        except WorkerTimeout:
+            pool = request.app.state.pool
+            return JSONResponse({"error": f"작업이 {pool.job_timeout:g}초 안에 끝나지 않았습니다."}, status_code=504)
+        except BrokenProcessPool:
+            # 다른 요청의 시간 초과로 워커를 새로 띄우는 사이에 같이 끊긴 작업
+            return JSONResponse(
+                {"error": "워커를 다시 시작하는 중입니다. 잠시 후 다시 시도하세요."},
+                status_code=503,
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+
+    return endpoint
+
+
+def create_app(workers=None, queue=DEFAULT_QUEUE, job_timeout=JOB_TIMEOUT):
+    pool = WorkerPool(workers or os.cpu_count() or 1, queue, job_timeout)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        pool.start()
+        try:
+            yield
+        finally:
+            pool.shutdown()
+
+    app = Starlette(
+        routes=[
+            Route("/score", _endpoint(score), methods=["POST"]),
+            Route("/label", _endpoint(label), methods=["POST"]),
+            Route("/registry", _endpoint(registry), methods=["POST"]),
+            Route("/grid", _endpoint(grid), methods=["POST"]),
+            Route("/health", _endpoint(health), methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.pool = pool
+    return app
+
+
+app = create_app()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="위험도 점수·등기부 분석 로컬 API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="분석 워커 프로세스 수")
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE, help="워커가 다 바쁠 때 더 받아 둘 작업 수")
+    parser.add_argument("--job-timeout", type=float, default=JOB_TIMEOUT, help="풀 작업 하나 제한 시간 (초)")
+    args = parser.parse_args(argv)
+
+    import uvicorn  # 필요할 때만 로드
+
+    uvicorn.run(create_app(args.workers, args.queue, args.job_timeout), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""무거운 라이브러리를 import 시점에 읽지 않는 모듈 (kkangtong/__init__.py 참고)"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LIGHT_MODULES = [
+    "kkangtong.rules",
+    "kkangtong.scoring",
+    "kkangtong.listings",
+    "kkangtong.registry",
+    "kkangtong.pdf_pages",
+    "kkangtong.address",
+    "kkangtong.regions",
+    "kkangtong.reviews",
+    "kkangtong.uploads",
+    "kkangtong.ocr",
+    "kkangtong.profiling",
+]
+HEAVY = ("numpy", "pandas", "plotly", "PyPDF2", "multiprocessing")
+
+
+@pytest.mark.parametrize("module", LIGHT_MODULES)
+def test_import_does_not_load_heavy_libraries(module):
+    # 새 프로세스에서 확인 (이 프로세스에는 다른 테스트가 이미 numpy 등을 읽어 둠)
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True)
+    assert out.stdout.strip() == ""
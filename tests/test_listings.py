@@ -0,0 +1,65 @@
+import io
+import math
+
+import pytest
+
+from kkangtong.listings import INPUT_ERROR_LEVEL, parse_money, score_listing_file
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("150000000", 150_000_000),
+        ("150,000,000", 150_000_000),
+        ("2억", 200_000_000),
+        ("1.5억", 150_000_000),
+        ("3천만", 30_000_000),
+        ("300만원", 3_000_000),
+        ("2억5천", 250_000_000),
+        ("2억 5,000만원", 250_000_000),
+    ],
+)
+def test_parse_money(text, expected):
+    assert parse_money(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "  ", "2억x", "몰라요", "-5", "nan"])
+def test_parse_money_rejects(text):
+    assert math.isnan(parse_money(text))
+
+
+def _score_csv(text, encoding="utf-8"):
+    return score_listing_file(io.BytesIO(text.encode(encoding)), "list.csv")
+
+
+def test_blank_or_bad_deposit_is_not_ranked_first():
+    # 예전에는 빈 보증금이 0원 → 0점 '안전' 1등이었음 (엑셀 기본 저장 CP949)
+    df = _score_csv(
+        "주소,보증금,월세,계약형태\n빈칸,,0,전세\n오류,2억x,0,전세\n정상,100000000,0,전세\n한글,3천만,50만,월세\n",
+        encoding="cp949",
+    )
+    assert list(df["address"]) == ["한글", "정상", "빈칸", "오류"]
+    assert list(df["rank"][:2]) == [1, 2]
+    assert df["rank"][2:].isna().all()
+    bad = df[df["address"].isin(["빈칸", "오류"])]
+    assert bad["score"].isna().all()
+    assert (bad["level"] == INPUT_ERROR_LEVEL).all()
+    assert (bad["error"] != "").all()
+    assert df.loc[df["address"] == "한글", "deposit"].iat[0] == 30_000_000
+
+
+def test_blank_optional_money_is_zero_but_garbage_is_an_error():
+    df = _score_csv("주소,보증금,월세,매매가\n빈칸,100000000,,\n오류,100000000,월세몰라,\n")
+    ok = df[df["address"] == "빈칸"].iloc[0]
+    assert ok["rent"] == 0 and ok["error"] == "" and ok["rank"] == 1
+    bad = df[df["address"] == "오류"].iloc[0]
+    assert math.isnan(bad["score"]) and "월세" in bad["error"]
+
+
+@pytest.mark.parametrize("rows, chunk_rows, truncated", [(5, 2, False), (6, 2, True), (6, 5, True), (5, 5, False), (40, 3, True)])
+def test_truncated_only_when_rows_were_dropped(rows, chunk_rows, truncated):
+    text = "주소,보증금\n" + "".join(f"집{i},{100_000_000 + i}\n" for i in range(rows))
+    df = score_listing_file(io.BytesIO(text.encode()), "list.csv", chunk_rows=chunk_rows, max_rows=5)
+    assert len(df) == min(rows, 5)
+    assert df.attrs["truncated"] is truncated
+    assert sorted(df["address"]) == [f"집{i}" for i in range(min(rows, 5))]
@@ -0,0 +1,40 @@
+import json
+
+from kkangtong.market import MarketIndex, update_market_index
+
+
+def _sale_csv(path, sigungu, n, ym):
+    rows = [f'{sigungu},{i % 5 + 1},단지{i % 5},{60 + i % 20},{ym},"{50000 + i * 10:,}"' for i in range(n)]
+    path.write_text("시군구,번지,단지명,전용면적(㎡),계약년월,거래금액(만원)\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def _jeonse_csv(path, n, ym):
+    rows = [f'서울특별시 은평구 진관동,{i % 5 + 1},단지{i % 5},{60 + i % 20},{ym},"{30000 + i:,}",0,전세' for i in range(n)]
+    header = "시군구,번지,단지명,전용면적(㎡),계약년월,보증금(만원),월세금(만원),전월세구분\n"
+    path.write_text(header + "\n".join(rows) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_update_switches_generations_through_the_manifest(tmp_path):
+    index_dir = str(tmp_path / "index")
+    update_market_index([_sale_csv(tmp_path / "s1.csv", "서울특별시 은평구 진관동", 50, 202401)], index_dir)
+    before = MarketIndex(index_dir)
+
+    update_market_index([_jeonse_csv(tmp_path / "j1.csv", 40, 202402)], index_dir)
+    update_market_index([_sale_csv(tmp_path / "s2.csv", "서울특별시 마포구 상암동", 30, 202403)], index_dir)
+
+    # 먼저 연 쪽은 자기 세대 파일만 계속 봄 (새 세대 파일은 다른 이름이라 섞이지 않음)
+    assert before.lookup("서울 은평구 진관동 1")["jeonse"] is None
+
+    after = MarketIndex(index_dir)
+    manifest = json.loads((tmp_path / "index" / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["generation"] == 3
+    assert after.lookup("서울 은평구 진관동 1")["jeonse"]["count"] == 8
+    assert after.lookup("서울 마포구 상암동 1")["sale"]["count"] == 6
+    for kind in ("sale", "jeonse"):
+        assert len(after.columns(kind)["offsets"]) == len(after.groups) + 1
+
+    # 지금·직전 세대가 가리키지 않는 파일은 지워짐 (1세대 groups 는 2세대부터 안 씀)
+    assert all((tmp_path / "index" / name).exists() for name in manifest["paths"].values())
+    assert not (tmp_path / "index" / "groups.g1.json").exists()
@@ -0,0 +1,104 @@
+import json
+
+from kkangtong.registry import (
+    REGISTRY_CACHE_FORMAT,
+    RegistryCache,
+    RegistryModel,
+    analyze_registry_text,
+    parse_registry_model,
+    scan_registry_text,
+)
+
+SAMPLE = """【 갑 구 】
+1 소유권보존 2015년 1월 2일 소유자 김갑동
+2 가압류 2021년 6월 30일 청구금액 금30,000,000원 채권자 주식회사 대부
+3 2번가압류등기말소 2022년 1월 3일
+4 압류 2023년 2월 1일 권리자 국
+【 을 구 】
+1 근저당권설정 2020년 3월 5일 채권최고액 금120,000,000원 근저당권자 은행
+2 근저당권설정 2021년 7월 1일 채권최고액 금 60,000,000원
+3 1번근저당권설정등기말소 2022년 5월 9일
+"""
+
+
+def _analysis():
+    return analyze_registry_text("을구 1 근저당권설정 채권최고액 금120,000,000원")
+
+
+def test_cache_round_trip(tmp_path):
+    cache = RegistryCache(str(tmp_path))
+    cache.put("abc", _analysis())
+    value = RegistryCache(str(tmp_path)).get("abc")  # 새 인스턴스 → 디스크에서
+    assert value["mortgage_count"] == 1
+    assert isinstance(value["registry"], RegistryModel)
+
+
+def test_old_format_files_are_ignored(tmp_path):
+    # 형식 버전 없이 저장된 예전 결과 (registry, text_length 없음) → KeyError 대신 미스
+    (tmp_path / "abc.json").write_text(json.dumps({"pages": 1, "mortgage_count": 0, "warnings": []}))
+    cache = RegistryCache(str(tmp_path))
+    assert cache.get("abc") is None
+    assert cache.stats["misses"] == 1
+
+
+def test_format_version_is_part_of_the_disk_key(tmp_path):
+    RegistryCache(str(tmp_path), version=REGISTRY_CACHE_FORMAT).put("abc", _analysis())
+    assert RegistryCache(str(tmp_path), version=REGISTRY_CACHE_FORMAT + 1).get("abc") is None
+    assert RegistryCache(str(tmp_path), version=REGISTRY_CACHE_FORMAT).get("abc") is not None
+
+
+def test_scan_takes_provisional_seizure_before_seizure():
+    # 왼쪽부터 가장 먼저 맞는 것 → '가압류' 안의 '압류'는 따로 세지 않음, 혼자 있는 '압류'만 seizure
+    text = "가압류 등기 후 압류"
+    hits = scan_registry_text(text)
+    assert [(kind, text[start:end]) for kind, start, end, _ in hits] == [("provisional_seizure", "가압류"), ("seizure", "압류")]
+
+
+def test_scan_amounts_and_offset():
+    text = "근저당권 채권최고액 120,000,000원\n채권최고액  5,000 원"
+    hits = scan_registry_text(text, offset=100)
+    assert hits[0] == ("mortgage", 100, 104, "근저당권")
+    second = text.index("채권최고액", 10)
+    assert [(start, value) for kind, start, _, value in hits if kind == "amount"] == [(105, 120_000_000), (100 + second, 5_000)]
+
+
+def test_scan_owner_lines_once_per_line():
+    text = "1 소유권보존 소유자 김갑동\n2 소유권이전 소유자 이을동"
+    owners = [hit for hit in scan_registry_text(text) if hit[0] == "owner"]
+    assert [value for *_, value in owners] == ["1 소유권보존 소유자 김갑동", "2 소유권이전 소유자 이을동"]
+    assert owners[1][1] == text.index("2 ")
+
+
+def test_parse_model_sections_kinds_and_amounts():
+    model = parse_registry_model(SAMPLE)
+    assert [(e.section, e.rank, e.kind) for e in model.entries] == [
+        ("갑구", "1", "소유권보존"),
+        ("갑구", "2", "가압류"),
+        ("갑구", "3", "말소"),
+        ("갑구", "4", "압류"),
+        ("을구", "1", "근저당권"),
+        ("을구", "2", "근저당권"),
+        ("을구", "3", "말소"),
+    ]
+    mortgages = model.of_kind("근저당권")
+    assert [e.amount for e in mortgages] == [120_000_000, 60_000_000]
+    assert mortgages[0].date == "2020-03-05"
+    assert model.of_kind("가압류")[0].amount == 30_000_000
+
+
+def test_parse_model_counts_cancellations_in_their_own_section():
+    model = parse_registry_model(SAMPLE)
+    # 갑구 3번은 갑구 2번(가압류)만, 을구 3번은 을구 1번(근저당권)만 말소
+    assert (model.count("가압류"), model.count("가압류", active_only=True)) == (1, 0)
+    assert (model.count("근저당권"), model.count("근저당권", active_only=True)) == (2, 1)
+    assert model.count("압류", active_only=True) == 1
+    assert not model.of_kind("소유권보존")[0].cancelled
+    assert [e.rank for e in model.of_kind("근저당권", active_only=True)] == ["2"]
+
+
+def test_scan_hits_map_back_to_model_entries():
+    model = parse_registry_model(SAMPLE)
+    hits = scan_registry_text(SAMPLE)
+    seizure = next(start for kind, start, _, _ in hits if kind == "seizure")
+    assert model.entry_at(seizure).kind == "압류"
+    assert model.entry_at(0) is None
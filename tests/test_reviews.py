@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+from kkangtong.reviews import ReviewStore, SqliteReviewStore, is_specific_address, review_address_key
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        # 행정구역 표에 동이 없는 구 — 예전에는 둘 다 "서울 중구" / "서울 마포구" 로 합쳐졌음
+        ("서울 중구 신당동 12", "서울 중구 신당동 99-1, 302호"),
+        ("서울 마포구 망원동 1", "서울 마포구 합정동 500"),
+        ("서울 마포구 망원동 1", "서울 마포구 망원동 2"),
+        ("서울 은평구 진관동 1", "서울 은평구 진관동 2"),
+    ],
+)
+def test_different_houses_get_different_keys(a, b):
+    assert review_address_key(a) != review_address_key(b)
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("서울 은평구 진관동 123-4", "서울시 은평구 진관동 123-4번지"),
+        ("서울 중구 신당동 99-1", "서울특별시 중구  신당동 99-1"),
+    ],
+)
+def test_same_house_same_key(a, b):
+    assert review_address_key(a) == review_address_key(b)
+
+
+@pytest.mark.parametrize("address", ["서울시 ○○구 ○○로 123, 302호", "서울 마포구", "서울 마포구 1", "서울 은평구 진관동"])
+def test_vague_address_falls_back_to_raw(address):
+    key = review_address_key(address)
+    assert key == " ".join(address.split())
+    assert not is_specific_address(address)
+
+
+def test_placeholder_does_not_collapse_to_sido():
+    # 화면 예시 주소가 "서울" 하나로 묶이면 서울 전체 후기가 섞임
+    assert review_address_key("서울시 ○○구 ○○로 123, 302호") != "서울"
+
+
+def test_specific_address():
+    assert is_specific_address("서울 중구 신당동 12")
+    assert is_specific_address("서울 은평구 진관2로 10")
+
+
+def test_old_gu_level_keys_are_split_on_open(tmp_path):
+    path = str(tmp_path / "reviews.sqlite3")
+    store = SqliteReviewStore(path)
+    store.add_review("서울 중구 신당동 12", {"rating": 1})
+    store.add_review("서울 중구 신당동 99-1", {"rating": 5})
+    store.close()
+
+    # 버전 2 시절 DB 처럼 두 후기를 구 단위 키 하나로 되돌림
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE reviews SET address_key = '서울 중구'")
+    conn.execute("DELETE FROM review_stats")
+    conn.execute("INSERT INTO review_stats (address_key, count, rating_sum, rating_1, rating_5) VALUES ('서울 중구', 2, 6, 1, 1)")
+    conn.execute("PRAGMA user_version = 2")
+    conn.commit()
+    conn.close()
+
+    store = SqliteReviewStore(path)
+    assert store.get_stats("서울 중구").count == 0
+    stats = store.get_stats(review_address_key("서울 중구 신당동 12"))
+    assert (stats.count, stats.rating_sum) == (1, 1)
+    assert store.count_reviews(review_address_key("서울 중구 신당동 99-1")) == 1
+    store.close()
+
+
+def test_review_store_is_abstract():
+    class Partial(ReviewStore):
+        def add_review(self, address, review):
+            return {}
+
+    with pytest.raises(TypeError):
+        ReviewStore()
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_summaries_leave_out_bodies(tmp_path):
+    store = SqliteReviewStore(str(tmp_path / "reviews.sqlite3"))
+    a = store.add_review("서울 중구 신당동 12", {"rating": 4, "pros": "채광", "cons": "소음"})
+    b = store.add_review("서울 중구 신당동 12", {"rating": 2, "pros": "역세권", "cons": "곰팡이"})
+    summaries = store.get_review_summaries([b["id"], a["id"], 999])
+    assert [r["id"] for r in summaries] == [b["id"], a["id"]]
+    assert [r["rating"] for r in summaries] == [2, 4]
+    assert not {"pros", "cons"} & set(summaries[0])
+    assert store.get_reviews([a["id"]])[0]["cons"] == "소음"
+    store.close()
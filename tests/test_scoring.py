@@ -0,0 +1,114 @@
+"""compute_risk_scores(배열) 는 compute_risk_score(한 건씩) 와 항상 같은 결과여야 함"""
+import json
+
+import numpy as np
+import pytest
+
+from kkangtong.reviews import REVIEW_FLAGS, ReviewStats
+from kkangtong.rules import RISK_RULES_PATH, compile_rules, get_rules
+from kkangtong.scoring import (
+    compute_risk_score,
+    compute_risk_scores,
+    risk_label,
+    risk_levels,
+    risk_score_grid,
+)
+
+
+def random_listings(n, seed):
+    """경계값(60, 80, 100, 1억5천 등)이 자주 나오도록 섞은 무작위 매물"""
+    rng = np.random.default_rng(seed)
+    deposit = rng.choice(
+        [0, -1, 49_999_999, 50_000_000, 149_999_999, 150_000_000, *rng.integers(1, 400_000_000, 20)], n
+    )
+    rent = rng.choice([0, 999_999, 1_000_000, 1_999_999, 2_000_000, *rng.integers(0, 3_000_000, 20)], n)
+    contract_type = rng.choice(["전세", "반전세", "월세", "기타"], n)
+    sale = rng.choice([None, 0, -5, 59.99, 60, 79.9, 80, 89.99, 90, 150, *rng.uniform(1, 130, 20)], n)
+    market = rng.choice([None, 0, 100, 100.01, 110, 110.5, 120, 120.01, *rng.uniform(50, 160, 20)], n)
+    words = list(get_rules().memo_keywords) + ["", "깨끗함", "남향", "역세권"]
+    memo = [" ".join(rng.choice(words, rng.integers(0, 4))) for _ in range(n)]
+    return deposit, rent, contract_type, memo, sale, market
+
+
+def random_review_stats(n, seed):
+    """후기 없음(None) · 최소 개수 근처 · 태그 비율 경계(30%)가 자주 나오는 요약"""
+    rng = np.random.default_rng(seed)
+    stats = []
+    for i in range(n):
+        if rng.random() < 0.3:
+            stats.append(None)
+            continue
+        count = int(rng.choice([0, 1, 2, 3, 4, 10]))
+        hist = rng.multinomial(count, [0.2] * 5) if count else np.zeros(5, dtype=int)
+        rating_sum = int(hist @ np.arange(1, 6))
+        flags = {name: int(rng.integers(0, count + 1)) for name, _ in REVIEW_FLAGS}
+        stats.append(ReviewStats(f"주소 {i}", count, rating_sum, hist.tolist(), flags))
+    return stats
+
+
+def _assert_same(columns, scores, issues, version, review_stats=None):
+    deposit, rent, contract_type, memo, sale, market = columns
+    for i in range(len(deposit)):
+        expected = compute_risk_score(
+            deposit[i],
+            rent[i],
+            contract_type[i],
+            memo[i],
+            jeonse_rate_sale=sale[i],
+            jeonse_rate_market=market[i],
+            review_stats=None if review_stats is None else review_stats[i],
+        )
+        assert (scores[i], issues[i], version) == expected, (i, [c[i] for c in columns])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_scalar(seed):
+    columns = random_listings(4_000, seed)
+    _assert_same(columns, *compute_risk_scores(*columns))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_matches_scalar_with_review_stats(seed):
+    columns = random_listings(2_000, seed)
+    stats = random_review_stats(2_000, seed)
+    _assert_same(columns, *compute_risk_scores(*columns, review_stats=stats), review_stats=stats)
+
+
+def test_risk_levels_match_risk_label():
+    scores = np.arange(0, 101)
+    assert risk_levels(scores).tolist() == [risk_label(int(s))[0] for s in scores]
+
+
+def test_score_grid_matches_scalar():
+    deposits = [0, 49_999_999, 50_000_000, 150_000_000, 300_000_000]
+    rents = [0, 999_999, 1_000_000, 2_000_000]
+    types = ["전세", "반전세", "월세", "기타"]
+    grid = risk_score_grid(deposits, rents, types)
+    for t, contract_type in enumerate(types):
+        for r, rent in enumerate(rents):
+            for d, deposit in enumerate(deposits):
+                assert grid[t, r, d] == compute_risk_score(deposit, rent, contract_type)[0]
+
+
+def test_batch_matches_scalar_with_many_keywords():
+    # 키워드가 64개를 넘어도 조합별 위험 요소 목록이 섞이지 않아야 함 (뒤쪽 키워드만 든 메모 포함)
+    with open(RISK_RULES_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    for i in range(70):
+        config["memo_keywords"][f"추가키워드{i:02d}호"] = {"points": 1 + i % 3, "issue": f"추가 요소 {i:02d}"}
+    rules = compile_rules(config)
+    assert len(rules.memo_keywords) > 64
+
+    rng = np.random.default_rng(0)
+    words = list(rules.memo_keywords) + ["", "깨끗함"]
+    memo = [" ".join(rng.choice(words, rng.integers(0, 5))) for _ in range(500)]
+    memo += [f"추가키워드{i:02d}호" for i in range(60, 70)]
+    n = len(memo)
+    deposit = np.full(n, 200_000_000)
+    rent = np.zeros(n, dtype=int)
+    contract_type = ["전세"] * n
+
+    scores, issues, version = compute_risk_scores(deposit, rent, contract_type, memo, rules=rules)
+    for i in range(n):
+        expected = compute_risk_score(deposit[i], rent[i], contract_type[i], memo[i], rules=rules)
+        assert (scores[i], issues[i], version) == expected, (i, memo[i])